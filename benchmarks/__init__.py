@@ -0,0 +1,29 @@
+"""
+Benchmark suite for GB Personal apps.
+
+    python -m benchmarks                      # generate data, run everything
+    python -m benchmarks --filter finance     # only matching scenarios
+    python -m benchmarks --output base.json   # save results as JSON
+    python -m benchmarks.compare base.json head.json
+
+A run generates a seeded dataset for every app (generators.py), so two runs
+with the same --seed and --end measure the same data. It then loads each
+backend against that data and times a fixed list of scenarios
+(scenarios.py): storage calls made directly, and endpoints called through
+an in-process ASGI client. Results are written with the machine and commit
+they came from, and compare.py flags the scenarios whose median moved.
+Derived results (stats, reports, top favorites) are memoized by the apps;
+the suite empties those caches before every timed call, so their scenarios
+time the computation. --warm-cache times cache hits instead. Every run also imports each backend in a fresh
+interpreter and exits non-zero if one goes over its cold-start budget
+(startup.py).
+
+Benchmarks that need their own setup run on their own:
+
+    python -m benchmarks.startup --tree       # cold-start import tree per app
+    python -m benchmarks.storage_backends     # file vs. SQLite storage
+    python -m benchmarks.async_load           # sync vs. async endpoints under storage latency
+    python -m benchmarks.single_flight        # concurrent identical requests for a derived endpoint
+    python -m benchmarks.finance_import       # statement import vs. one POST per row
+    python benchmarks/gateway_rss.py          # six services vs. the single-process gateway
+"""
@@ -0,0 +1,154 @@
+"""
+Run the benchmark suite and write results to JSON.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+from . import generators, scenarios, startup
+from .harness import APPS, ROOT, asgi_client, load_backends, run_async, time_async, time_sync
+from gb_shared.storage.cache import ENABLED as CACHE_ENABLED, clear_all
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def run_http(selected, backends, repeat: int, setup=None) -> dict:
+    results = {}
+    clients = {name: asgi_client(backend.main.app) for name, backend in backends.items()}
+    try:
+        for scenario in selected:
+            method, path, body = scenario.request
+            client = clients[scenario.app]
+
+            async def call():
+                response = await client.request(method, path, json=body)
+                response.raise_for_status()
+                return response.content
+
+            results[scenario.name] = await time_async(call, repeat, setup=setup)
+    finally:
+        for client in clients.values():
+            await client.aclose()
+    return results
+
+
+def run(args) -> dict:
+    end = date.fromisoformat(args.end) if args.end else date.today()
+    sizes = {k: getattr(args, k) for k in generators.DEFAULT_SIZES if getattr(args, k) is not None}
+
+    with tempfile.TemporaryDirectory(prefix="gb-bench-") as tmp:
+        data_root = Path(args.data_dir or tmp)
+        started = time.perf_counter()
+        data_dirs = generators.generate_all(data_root, seed=args.seed, end=end, **sizes)
+        generate_seconds = time.perf_counter() - started
+
+        backends = load_backends(data_dirs)
+        if args.pack:
+            # Closed months of day files packed into segments, as GB_PACK_SEGMENTS=month does
+            for backend in backends.values():
+                for collection in getattr(backend.storage, "DATE_COLLECTIONS", []):
+                    backend.storage._storage.pack(collection)
+        selected = [
+            s for s in scenarios.build(backends, end)
+            if (not args.filter or any(f in s.name for f in args.filter))
+            and (args.writes or not s.writes)
+        ]
+        # Reads first, so write scenarios don't change what the reads measure
+        selected.sort(key=lambda s: s.writes)
+
+        # Cold: every timed call starts with empty result caches, so derived
+        # scenarios time the computation rather than a memoized hit
+        setup = clear_all if args.cold else None
+        results = {}
+        for scenario in selected:
+            if scenario.kind == "storage":
+                results[scenario.name] = time_sync(scenario.call, args.repeat, setup=setup)
+            else:
+                results.update(run_async(run_http([scenario], backends, args.repeat, setup)))
+            results[scenario.name].update(app=scenario.app, kind=scenario.kind)
+            print(f"{scenario.name:<45} median {results[scenario.name]['median_ms']:>10.3f} ms"
+                  f"   p95 {results[scenario.name]['p95_ms']:>10.3f} ms")
+
+    # Cold start: each app imported in a fresh interpreter, checked against its budget
+    over_budget = []
+    for app_name in APPS if args.startup else []:
+        name = f"startup.{app_name}"
+        if args.filter and not any(f in name for f in args.filter):
+            continue
+        measured = startup.measure(app_name, args.startup_runs)
+        results[name] = {
+            "runs": measured["runs"],
+            "median_ms": measured["import_ms"],
+            "own_ms": measured["own_ms"],
+            "process_ms": measured["wall_ms"],
+            "app": app_name,
+            "kind": "startup",
+        }
+        print(f"{name:<45} median {measured['import_ms']:>10.3f} ms   own {measured['own_ms']:>10.3f} ms")
+        over_budget += [f"{name}: {violation}" for violation in measured["violations"]]
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "end": end.isoformat(),
+            "sizes": {**generators.DEFAULT_SIZES, **sizes},
+            "repeat": args.repeat,
+            "packed": args.pack,
+            "result_cache": ("cold" if args.cold else "warm") if CACHE_ENABLED else "off",
+            "generate_seconds": round(generate_seconds, 2),
+            "startup_budget_ms": {"import": startup.IMPORT_BUDGET_MS, "own": startup.OWN_BUDGET_MS},
+        },
+        "results": results,
+        "over_budget": over_budget,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Run the GB Personal benchmark suite.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--end", help="Last day of generated data (YYYY-MM-DD, default today)")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per scenario")
+    parser.add_argument("--filter", action="append", help="Only run scenarios containing this text (repeatable)")
+    parser.add_argument("--no-writes", dest="writes", action="store_false", help="Skip scenarios that write")
+    parser.add_argument("--data-dir", help="Generate data here instead of a temporary directory")
+    parser.add_argument("--output", help="Write results JSON to this file")
+    parser.add_argument("--pack", action="store_true", help="Pack closed months into segments before running")
+    parser.add_argument("--warm-cache", dest="cold", action="store_false",
+                        help="Keep memoized results between timed calls, so derived scenarios time cache hits")
+    parser.add_argument("--no-startup", dest="startup", action="store_false", help="Skip the cold-start scenarios")
+    parser.add_argument("--startup-runs", type=int, default=5, help="Cold imports per app (default 5)")
+    for size, default in generators.DEFAULT_SIZES.items():
+        parser.add_argument(f"--{size}", type=int, help=f"Dataset size (default {default})")
+    args = parser.parse_args()
+
+    report = run(args)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"\nResults written to {args.output}")
+    if report["over_budget"]:
+        print("\nCold-start budget exceeded:")
+        for violation in report["over_budget"]:
+            print(f"  {violation}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
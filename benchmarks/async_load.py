@@ -0,0 +1,158 @@
+"""
+Load test: sync vs. async list/report endpoints under injected storage latency.
+
+Every storage read and list sleeps for --latency-ms per key, which models a
+slow disk or an object store (one GET per key). Each endpoint is served two ways:
+- The real app, where the endpoint is `async def` on the async storage API.
+- A baseline app that serves the same path with a sync `def` handler calling
+  the sync storage function. That is how every endpoint ran before, on the
+  AnyIO thread pool (40 threads shared by every sync endpoint).
+
+For each endpoint it reports:
+- Single-request latency. aread_many() splits the reads across threads.
+- Throughput and p50/p95 with --concurrency requests in flight.
+- The latency of GET /health probes sent during that load. Under the sync
+  baseline they queue behind slow handlers for a pool thread.
+
+Usage:
+    python -m benchmarks.async_load [--latency-ms 5] [--concurrency 100] [--requests 300]
+"""
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+from fastapi import FastAPI
+
+from . import generators
+from .harness import asgi_client, load_backends, summarize
+
+
+def inject_latency(storage, seconds: float) -> None:
+    """Make each key read, and each listing, of this Storage instance sleep first."""
+    read_bytes, read_many_bytes, list_keys = storage._read_bytes, storage._read_many_bytes, storage._list_keys
+
+    def slow_read_bytes(key):
+        time.sleep(seconds)
+        return read_bytes(key)
+
+    def slow_read_many_bytes(keys):
+        time.sleep(seconds * len(keys))
+        return read_many_bytes(keys)
+
+    def slow_list_keys(prefix, suffix):
+        time.sleep(seconds)
+        return list_keys(prefix, suffix)
+
+    storage._read_bytes = slow_read_bytes
+    storage._read_many_bytes = slow_read_many_bytes
+    storage._list_keys = slow_list_keys
+
+
+def endpoints(backends, month: str) -> list[tuple[str, str, object]]:
+    """(app, path, equivalent sync call) for the converted list and report endpoints."""
+    finance, health, guitar, food = (backends[n] for n in ("finance", "health", "guitar", "food"))
+    return [
+        ("finance", "/transactions", lambda: finance.storage.get_all_transactions(100)),
+        ("finance", f"/reports/{month}", lambda: finance.storage.generate_monthly_report(month)),
+        ("health", "/daily", lambda: health.storage.get_all_daily_entries(30)),
+        ("guitar", "/stats", lambda: guitar.stats.get_stats()),
+        ("food", "/daily", lambda: food.storage.get_all_daily_logs(30)),
+    ]
+
+
+def baseline_app(path: str, call) -> FastAPI:
+    app = FastAPI()
+
+    def handler():
+        return call()
+
+    def health_check():
+        return {"status": "healthy"}
+
+    app.add_api_route(path, handler, methods=["GET"])
+    app.add_api_route("/health", health_check, methods=["GET"])
+    return app
+
+
+async def timed_get(client, path: str) -> float:
+    started = time.perf_counter()
+    response = await client.get(path)
+    response.raise_for_status()
+    return time.perf_counter() - started
+
+
+async def load(app, path: str, concurrency: int, requests: int) -> dict:
+    """Single-request latency, then throughput and /health probe latency under load."""
+    async with asgi_client(app) as client:
+        single = summarize([await timed_get(client, path) for _ in range(5)])
+
+        samples, probes = [], []
+        slots = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with slots:
+                samples.append(await timed_get(client, path))
+
+        async def probe(done: asyncio.Event):
+            while not done.is_set():
+                probes.append(await timed_get(client, "/health"))
+                await asyncio.sleep(0.05)
+
+        done = asyncio.Event()
+        prober = asyncio.create_task(probe(done))
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await prober
+
+    return {
+        "single_ms": single["median_ms"],
+        "requests_per_second": round(requests / elapsed, 1),
+        **summarize(samples),
+        "health_probe": summarize(probes),
+    }
+
+
+async def run(args) -> dict:
+    end = date.today()
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="gb-bench-") as tmp:
+        data_dirs = generators.generate_all(Path(tmp), seed=42, end=end, years=1)
+        backends = load_backends(data_dirs)
+        for backend in backends.values():
+            inject_latency(backend.storage._storage, args.latency_ms / 1000)
+
+        print(f"{'endpoint':<24} {'mode':<6} {'single ms':>9} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} "
+              f"{'/health p50':>12}")
+        for app_name, path, call in endpoints(backends, end.strftime("%Y-%m")):
+            name = f"{app_name}{path}"
+            sync = await load(baseline_app(path, call), path, args.concurrency, args.requests)
+            async_ = await load(backends[app_name].main.app, path, args.concurrency, args.requests)
+            results[name] = {"sync": sync, "async": async_}
+            for mode, r in (("sync", sync), ("async", async_)):
+                print(f"{name:<24} {mode:<6} {r['single_ms']:>9.1f} {r['requests_per_second']:>8.1f} "
+                      f"{r['median_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['health_probe']['median_ms']:>12.1f}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync vs. async endpoints under injected storage latency.")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Sleep per key read or listing")
+    parser.add_argument("--concurrency", type=int, default=100, help="Requests in flight")
+    parser.add_argument("--requests", type=int, default=300, help="Requests per endpoint and mode")
+    parser.add_argument("--output", help="Write results JSON to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
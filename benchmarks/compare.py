@@ -0,0 +1,48 @@
+"""
+Compare two benchmark result files.
+
+Usage:
+    python -m benchmarks.compare base.json head.json [--threshold 10]
+"""
+
+import argparse
+import json
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="Percent change in median to flag (default 10)")
+    args = parser.parse_args()
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.head) as f:
+        head = json.load(f)
+
+    print(f"base {base['meta']['commit']}  ->  head {head['meta']['commit']}\n")
+    print(f"{'scenario':<45} {'base ms':>10} {'head ms':>10} {'change':>9}")
+
+    regressions = 0
+    for name, result in head["results"].items():
+        before = base["results"].get(name)
+        if not before:
+            print(f"{name:<45} {'-':>10} {result['median_ms']:>10.3f} {'new':>9}")
+            continue
+        change = (result["median_ms"] - before["median_ms"]) / before["median_ms"] * 100
+        flag = ""
+        if change > args.threshold:
+            flag = "  slower"
+            regressions += 1
+        elif change < -args.threshold:
+            flag = "  faster"
+        print(f"{name:<45} {before['median_ms']:>10.3f} {result['median_ms']:>10.3f} {change:>+8.1f}%{flag}")
+
+    if regressions:
+        print(f"\n{regressions} scenario(s) slower than the {args.threshold:.0f}% threshold")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark: six separate uvicorn services vs. the single-process gateway.
+
+Starts each layout on spare local ports, then reports total resident memory
+(Linux /proc) and GET latency for a cheap endpoint on every app.
+
+Usage:
+    python benchmarks/gateway_rss.py [--requests 200]
+"""
+
+import argparse
+import math
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "shared"))
+
+from gb_shared.apps import APPS, backend_dir  # noqa: E402
+
+BASE_PORT = 18000
+GATEWAY_PORT = 18010
+
+
+def rss_mb(pid: int) -> float:
+    """Resident set size of a process in MB."""
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def start(module: str, port: int, cwd: Path) -> subprocess.Popen:
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", module, "--host", "127.0.0.1", "--port", str(port)],
+        cwd=cwd,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def wait_ready(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=1).read()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"{url} did not come up")
+
+
+def measure(urls: list[str], requests: int) -> dict:
+    latencies = []
+    for i in range(requests):
+        url = urls[i % len(urls)]
+        started = time.perf_counter()
+        urllib.request.urlopen(url).read()
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": latencies[max(0, math.ceil(len(latencies) * 0.99) - 1)],
+    }
+
+
+def run_separate(requests: int) -> dict:
+    procs = []
+    urls = []
+    try:
+        for offset, name in enumerate(APPS):
+            port = BASE_PORT + offset
+            procs.append(start("app.main:app", port, backend_dir(name)))
+            urls.append(f"http://127.0.0.1:{port}/health")
+        for url in urls:
+            wait_ready(url)
+        result = measure(urls, requests)
+        result["rss_mb"] = sum(rss_mb(p.pid) for p in procs)
+        result["processes"] = len(procs)
+        return result
+    finally:
+        for p in procs:
+            p.terminate()
+            p.wait()
+
+
+def run_gateway(requests: int) -> dict:
+    proc = start("gateway.main:app", GATEWAY_PORT, ROOT)
+    try:
+        urls = [f"http://127.0.0.1:{GATEWAY_PORT}/{name}/health" for name in APPS]
+        wait_ready(urls[0])
+        result = measure(urls, requests)
+        result["rss_mb"] = rss_mb(proc.pid)
+        result["processes"] = 1
+        return result
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    for label, runner in [("separate", run_separate), ("gateway", run_gateway)]:
+        r = runner(args.requests)
+        print(f"{label:>9}: {r['processes']} process(es), RSS {r['rss_mb']:.0f} MB, "
+              f"p50 {r['p50_ms']:.2f} ms, p99 {r['p99_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
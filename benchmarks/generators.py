@@ -0,0 +1,321 @@
+"""
+Seeded synthetic data generators for every app.
+
+Each generator writes an app's data directory in the same layout the app's
+storage module uses, so the real storage code and endpoints can be pointed
+at it. The same seed and end date always produce the same data.
+"""
+
+import random
+import sys
+import uuid
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "shared"))
+from gb_shared.apps import load  # noqa: E402
+from gb_shared.storage import Storage, get_storage  # noqa: E402
+
+EXPENSE_CATEGORIES = [
+    "Food & Dining", "Groceries", "Transportation", "Gas", "Utilities",
+    "Rent/Mortgage", "Insurance", "Healthcare", "Entertainment", "Shopping",
+    "Subscriptions", "Other",
+]
+INCOME_CATEGORIES = ["Salary", "Freelance", "Interest", "Refunds"]
+ACCOUNTS = ["checking", "savings", "credit"]
+EXERCISE_TYPES = ["Run", "Walk", "Weights", "Bike", "Swim"]
+FOCUS_AREAS = ["Chords", "Scales", "Songs", "Techniques", "Theory"]
+MEALS = ["breakfast", "lunch", "dinner", "snack"]
+FOODS = ["Oatmeal", "Coffee", "Salad", "Chicken", "Rice", "Apple", "Yogurt", "Soup", "Pasta", "Eggs"]
+STORES = ["sams_club", "lowes", "walmart", "wegmans", "trader_joes", "redners"]
+CHECKLIST_ITEMS = [
+    "budget", "authority", "need", "timeline", "initial_meeting", "nda",
+    "data_intake", "demo", "proposal", "pitch_deck", "closing_meeting", "prove_roi",
+]
+
+# Default dataset size
+DEFAULT_SIZES = {
+    "years": 3,
+    "songs": 200,
+    "recipes": 300,
+    "favorites": 100,
+    "todos": 10000,
+    "prospects": 1000,
+}
+
+
+def _days(years: int, end: date) -> list[date]:
+    start = end - timedelta(days=365 * years)
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _timestamp(d: date, rng: random.Random) -> str:
+    return datetime(d.year, d.month, d.day, rng.randrange(6, 23), rng.randrange(60), rng.randrange(60)).isoformat()
+
+
+def generate_finance(store: Storage, rng: random.Random, years: int, end: date) -> None:
+    """Transactions (~3/day), monthly budgets and accounts."""
+    months = set()
+    for d in _days(years, end):
+        months.add(d.strftime("%Y-%m"))
+        transactions = []
+        for _ in range(rng.randrange(1, 6)):
+            income = rng.random() < 0.1
+            transactions.append({
+                "id": _uuid(rng)[:8],
+                "date": d.isoformat(),
+                "amount": round(rng.uniform(500, 3000) if income else rng.uniform(2, 250), 2),
+                "type": "income" if income else "expense",
+                "category": rng.choice(INCOME_CATEGORIES if income else EXPENSE_CATEGORIES),
+                "description": f"Merchant {rng.randrange(500)}",
+                "account": rng.choice(ACCOUNTS),
+                "tags": None,
+                "notes": None,
+                "created_at": _timestamp(d, rng),
+                "updated_at": _timestamp(d, rng),
+            })
+        store.write_json(f"transactions/{d.isoformat()}.json", transactions)
+
+    for month in sorted(months):
+        store.write_json(f"budgets/{month}.json", {
+            "month": month,
+            "categories": {c: float(rng.randrange(50, 800, 50)) for c in EXPENSE_CATEGORIES},
+            "notes": None,
+            "updated_at": _timestamp(end, rng),
+        })
+
+    store.write_json("accounts/accounts.json", [
+        {"id": name, "name": name.title(), "type": name, "balance": 0.0, "notes": None}
+        for name in ACCOUNTS
+    ])
+
+
+def generate_health(store: Storage, rng: random.Random, years: int, end: date) -> None:
+    """A daily entry every day, exercises ~4 days a week, todo lists some days."""
+    for d in _days(years, end):
+        store.write_json(f"daily/{d.isoformat()}.json", {
+            "date": d.isoformat(),
+            "weight": round(rng.uniform(195, 220), 1),
+            "blood_pressure_systolic": rng.randrange(110, 140),
+            "blood_pressure_diastolic": rng.randrange(70, 90),
+            "glucose": rng.randrange(90, 120),
+            "steps": rng.randrange(2000, 15000),
+            "sleep_hours": round(rng.uniform(5, 9), 1),
+            "water_glasses": rng.randrange(0, 7),
+            "alcohol": rng.random() < 0.2,
+            "daily_exercises": rng.sample(["dumbbell_curls", "balance_left", "balance_right"], 2),
+            "coffee": True,
+            "notes": None,
+            "updated_at": _timestamp(d, rng),
+        })
+        if rng.random() < 0.6:
+            store.write_json(f"exercises/{d.isoformat()}.json", [
+                {
+                    "date": d.isoformat(),
+                    "exercise_type": rng.choice(EXERCISE_TYPES),
+                    "distance_miles": round(rng.uniform(1, 6), 1),
+                    "duration_minutes": rng.randrange(15, 90),
+                    "notes": None,
+                    "created_at": _timestamp(d, rng),
+                }
+                for _ in range(rng.randrange(1, 3))
+            ])
+        if rng.random() < 0.3:
+            store.write_json(f"todos/{d.isoformat()}.json", {
+                "date": d.isoformat(),
+                "items": [
+                    {"id": _uuid(rng), "text": f"Task {i}", "completed": rng.random() < 0.5,
+                     "created_at": _timestamp(d, rng), "completed_at": None}
+                    for i in range(rng.randrange(1, 6))
+                ],
+            })
+    store.write_json("settings.json", {"custom_daily_exercises": [], "custom_other_exercises": []})
+
+
+def generate_guitar(store: Storage, rng: random.Random, years: int, end: date, songs: int) -> None:
+    """Practice sessions ~5 days a week, tuning entries, a song library and skills."""
+    for d in _days(years, end):
+        if rng.random() < 0.7:
+            store.write_json(f"practice-log/{d.isoformat()}.json", [
+                {
+                    "date": d.isoformat(),
+                    "duration_minutes": rng.randrange(10, 90),
+                    "focus_area": rng.choice(FOCUS_AREAS),
+                    "what_worked_on": "Practice",
+                    "difficulty": rng.randrange(1, 6),
+                    "notes": None,
+                    "created_at": _timestamp(d, rng),
+                }
+                for _ in range(rng.randrange(1, 3))
+            ])
+        if rng.random() < 0.3:
+            store.write_json(f"daily/{d.isoformat()}.json", {
+                "date": d.isoformat(),
+                "tuned_acoustic": rng.random() < 0.5,
+                "tuned_electric": rng.random() < 0.3,
+                "tuned_bass": rng.random() < 0.1,
+                "updated_at": _timestamp(d, rng),
+            })
+
+    store.write_json("songs.json", [
+        {
+            "id": _uuid(rng),
+            "name": f"Song {i}",
+            "artist": f"Artist {rng.randrange(50)}",
+            "difficulty": rng.choice(["Easy", "Medium", "Hard"]),
+            "status": rng.choice(["Want to Learn", "Learning", "Can Play", "Mastered"]),
+            "progress": rng.randrange(0, 101),
+            "notes": None,
+            "resource_path": None,
+            "added_at": _timestamp(end, rng),
+            "updated_at": _timestamp(end, rng),
+        }
+        for i in range(songs)
+    ])
+    store.write_json("skills.json", {
+        "chords": {"open_chords": True, "barre_chords": False},
+        "techniques": {"chord_transitions": True},
+        "theory": {"major_scale": False},
+    })
+
+
+def generate_food(store: Storage, rng: random.Random, years: int, end: date, recipes: int, favorites: int) -> None:
+    """A food log every day (3-6 entries), plus recipes and favorites."""
+    favorite_ids = [_uuid(rng) for _ in range(favorites)]
+    for d in _days(years, end):
+        store.write_json(f"daily/{d.isoformat()}.json", {
+            "date": d.isoformat(),
+            "entries": [
+                {
+                    "id": _uuid(rng),
+                    "name": rng.choice(FOODS),
+                    "meal_type": rng.choice(MEALS),
+                    "calories": rng.randrange(50, 800),
+                    "protein_g": round(rng.uniform(0, 40), 1),
+                    "carbs_g": round(rng.uniform(0, 80), 1),
+                    "fat_g": round(rng.uniform(0, 30), 1),
+                    "notes": None,
+                    "recipe_id": rng.choice(favorite_ids) if rng.random() < 0.3 else None,
+                    "created_at": _timestamp(d, rng),
+                }
+                for _ in range(rng.randrange(3, 7))
+            ],
+            "notes": None,
+            "updated_at": _timestamp(d, rng),
+        })
+
+    store.write_json("recipes.json", [
+        {
+            "id": _uuid(rng),
+            "name": f"Recipe {i}",
+            "description": "A synthetic recipe",
+            "ingredients": [rng.choice(FOODS) for _ in range(rng.randrange(3, 10))],
+            "instructions": "Cook it. " * rng.randrange(5, 30),
+            "servings": rng.randrange(1, 8),
+            "prep_time_minutes": rng.randrange(5, 60),
+            "cook_time_minutes": rng.randrange(5, 120),
+            "calories_per_serving": rng.randrange(100, 900),
+            "protein_g": None,
+            "carbs_g": None,
+            "fat_g": None,
+            "tags": rng.sample(["quick", "healthy", "comfort food", "soup", "vegetarian"], 2),
+            "image": None,
+            "created_at": _timestamp(end, rng),
+            "updated_at": _timestamp(end, rng),
+        }
+        for i in range(recipes)
+    ])
+    store.write_json("favorites.json", [
+        {
+            "id": favorite_id,
+            "name": f"Favorite {i}",
+            "default_meal_type": rng.choice(MEALS),
+            "calories": rng.randrange(20, 600),
+            "protein_g": None,
+            "carbs_g": None,
+            "fat_g": None,
+            "use_count": rng.randrange(0, 200),
+            "created_at": _timestamp(end, rng),
+            "updated_at": _timestamp(end, rng),
+        }
+        for i, favorite_id in enumerate(favorite_ids)
+    ])
+
+
+def generate_todo(store: Storage, rng: random.Random, todos: int, end: date) -> None:
+    """One todos.json with a mix of todos, shopping items and notes."""
+    items = []
+    for i in range(todos):
+        list_type = rng.choice(["todo", "todo", "shopping", "notes"])
+        d = end - timedelta(days=rng.randrange(730))
+        items.append({
+            "id": _uuid(rng),
+            "text": f"Item {i}",
+            "completed": rng.random() < 0.6,
+            "due_date": (d + timedelta(days=7)).isoformat() if rng.random() < 0.3 else None,
+            "priority": rng.choice([None, "low", "medium", "high"]),
+            "category": rng.choice([None, "home", "work", "errands"]),
+            "list_type": list_type,
+            "store": rng.choice(STORES) if list_type == "shopping" else None,
+            "created_at": _timestamp(d, rng),
+            "updated_at": _timestamp(d, rng),
+        })
+    store.write_json("todos/todos.json", items)
+
+
+def generate_sales(store: Storage, rng: random.Random, prospects: int, end: date) -> None:
+    """One prospects.json with a full checklist per prospect."""
+    items = []
+    for i in range(prospects):
+        d = end - timedelta(days=rng.randrange(730))
+        items.append({
+            "id": _uuid(rng),
+            "name": f"Prospect {i}",
+            "vertical": rng.choice([None, "life", "build", "legal"]),
+            "checklist": [
+                {
+                    "item": item,
+                    "completed": (done := rng.random() < 0.4),
+                    "completed_at": _timestamp(d, rng) if done else None,
+                    "notes": None,
+                }
+                for item in CHECKLIST_ITEMS
+            ],
+            "status": rng.choice(["active", "active", "won", "lost"]),
+            "notes": None,
+            "created_at": _timestamp(d, rng),
+            "updated_at": _timestamp(d, rng),
+        })
+    store.write_json("prospects.json", items)
+
+
+def generate_all(root: Path, seed: int = 42, end: date = None, **sizes) -> dict[str, Path]:
+    """
+    Generate data for all six apps under root/<app>/ and return the directories.
+
+    Sizes default to DEFAULT_SIZES; pass e.g. years=5 or todos=20000 to override.
+    """
+    sizes = {**DEFAULT_SIZES, **sizes}
+    end = end or date.today()
+    dirs = {}
+
+    def store_for(app_name: str) -> Storage:
+        dirs[app_name] = root / app_name
+        # Fresh seeded RNG per app, so one app's size never shifts another's data.
+        # Configured by the app, so indexed collections are written one item per line.
+        store = get_storage(app_name, str(dirs[app_name]))
+        load(app_name, "storage").configure(store)
+        return store
+
+    generate_finance(store_for("finance"), random.Random(f"{seed}-finance"), sizes["years"], end)
+    generate_health(store_for("health"), random.Random(f"{seed}-health"), sizes["years"], end)
+    generate_guitar(store_for("guitar"), random.Random(f"{seed}-guitar"), sizes["years"], end, sizes["songs"])
+    generate_food(store_for("food"), random.Random(f"{seed}-food"), sizes["years"], end,
+                  sizes["recipes"], sizes["favorites"])
+    generate_todo(store_for("todo"), random.Random(f"{seed}-todo"), sizes["todos"], end)
+    generate_sales(store_for("sales"), random.Random(f"{seed}-sales"), sizes["prospects"], end)
+    return dirs
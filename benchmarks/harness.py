@@ -0,0 +1,102 @@
+"""
+Helpers shared by the benchmark scenarios: loading the backends against a
+generated data directory, timing calls and an in-process ASGI client.
+"""
+
+import asyncio
+import math
+import statistics
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Awaitable, Callable, Optional
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "shared"))
+
+from gb_shared.apps import APPS, backend_dir, load  # noqa: E402
+from gb_shared.storage import get_storage  # noqa: E402
+
+# Extra modules each app's scenarios use besides storage and main
+EXTRA_MODULES = {
+    "finance": ["analytics"],
+    "guitar": ["stats"],
+}
+
+
+def load_backends(data_dirs: dict[str, Path]) -> dict[str, SimpleNamespace]:
+    """Import every backend and point its storage module at the given data directory."""
+    backends = {}
+    for name in APPS:
+        storage_module = load(name, "storage")
+        storage_module.configure(get_storage(name, str(data_dirs[name])))
+        backend = SimpleNamespace(storage=storage_module, main=load(name, "main"))
+        for module in EXTRA_MODULES.get(name, []):
+            setattr(backend, module, load(name, module))
+        backends[name] = backend
+    return backends
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    """Nearest-rank percentile: the smallest sample with at least q of the samples at or below it."""
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def summarize(samples: list[float]) -> dict:
+    """Latency statistics in milliseconds."""
+    ordered = sorted(samples)
+    return {
+        "runs": len(ordered),
+        "min_ms": round(ordered[0] * 1000, 4),
+        "median_ms": round(statistics.median(ordered) * 1000, 4),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 4),
+        "p95_ms": round(_percentile(ordered, 0.95) * 1000, 4),
+        "p99_ms": round(_percentile(ordered, 0.99) * 1000, 4),
+        "max_ms": round(ordered[-1] * 1000, 4),
+    }
+
+
+def time_sync(fn: Callable[[], object], repeat: int, warmup: int = 1,
+              setup: Optional[Callable[[], object]] = None) -> dict:
+    """Time a synchronous callable, calling `setup` (untimed) before each call."""
+    for _ in range(warmup):
+        if setup is not None:
+            setup()
+        fn()
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+async def time_async(fn: Callable[[], Awaitable[object]], repeat: int, warmup: int = 1,
+                     setup: Optional[Callable[[], object]] = None) -> dict:
+    """Time an async callable, calling `setup` (untimed) before each call."""
+    for _ in range(warmup):
+        if setup is not None:
+            setup()
+        await fn()
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+def asgi_client(app):
+    """An httpx client that calls the ASGI app in-process, with no network."""
+    import httpx
+
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+
+
+def run_async(coro):
+    return asyncio.run(coro)
@@ -0,0 +1,117 @@
+"""
+Benchmark scenarios: each storage module's hot functions and the HTTP
+endpoints that sit on top of them.
+"""
+
+from datetime import date, timedelta
+from types import SimpleNamespace
+from typing import Callable, NamedTuple, Optional
+
+
+class Scenario(NamedTuple):
+    name: str
+    app: str
+    # "storage": call(); "http": request (method, path, json body)
+    call: Optional[Callable[[], object]] = None
+    request: Optional[tuple[str, str, Optional[dict]]] = None
+    writes: bool = False
+
+    @property
+    def kind(self) -> str:
+        return "storage" if self.call else "http"
+
+
+def _get(path: str) -> tuple[str, str, None]:
+    return ("GET", path, None)
+
+
+def build(backends: dict[str, SimpleNamespace], end: date) -> list[Scenario]:
+    """All scenarios for data generated with the given end date."""
+    finance = backends["finance"]
+    health = backends["health"]
+    guitar = backends["guitar"]
+    food = backends["food"]
+    todo = backends["todo"]
+    sales = backends["sales"]
+
+    month = end.strftime("%Y-%m")
+    year_ago = (end - timedelta(days=365)).strftime("%Y-%m")
+    day = end.isoformat()
+
+    # Worst-case lookups: the oldest transaction, the last entry of each list file
+    oldest_key = finance.storage._storage.list_keys("transactions/", ".json")[0]
+    oldest_transaction = finance.storage._storage.read_json(oldest_key)[0]["id"]
+    last_song = guitar.storage.load_songs()[-1]["id"]
+    last_recipe = food.storage.load_recipes()[-1]["id"]
+    last_todo = todo.storage.load_todos()[-1]["id"]
+    last_prospect = sales.storage.get_all_prospects()[-1]["id"]
+
+    return [
+        # ---- finance ----
+        Scenario("finance.get_all_transactions", "finance", call=lambda: finance.storage.get_all_transactions(100)),
+        Scenario("finance.get_transaction_oldest", "finance",
+                 call=lambda: finance.storage.get_transaction(oldest_transaction)),
+        Scenario("finance.generate_monthly_report", "finance",
+                 call=lambda: finance.storage.generate_monthly_report(month)),
+        Scenario("finance.iter_transactions_all", "finance",
+                 call=lambda: sum(1 for _ in finance.storage.iter_transactions())),
+        Scenario("finance.analytics_category_matrix", "finance",
+                 call=lambda: finance.analytics.category_matrix(year_ago, month)),
+        Scenario("finance.account_balance", "finance",
+                 call=lambda: finance.storage.get_account_balance("checking")),
+        Scenario("finance.http.transactions", "finance", request=_get("/transactions?limit=100")),
+        Scenario("finance.http.report", "finance", request=_get(f"/reports/{month}")),
+        Scenario("finance.http.budgets", "finance", request=_get("/budgets")),
+        Scenario("finance.http.export_ndjson", "finance",
+                 request=_get(f"/export/transactions?format=ndjson&start={year_ago}-01")),
+        Scenario("finance.save_transaction", "finance", writes=True, call=lambda: finance.storage.save_transaction({
+            "date": day, "amount": 9.99, "type": "expense", "category": "Other",
+            "description": "bench", "account": "checking"})),
+
+        # ---- health ----
+        Scenario("health.get_all_daily_entries", "health", call=lambda: health.storage.get_all_daily_entries(30)),
+        Scenario("health.get_all_exercise_entries", "health",
+                 call=lambda: health.storage.get_all_exercise_entries(30)),
+        Scenario("health.get_daily_entry", "health", call=lambda: health.storage.get_daily_entry(end)),
+        Scenario("health.http.daily_list", "health", request=_get("/daily?limit=30")),
+        Scenario("health.http.daily_today", "health", request=_get(f"/daily/{day}")),
+        Scenario("health.save_exercise_entry", "health", writes=True, call=lambda: health.storage.save_exercise_entry({
+            "date": day, "exercise_type": "Walk", "duration_minutes": 30})),
+        Scenario("health.save_daily_entry", "health", writes=True, call=lambda: health.storage.save_daily_entry({
+            "date": day, "weight": 200.0, "coffee": True})),
+
+        # ---- guitar ----
+        Scenario("guitar.get_stats", "guitar", call=lambda: guitar.stats.get_stats()),
+        Scenario("guitar.get_days_since_last_tuning", "guitar",
+                 call=lambda: guitar.storage.get_days_since_last_tuning()),
+        Scenario("guitar.get_song_last", "guitar", call=lambda: guitar.storage.get_song(last_song)),
+        Scenario("guitar.http.stats", "guitar", request=_get("/stats")),
+        Scenario("guitar.http.tuning_stats", "guitar", request=_get("/tuning-stats")),
+        Scenario("guitar.http.songs", "guitar", request=_get("/songs")),
+        Scenario("guitar.save_practice_session", "guitar", writes=True,
+                 call=lambda: guitar.storage.save_practice_session({
+                     "date": day, "duration_minutes": 20, "focus_area": "Chords", "what_worked_on": "bench"})),
+
+        # ---- food ----
+        Scenario("food.get_all_daily_logs", "food", call=lambda: food.storage.get_all_daily_logs(30)),
+        Scenario("food.get_recipe_last", "food", call=lambda: food.storage.get_recipe(last_recipe)),
+        Scenario("food.get_top_favorites", "food", call=lambda: food.storage.get_top_favorites(10)),
+        Scenario("food.http.daily_today", "food", request=_get(f"/daily/{day}")),
+        Scenario("food.http.recipes", "food", request=_get("/recipes")),
+        Scenario("food.http.favorites_top", "food", request=_get("/favorites?top=10")),
+        Scenario("food.add_food_entry", "food", writes=True,
+                 call=lambda: food.storage.add_food_entry(end, {"name": "bench", "meal_type": "snack"})),
+
+        # ---- todo ----
+        Scenario("todo.load_todos", "todo", call=lambda: todo.storage.load_todos()),
+        Scenario("todo.get_todo_last", "todo", call=lambda: todo.storage.get_todo(last_todo)),
+        Scenario("todo.http.todos_open", "todo", request=_get("/todos?completed=false")),
+        Scenario("todo.toggle_todo", "todo", writes=True, call=lambda: todo.storage.toggle_todo(last_todo)),
+
+        # ---- sales ----
+        Scenario("sales.get_all_prospects", "sales", call=lambda: sales.storage.get_all_prospects()),
+        Scenario("sales.get_prospect_last", "sales", call=lambda: sales.storage.get_prospect(last_prospect)),
+        Scenario("sales.http.prospects", "sales", request=_get("/prospects")),
+        Scenario("sales.update_checklist_item", "sales", writes=True,
+                 call=lambda: sales.storage.update_checklist_item(last_prospect, "demo", True)),
+    ]
@@ -0,0 +1,121 @@
+"""
+Load test: concurrent identical requests for an expensive derived endpoint.
+
+Several tabs or devices polling /stats or /reports/{month} at once send the
+same request at the same moment. Each round fires --concurrency identical
+requests together, with the result cache emptied first, so every request
+misses. Each endpoint is served two ways:
+- The real app, where the cached function is single-flight: the first
+  request runs the scan and the others wait for it and share its result.
+- A baseline app calling the undecorated function, so every request runs
+  its own scan. That is how these endpoints ran before.
+
+Storage reads sleep --latency-ms per key, as in async_load.py. For each
+endpoint and mode it reports the storage reads and bytes per round and the
+request latency (p50/p99).
+
+Usage:
+    python -m benchmarks.single_flight [--latency-ms 1] [--concurrency 20] [--rounds 10]
+"""
+
+import argparse
+import asyncio
+import json
+import tempfile
+from datetime import date
+from pathlib import Path
+
+from fastapi import FastAPI
+
+from . import generators
+from .async_load import inject_latency, timed_get
+from .harness import asgi_client, load_backends, summarize
+
+
+def endpoints(backends, month: str) -> list[tuple[str, str, object, object]]:
+    """(app, path, cached function, call of the undecorated function) for each endpoint."""
+    finance, guitar = backends["finance"], backends["guitar"]
+    report = finance.storage.agenerate_monthly_report
+    stats = guitar.stats._aget_stats
+    return [
+        ("guitar", "/stats", stats, lambda: stats.__wrapped__(date.today())),
+        ("finance", f"/reports/{month}", report, lambda: report.__wrapped__(month)),
+    ]
+
+
+def baseline_app(path: str, call) -> FastAPI:
+    app = FastAPI()
+
+    async def handler():
+        return await call()
+
+    app.add_api_route(path, handler, methods=["GET"])
+    return app
+
+
+async def load(app, path: str, storage, cache, concurrency: int, rounds: int) -> dict:
+    """Rounds of `concurrency` simultaneous requests, each round starting from an empty cache."""
+    io = {"reads": 0, "bytes": 0}
+
+    def on_read(event):
+        io["reads"] += 1
+        io["bytes"] += event.bytes
+
+    handle = storage.add_observer(on_read=on_read, on_list=on_read)
+    samples = []
+    try:
+        async with asgi_client(app) as client:
+            await timed_get(client, path)
+            io.update(reads=0, bytes=0)
+            for _ in range(rounds):
+                cache.clear()
+                samples += await asyncio.gather(*(timed_get(client, path) for _ in range(concurrency)))
+    finally:
+        storage.remove_observer(handle)
+
+    return {
+        "reads_per_round": round(io["reads"] / rounds, 1),
+        "kb_read_per_round": round(io["bytes"] / rounds / 1024, 1),
+        **summarize(samples),
+    }
+
+
+async def run(args) -> dict:
+    end = date.today()
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="gb-bench-") as tmp:
+        data_dirs = generators.generate_all(Path(tmp), seed=42, end=end, years=1)
+        backends = load_backends(data_dirs)
+        for backend in backends.values():
+            inject_latency(backend.storage._storage, args.latency_ms / 1000)
+
+        print(f"{'endpoint':<26} {'mode':<14} {'reads/round':>11} {'KB/round':>9} {'p50 ms':>9} {'p99 ms':>9}")
+        for app_name, path, fn, call in endpoints(backends, end.strftime("%Y-%m")):
+            name = f"{app_name}{path}"
+            storage = backends[app_name].storage._storage
+            independent = await load(baseline_app(path, call), path, storage, fn.cache,
+                                     args.concurrency, args.rounds)
+            coalesced = await load(backends[app_name].main.app, path, storage, fn.cache,
+                                   args.concurrency, args.rounds)
+            results[name] = {"independent": independent, "single_flight": coalesced}
+            for mode, r in (("independent", independent), ("single-flight", coalesced)):
+                print(f"{name:<26} {mode:<14} {r['reads_per_round']:>11.1f} {r['kb_read_per_round']:>9.1f} "
+                      f"{r['median_ms']:>9.1f} {r['p99_ms']:>9.1f}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent identical requests, with and without single-flight.")
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="Sleep per key read or listing")
+    parser.add_argument("--concurrency", type=int, default=20, help="Identical requests per round")
+    parser.add_argument("--rounds", type=int, default=10, help="Rounds per endpoint and mode")
+    parser.add_argument("--output", help="Write results JSON to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Cold-start profiler: imports each backend in a fresh interpreter under
+`python -X importtime` and reports where its startup time goes.
+
+Usage:
+    python -m benchmarks.startup                    # every app, summary + budgets
+    python -m benchmarks.startup finance --tree     # import tree for one app
+    python -m benchmarks.startup --tree --depth 4 --min-ms 5
+
+Each run is `python -X importtime -c "import app.main"` from the app's
+backend directory, which is what uvicorn does before serving the first
+request. "own" time is the self time of the app package and the shared
+packages; everything else is third-party (mostly FastAPI and pydantic).
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from typing import NamedTuple, Optional
+
+from .harness import APPS, backend_dir
+
+# Cumulative import time of app.main, and the share of it spent in our own code
+IMPORT_BUDGET_MS = 1500.0
+OWN_BUDGET_MS = 150.0
+
+# Modules that must not load at startup; they are imported on first use
+LAZY_MODULES = {
+    "finance": ["numpy"],
+}
+
+OWN_PACKAGES = {"app", "gb_shared"}
+
+
+class ImportNode(NamedTuple):
+    name: str
+    self_us: int
+    cumulative_us: int
+    children: list
+
+
+def parse_importtime(output: str) -> list[ImportNode]:
+    """Build the import tree from `-X importtime` output (children are printed before parents)."""
+    pending: dict[int, list[ImportNode]] = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        node = ImportNode(name.strip(), int(self_us), int(cumulative_us), pending.pop(level + 1, []))
+        pending.setdefault(level, []).append(node)
+    return pending.get(0, [])
+
+
+def walk(nodes: list[ImportNode]):
+    for node in nodes:
+        yield node
+        yield from walk(node.children)
+
+
+def profile_app(app_name: str) -> dict:
+    """Import one app's main module in a fresh interpreter and break down the time."""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=backend_dir(app_name),
+        capture_output=True,
+        text=True,
+    )
+    wall = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"{app_name}: import app.main failed\n{result.stderr[-2000:]}")
+
+    roots = parse_importtime(result.stderr)
+    main = next(node for node in roots if node.name == "app.main")
+    by_package: dict[str, int] = {}
+    for node in walk([main]):
+        package = node.name.split(".")[0]
+        by_package[package] = by_package.get(package, 0) + node.self_us
+
+    modules = {node.name for node in walk(roots)}
+    return {
+        "import_ms": main.cumulative_us / 1000,
+        "own_ms": sum(us for package, us in by_package.items() if package in OWN_PACKAGES) / 1000,
+        "wall_ms": wall * 1000,
+        "by_package": {package: us / 1000 for package, us in sorted(by_package.items(), key=lambda i: -i[1])},
+        "eager": [m for m in LAZY_MODULES.get(app_name, []) if m in modules],
+        "tree": main,
+    }
+
+
+def measure(app_name: str, runs: int) -> dict:
+    """Median of several cold imports, checked against the startup budgets."""
+    profiles = [profile_app(app_name) for _ in range(runs)]
+    median = {key: statistics.median(p[key] for p in profiles) for key in ("import_ms", "own_ms", "wall_ms")}
+    fastest = min(profiles, key=lambda p: p["import_ms"])
+
+    violations = []
+    if median["import_ms"] > IMPORT_BUDGET_MS:
+        violations.append(f"import {median['import_ms']:.0f} ms > budget {IMPORT_BUDGET_MS:.0f} ms")
+    if median["own_ms"] > OWN_BUDGET_MS:
+        violations.append(f"own code {median['own_ms']:.0f} ms > budget {OWN_BUDGET_MS:.0f} ms")
+    for module in fastest["eager"]:
+        violations.append(f"{module} is imported at startup")
+
+    return {
+        "runs": runs,
+        **{key: round(value, 3) for key, value in median.items()},
+        "by_package": {package: round(ms, 3) for package, ms in list(fastest["by_package"].items())[:10]},
+        "violations": violations,
+        "tree": fastest["tree"],
+    }
+
+
+def print_tree(node: ImportNode, depth: int, min_ms: float, level: int = 0) -> None:
+    print(f"{node.cumulative_us / 1000:>10.1f} ms  {'  ' * level}{node.name}")
+    if level + 1 >= depth:
+        return
+    for child in sorted(node.children, key=lambda c: -c.cumulative_us):
+        if child.cumulative_us / 1000 >= min_ms:
+            print_tree(child, depth, min_ms, level + 1)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup", description=__doc__.splitlines()[1])
+    parser.add_argument("apps", nargs="*", metavar="app", help="Apps to profile (default all)")
+    parser.add_argument("--runs", type=int, default=5, help="Cold imports per app (default 5)")
+    parser.add_argument("--tree", action="store_true", help="Print the import tree")
+    parser.add_argument("--depth", type=int, default=3, help="Tree depth to print (default 3)")
+    parser.add_argument("--min-ms", type=float, default=2.0, help="Hide tree nodes faster than this")
+    args = parser.parse_args(argv)
+    unknown = set(args.apps) - set(APPS)
+    if unknown:
+        parser.error(f"unknown app(s): {', '.join(sorted(unknown))}")
+
+    failed = False
+    for app_name in args.apps or APPS:
+        result = measure(app_name, args.runs)
+        print(f"{app_name:<8} import {result['import_ms']:>7.1f} ms   own {result['own_ms']:>6.1f} ms"
+              f"   process {result['wall_ms']:>7.1f} ms")
+        print("         " + ", ".join(f"{p} {ms:.1f}" for p, ms in list(result["by_package"].items())[:6]))
+        for violation in result["violations"]:
+            print(f"         OVER BUDGET: {violation}")
+            failed = True
+        if args.tree:
+            print()
+            print_tree(result["tree"], args.depth, args.min_ms)
+            print()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+Benchmark: file storage vs. SQLite storage on the list-heavy scenarios.
+
+Generates one dataset, times the scenarios on the file backend, copies
+everything into SQLite (storage.sqlite.SQLiteStorage.import_from) and
+times them again.
+
+Usage:
+    python -m benchmarks.storage_backends [--repeat 20] [--years 3] [--output backends.json]
+"""
+
+import argparse
+import json
+import tempfile
+from datetime import date
+from pathlib import Path
+
+from . import generators, scenarios
+from .__main__ import run_http
+from .harness import load_backends, run_async, time_sync
+from gb_shared.storage import get_storage
+from gb_shared.storage.cache import clear_all
+
+# Scenarios that list a collection and read many keys
+LIST_HEAVY = [
+    "finance.get_all_transactions",
+    "finance.get_transaction_oldest",
+    "finance.generate_monthly_report",
+    "finance.iter_transactions_all",
+    "finance.http.transactions",
+    "finance.http.report",
+    "health.get_all_daily_entries",
+    "health.get_all_exercise_entries",
+    "health.http.daily_list",
+    "guitar.get_stats",
+    "guitar.get_days_since_last_tuning",
+    "food.get_all_daily_logs",
+]
+
+
+def time_scenarios(selected, backends, repeat: int) -> dict:
+    results = {}
+    for scenario in selected:
+        if scenario.kind == "storage":
+            results[scenario.name] = time_sync(scenario.call, repeat, setup=clear_all)
+        else:
+            results.update(run_async(run_http([scenario], backends, repeat, clear_all)))
+    return results
+
+
+def run(repeat: int, years: int) -> dict:
+    end = date.today()
+    with tempfile.TemporaryDirectory(prefix="gb-bench-") as tmp:
+        data_dirs = generators.generate_all(Path(tmp), seed=42, end=end, years=years)
+        backends = load_backends(data_dirs)
+        selected = [s for s in scenarios.build(backends, end) if s.name in LIST_HEAVY]
+
+        file_results = time_scenarios(selected, backends, repeat)
+
+        # The storage modules look up _storage on every call, so repointing is
+        # enough; configure() registers the same journaled and indexed collections
+        for name, backend in backends.items():
+            sqlite = get_storage(name, str(data_dirs[name]), backend="sqlite")
+            sqlite.import_from(backend.storage._storage)
+            backend.storage.configure(sqlite)
+        sqlite_results = time_scenarios(selected, backends, repeat)
+
+        for backend in backends.values():
+            backend.storage._storage.close()
+
+    return {name: {"file": file_results[name], "sqlite": sqlite_results[name]} for name in file_results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the file and SQLite storage backends.")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--years", type=int, default=generators.DEFAULT_SIZES["years"])
+    parser.add_argument("--output", help="Write results JSON to this file")
+    args = parser.parse_args()
+
+    results = run(args.repeat, args.years)
+    print(f"{'scenario':<40} {'file ms':>10} {'sqlite ms':>10} {'speedup':>8}")
+    for name, result in results.items():
+        file_ms, sqlite_ms = result["file"]["median_ms"], result["sqlite"]["median_ms"]
+        print(f"{name:<40} {file_ms:>10.3f} {sqlite_ms:>10.3f} {file_ms / sqlite_ms:>7.1f}x")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -27,7 +27,7 @@ sudo dnf install -y nginx git
 
 # Install Python packages globally
 echo "Installing Python packages..."
-sudo pip3.11 install fastapi uvicorn pydantic python-dateutil
+sudo pip3.11 install fastapi uvicorn pydantic python-dateutil numpy
 
 # Create app directory
 echo "Creating app directory..."
@@ -56,6 +56,7 @@ echo "========================================="
 echo ""
 echo "Next steps:"
 echo "1. Upload your code to ~/gb-apps"
-echo "2. Run: ~/gb-apps/deploy/build-frontends.sh"
-echo "3. Run: ~/gb-apps/deploy/start-all.sh"
+echo "2. Run: sudo pip3.11 install -e ~/gb-apps/shared"
+echo "3. Run: ~/gb-apps/deploy/build-frontends.sh"
+echo "4. Run: ~/gb-apps/deploy/start-all.sh"
 echo ""
@@ -0,0 +1,25 @@
+#!/bin/bash
+# use-gateway.sh - Switch from six backend services to the single-process gateway
+# Usage: ./deploy/use-gateway.sh          (switch to gateway)
+#        ./deploy/use-gateway.sh --revert (back to six services)
+
+set -e
+
+if [ "$1" == "--revert" ]; then
+    echo "Switching back to separate backend services..."
+    sudo systemctl disable --now gb-gateway
+    sudo cp ~/gb-apps/deploy/nginx.conf /etc/nginx/nginx.conf
+    sudo systemctl enable --now gb-health-api gb-guitar-api gb-finance-api gb-todo-api gb-food-api gb-sales-api
+else
+    echo "Switching to the gateway..."
+    sudo cp ~/gb-apps/deploy/services/gb-gateway.service /etc/systemd/system/
+    sudo systemctl daemon-reload
+    sudo systemctl disable --now gb-health-api gb-guitar-api gb-finance-api gb-todo-api gb-food-api gb-sales-api
+    sudo systemctl enable --now gb-gateway
+    sudo cp ~/gb-apps/deploy/nginx-gateway.conf /etc/nginx/nginx.conf
+fi
+
+sudo nginx -t
+sudo systemctl reload nginx
+
+echo "Done!"
@@ -0,0 +1 @@
+# GB Gateway
@@ -0,0 +1,98 @@
+"""
+Cross-app "today" dashboard: one request instead of a round trip per widget.
+
+build_dashboard() reads every source in SOURCES concurrently on a small
+thread pool, straight from the storage modules of the mounted apps. Those
+share this process's Storage instances, so deferred writes and pending log
+records are included. This only holds in the gateway, not next to apps
+running as separate services.
+
+Each source has its own timeout (GB_DASHBOARD_TIMEOUT seconds). A source
+that times out or fails does not hold up or fail the page. Its last good
+result for the same date is served instead, marked "stale", or null if
+there is none.
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from typing import Callable
+
+from gb_shared.apps import load
+
+TIMEOUT = float(os.environ.get("GB_DASHBOARD_TIMEOUT", "2"))
+
+# Last good result per (source, date), for sources that time out or fail
+CACHE_SIZE = 256
+
+logger = logging.getLogger("gb.dashboard")
+
+
+def _sources(day: date) -> dict[str, Callable[[], object]]:
+    """Source name ("<app>.<widget>") -> call returning its data for `day`."""
+    health, guitar, food, todo, finance, sales = (
+        load(name, "storage") for name in ("health", "guitar", "food", "todo", "finance", "sales")
+    )
+    guitar_stats = load("guitar", "stats")
+    return {
+        "health.daily": lambda: health.get_daily_entry(day),
+        "health.exercise": lambda: health.get_exercise_entries(day),
+        "health.todos": lambda: health.get_todos(day),
+        "guitar.practice": lambda: guitar.get_practice_sessions(day),
+        "guitar.tuning": guitar.get_days_since_last_tuning,
+        "guitar.stats": guitar_stats.get_stats,
+        "food.daily": lambda: food.get_daily_log(day),
+        "todo.open": lambda: [t for t in todo.load_todos() if not t.get("completed")],
+        "finance.transactions": lambda: finance.get_transactions_for_date(day),
+        "sales.active": lambda: [p for p in sales.get_all_prospects() if p.get("status") == "active"],
+    }
+
+
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="gb-dashboard")
+_last_good: OrderedDict[tuple[str, str], tuple[object, str]] = OrderedDict()
+
+
+async def _fetch(name: str, fn: Callable[[], object], day: str) -> tuple[str, object, dict]:
+    """Run one source with its timeout. Returns (name, data, status)."""
+    started = time.perf_counter()
+    call = functools.partial(contextvars.copy_context().run, fn)
+    try:
+        data = await asyncio.wait_for(asyncio.get_running_loop().run_in_executor(_executor, call), TIMEOUT)
+    except Exception as exc:
+        reason = "timeout" if isinstance(exc, asyncio.TimeoutError) else "error"
+        if reason == "error":
+            logger.exception("Dashboard source %s failed", name)
+        cached = _last_good.get((name, day))
+        if cached is None:
+            return name, None, {"status": reason}
+        return name, cached[0], {"status": "stale", "reason": reason, "as_of": cached[1]}
+
+    _last_good[(name, day)] = (data, datetime.now().isoformat())
+    _last_good.move_to_end((name, day))
+    while len(_last_good) > CACHE_SIZE:
+        _last_good.popitem(last=False)
+    return name, data, {"status": "ok", "ms": round((time.perf_counter() - started) * 1000, 2)}
+
+
+async def build_dashboard(day: date) -> dict:
+    """
+    Every app's data for one day, read concurrently.
+
+    Returns {"date", "<app>": {"<widget>": data, ...}, ..., "sources":
+    {"<app>.<widget>": {"status": "ok" | "stale" | "timeout" | "error", ...}}}.
+    """
+    results = await asyncio.gather(*(_fetch(name, fn, day.isoformat()) for name, fn in _sources(day).items()))
+    payload: dict = {"date": day.isoformat()}
+    sources = {}
+    for name, data, status in results:
+        app_name, widget = name.split(".", 1)
+        payload.setdefault(app_name, {})[widget] = data
+        sources[name] = status
+    payload["sources"] = sources
+    return payload
@@ -0,0 +1,82 @@
+"""
+GB Apps Gateway - runs all six backends in a single process.
+
+Each backend's FastAPI app is mounted under its name, so /finance/reports/...
+here is /reports/... on the standalone finance service. One interpreter
+replaces six, the apps share one Storage instance per data directory and
+one AnyIO thread pool.
+
+GET /dashboard composes a day's overview from all six apps in one round
+trip (gateway/dashboard.py).
+
+Run with:
+    uvicorn gateway.main:app --port 8010
+"""
+
+import os
+import sys
+from contextlib import asynccontextmanager
+from datetime import date, datetime
+from pathlib import Path
+from typing import Optional
+
+import anyio.to_thread
+from fastapi import FastAPI, HTTPException, Query
+
+try:
+    from gb_shared.apps import APPS, load
+except ImportError:
+    # Shared package not installed (pip install -e shared): use the source tree
+    sys.path.insert(0, str(Path(__file__).parent.parent / "shared"))
+    from gb_shared.apps import APPS, load
+from gb_shared.instrumentation import install_metrics
+
+from .dashboard import build_dashboard
+
+# Worker threads shared by every mounted app (AnyIO defaults to 40)
+THREADPOOL_SIZE = int(os.environ.get("GB_THREADPOOL_SIZE", "40"))
+
+mounted = {name: load(name).app for name in APPS}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Size the shared thread pool and run each mounted app's startup/shutdown hooks."""
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    for sub_app in mounted.values():
+        await sub_app.router.startup()
+    yield
+    for sub_app in mounted.values():
+        await sub_app.router.shutdown()
+
+
+app = FastAPI(title="GB Apps Gateway", version="1.0.0", lifespan=lifespan)
+install_metrics(app, "gateway", record_requests=False)
+
+
+@app.get("/")
+def root():
+    return {"message": "GB Apps Gateway", "apps": [f"/{name}" for name in mounted]}
+
+
+@app.get("/healthz")
+def health_check():
+    return {"status": "healthy", "apps": list(mounted), "timestamp": datetime.now().isoformat()}
+
+
+@app.get("/dashboard")
+async def dashboard(date_str: Optional[str] = Query(None, alias="date")):
+    """
+    Overview of one day (default today) from all six apps in one request.
+
+    Sources are read concurrently with a per-source timeout; see gateway/dashboard.py.
+    """
+    try:
+        day = date.fromisoformat(date_str) if date_str else date.today()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+    return await build_dashboard(day)
+
+
+for name, sub_app in mounted.items():
+    app.mount(f"/{name}", sub_app)
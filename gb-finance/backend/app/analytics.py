@@ -0,0 +1,212 @@
+"""
+Multi-month analytics for GB Finance.
+
+Transactions are loaded once into columnar numpy arrays and cached until the
+next transaction write, by this process or another (storage.transactions_version()
+includes the day files' signature). Every query is then a vectorized group-by over those
+arrays instead of a re-scan of the transactions/ day files.
+"""
+
+import threading
+from datetime import date
+from typing import Optional
+
+import numpy as np
+from gb_shared.instrumentation import record_cache
+
+from . import storage
+
+TYPE_CODES = {"income": 0, "expense": 1, "transfer": 2}
+
+_lock = threading.Lock()
+_columns: Optional[dict] = None
+_columns_version: Optional[tuple] = None
+
+
+def month_index(month: str) -> int:
+    """Convert YYYY-MM to a month number (year * 12 + month - 1)."""
+    year, mon = month.split("-")
+    if len(year) != 4 or not 1 <= int(mon) <= 12:
+        raise ValueError(f"Invalid month '{month}'. Use YYYY-MM")
+    return int(year) * 12 + int(mon) - 1
+
+
+def month_label(index: int) -> str:
+    """Convert a month number back to YYYY-MM."""
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def default_range(months: int = 12) -> tuple[str, str]:
+    """The trailing `months` months, ending with the current month."""
+    end = date.today().year * 12 + date.today().month - 1
+    return month_label(end - months + 1), month_label(end)
+
+
+def load_columns() -> dict:
+    """Return the cached columnar arrays, reloading if any transaction changed."""
+    global _columns, _columns_version
+
+    version = storage.transactions_version()
+    with _lock:
+        if _columns is not None and _columns_version == version:
+            record_cache("finance_analytics", hit=True)
+            return _columns
+        record_cache("finance_analytics", hit=False)
+
+        ordinals, amounts, types, category_codes = [], [], [], []
+        categories: dict[str, int] = {}
+        for t in storage.iter_transactions():
+            try:
+                ordinals.append(date.fromisoformat(t["date"]).toordinal())
+            except (KeyError, ValueError):
+                continue
+            amounts.append(float(t.get("amount", 0)))
+            types.append(TYPE_CODES.get(t.get("type", "expense"), TYPE_CODES["expense"]))
+            category = t.get("category") or "Uncategorized"
+            category_codes.append(categories.setdefault(category, len(categories)))
+
+        dates = np.array(ordinals, dtype=np.int64)
+        # Month number of each date, derived once at load time
+        months = np.array(
+            [d.year * 12 + d.month - 1 for d in map(date.fromordinal, ordinals)],
+            dtype=np.int64,
+        )
+
+        _columns = {
+            "dates": dates,
+            "months": months,
+            "amounts": np.array(amounts, dtype=np.float64),
+            "types": np.array(types, dtype=np.int8),
+            "categories": np.array(category_codes, dtype=np.int64),
+            "category_names": list(categories),
+        }
+        _columns_version = version
+        return _columns
+
+
+def _month_matrix(cols: dict, first: int, last: int, trans_type: str) -> np.ndarray:
+    """Sum amounts into a (category x month) matrix for months first..last."""
+    n_cats = len(cols["category_names"])
+    n_months = last - first + 1
+    mask = (
+        (cols["types"] == TYPE_CODES[trans_type])
+        & (cols["months"] >= first)
+        & (cols["months"] <= last)
+    )
+    flat = cols["categories"][mask] * n_months + (cols["months"][mask] - first)
+    sums = np.bincount(flat, weights=cols["amounts"][mask], minlength=n_cats * n_months)
+    return sums.reshape(n_cats, n_months)
+
+
+def _drop_empty_rows(names: list[str], *matrices: np.ndarray) -> tuple[list[str], list[np.ndarray]]:
+    """Remove categories that have no activity in any of the matrices."""
+    keep = np.zeros(len(names), dtype=bool)
+    for m in matrices:
+        keep |= np.abs(m).sum(axis=1) > 0
+    return [n for n, k in zip(names, keep) if k], [m[keep] for m in matrices]
+
+
+def category_matrix(start: str, end: str, trans_type: str = "expense") -> dict:
+    """Totals per category per month, with row and column totals."""
+    first, last = month_index(start), month_index(end)
+    cols = load_columns()
+    names, (matrix,) = _drop_empty_rows(cols["category_names"], _month_matrix(cols, first, last, trans_type))
+
+    return {
+        "type": trans_type,
+        "months": [month_label(m) for m in range(first, last + 1)],
+        "categories": names,
+        "values": np.round(matrix, 2).tolist(),
+        "category_totals": dict(zip(names, np.round(matrix.sum(axis=1), 2).tolist())),
+        "month_totals": np.round(matrix.sum(axis=0), 2).tolist(),
+    }
+
+
+def yearly_matrix(start_year: int, end_year: int, trans_type: str = "expense") -> dict:
+    """Totals per category per calendar year, for year-over-year comparison."""
+    first, last = start_year * 12, end_year * 12 + 11
+    cols = load_columns()
+    monthly = _month_matrix(cols, first, last, trans_type)
+    yearly = monthly.reshape(monthly.shape[0], end_year - start_year + 1, 12).sum(axis=2)
+    names, (yearly,) = _drop_empty_rows(cols["category_names"], yearly)
+
+    changes = np.full(yearly.shape, np.nan)
+    changes[:, 1:] = np.divide(
+        yearly[:, 1:] - yearly[:, :-1],
+        yearly[:, :-1],
+        out=np.full(yearly[:, 1:].shape, np.nan),
+        where=yearly[:, :-1] != 0,
+    ) * 100
+
+    return {
+        "type": trans_type,
+        "years": list(range(start_year, end_year + 1)),
+        "categories": names,
+        "values": np.round(yearly, 2).tolist(),
+        "percent_change": [
+            [None if np.isnan(v) else round(float(v), 1) for v in row] for row in changes
+        ],
+    }
+
+
+def trailing_average(start: str, end: str, window: int = 3, trans_type: str = "expense") -> dict:
+    """Average monthly total per category over the `window` months ending at each month."""
+    first, last = month_index(start), month_index(end)
+    cols = load_columns()
+
+    # Include the months before `start` so every output month has a full window
+    matrix = _month_matrix(cols, first - window + 1, last, trans_type)
+    cumulative = np.concatenate([np.zeros((matrix.shape[0], 1)), matrix.cumsum(axis=1)], axis=1)
+    averages = (cumulative[:, window:] - cumulative[:, :-window]) / window
+    names, (averages,) = _drop_empty_rows(cols["category_names"], averages)
+
+    return {
+        "type": trans_type,
+        "window": window,
+        "months": [month_label(m) for m in range(first, last + 1)],
+        "categories": names,
+        "values": np.round(averages, 2).tolist(),
+    }
+
+
+def budget_variance(start: str, end: str) -> dict:
+    """Budgeted vs actual expense per category per month."""
+    first, last = month_index(start), month_index(end)
+    cols = load_columns()
+    months = [month_label(m) for m in range(first, last + 1)]
+
+    names = list(cols["category_names"])
+    budgets = [storage.get_budget(m) or {} for m in months]
+    for budget in budgets:
+        for category in budget.get("categories", {}):
+            if category not in names:
+                names.append(category)
+
+    actual = np.zeros((len(names), len(months)))
+    spent = _month_matrix(cols, first, last, "expense")
+    actual[:spent.shape[0]] = spent
+
+    budgeted = np.zeros_like(actual)
+    positions = {name: i for i, name in enumerate(names)}
+    for j, budget in enumerate(budgets):
+        for category, amount in budget.get("categories", {}).items():
+            budgeted[positions[category], j] = amount
+
+    names, (budgeted, actual) = _drop_empty_rows(names, budgeted, actual)
+    variance = budgeted - actual
+
+    return {
+        "months": months,
+        "categories": names,
+        "budgeted": np.round(budgeted, 2).tolist(),
+        "actual": np.round(actual, 2).tolist(),
+        "variance": np.round(variance, 2).tolist(),
+        "totals": {
+            name: {
+                "budgeted": round(float(b), 2),
+                "actual": round(float(a), 2),
+                "variance": round(float(b - a), 2),
+            }
+            for name, b, a in zip(names, budgeted.sum(axis=1), actual.sum(axis=1))
+        },
+    }
@@ -0,0 +1,71 @@
+"""
+Streaming export formats for GB Finance transactions.
+
+Each generator pulls from storage.iter_transactions() and yields one encoded
+row at a time, so memory stays flat no matter how large the date range is.
+"""
+
+import csv
+import io
+import json
+from datetime import date
+from typing import Iterator, Optional
+
+from . import storage
+
+CSV_COLUMNS = [
+    "id",
+    "date",
+    "type",
+    "category",
+    "description",
+    "amount",
+    "account",
+    "tags",
+    "notes",
+    "created_at",
+    "updated_at",
+]
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def iter_csv(start: Optional[date] = None, end: Optional[date] = None) -> Iterator[str]:
+    """Yield the export as CSV text, header first."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush() -> str:
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return text
+
+    writer.writerow(CSV_COLUMNS)
+    yield flush()
+
+    for t in storage.iter_transactions(start, end):
+        row = []
+        for column in CSV_COLUMNS:
+            value = t.get(column)
+            if column == "tags":
+                value = ";".join(value or [])
+            row.append("" if value is None else value)
+        writer.writerow(row)
+        yield flush()
+
+
+def iter_ndjson(start: Optional[date] = None, end: Optional[date] = None) -> Iterator[str]:
+    """Yield the export as newline-delimited JSON, one transaction per line."""
+    for t in storage.iter_transactions(start, end):
+        yield json.dumps(t) + "\n"
+
+
+def iter_export(fmt: str, start: Optional[date] = None, end: Optional[date] = None) -> Iterator[str]:
+    """Yield the export in the requested format ('csv' or 'ndjson')."""
+    if fmt == "csv":
+        return iter_csv(start, end)
+    return iter_ndjson(start, end)
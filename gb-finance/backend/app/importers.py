@@ -0,0 +1,153 @@
+"""
+Bank statement parsers for GB Finance bulk import.
+
+Both parsers return (transactions, errors): transaction dicts validated
+against the Transaction model, plus a message for each row that could not
+be parsed.
+"""
+
+import csv
+import io
+import re
+from datetime import datetime
+from typing import Optional
+
+from pydantic import ValidationError
+
+from .models import Transaction
+
+# Header aliases commonly used by bank CSV exports
+CSV_ALIASES = {
+    "date": ["date", "posted date", "posting date", "transaction date"],
+    "amount": ["amount"],
+    "description": ["description", "payee", "name", "memo"],
+    "category": ["category"],
+    "type": ["type"],
+    "account": ["account"],
+    "notes": ["notes"],
+    "tags": ["tags"],
+}
+
+DATE_FORMATS = ["%Y-%m-%d", "%m/%d/%Y", "%m/%d/%y", "%d.%m.%Y"]
+
+
+def _parse_date(value: str) -> str:
+    """Parse a statement date into YYYY-MM-DD."""
+    value = value.strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date().isoformat()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognized date '{value}'")
+
+
+def _build_transaction(
+    date_str: str,
+    amount: float,
+    description: str,
+    account: Optional[str],
+    category: Optional[str] = None,
+    trans_type: Optional[str] = None,
+    notes: Optional[str] = None,
+    tags: Optional[list[str]] = None,
+) -> dict:
+    """Turn a signed statement amount into a validated transaction dict."""
+    if not trans_type:
+        # Statements use signed amounts: money out is negative
+        trans_type = "expense" if amount < 0 else "income"
+    data = Transaction(
+        date=date_str,
+        amount=abs(amount),
+        type=trans_type.lower(),
+        category=category or "Other",
+        description=description.strip(),
+        account=account or None,
+        notes=notes or None,
+        tags=tags or None,
+    ).model_dump()
+    data["date"] = data["date"].isoformat()
+    data["type"] = data["type"].value
+    return data
+
+
+def parse_csv(text: str, account: Optional[str] = None) -> tuple[list[dict], list[str]]:
+    """Parse a CSV statement with a header row."""
+    reader = csv.DictReader(io.StringIO(text.lstrip("\ufeff")))
+    headers = {h.strip().lower(): h for h in (reader.fieldnames or [])}
+
+    columns = {}
+    for field, aliases in CSV_ALIASES.items():
+        for alias in aliases:
+            if alias in headers:
+                columns[field] = headers[alias]
+                break
+
+    missing = [f for f in ("date", "amount", "description") if f not in columns]
+    if missing:
+        return [], [f"Missing required column(s): {', '.join(missing)}"]
+
+    def get(row: dict, field: str) -> Optional[str]:
+        column = columns.get(field)
+        value = row.get(column) if column else None
+        return value.strip() if value else None
+
+    transactions = []
+    errors = []
+    for line_no, row in enumerate(reader, start=2):
+        try:
+            amount = float(get(row, "amount").replace(",", "").replace("$", ""))
+            tags = get(row, "tags")
+            transactions.append(_build_transaction(
+                _parse_date(get(row, "date")),
+                amount,
+                get(row, "description") or "",
+                get(row, "account") or account,
+                category=get(row, "category"),
+                trans_type=get(row, "type"),
+                notes=get(row, "notes"),
+                tags=[t.strip() for t in tags.split(";") if t.strip()] if tags else None,
+            ))
+        except (AttributeError, ValueError, ValidationError) as e:
+            errors.append(f"Line {line_no}: {e}")
+
+    return transactions, errors
+
+
+_OFX_BLOCK = re.compile(r"<STMTTRN>(.*?)(?:</STMTTRN>|(?=<STMTTRN>)|(?=</BANKTRANLIST>))", re.S | re.I)
+_OFX_FIELD = re.compile(r"<(\w+)>([^<\r\n]*)")
+_OFX_ACCTID = re.compile(r"<ACCTID>([^<\r\n]*)", re.I)
+
+
+def parse_ofx(text: str, account: Optional[str] = None) -> tuple[list[dict], list[str]]:
+    """Parse the STMTTRN entries of an OFX/QFX statement (SGML or XML)."""
+    if not account:
+        match = _OFX_ACCTID.search(text)
+        account = match.group(1).strip() if match else None
+
+    transactions = []
+    errors = []
+    for n, block in enumerate(_OFX_BLOCK.findall(text), start=1):
+        fields = {tag.upper(): value.strip() for tag, value in _OFX_FIELD.findall(block)}
+        try:
+            posted = fields["DTPOSTED"][:8]
+            date_str = f"{posted[:4]}-{posted[4:6]}-{posted[6:8]}"
+            description = fields.get("NAME") or fields.get("MEMO") or ""
+            memo = fields.get("MEMO")
+            transactions.append(_build_transaction(
+                _parse_date(date_str),
+                float(fields["TRNAMT"]),
+                description,
+                account,
+                notes=memo if memo and memo != description else None,
+            ))
+        except (KeyError, ValueError, ValidationError) as e:
+            errors.append(f"Transaction {n}: {e}")
+
+    return transactions, errors
+
+
+PARSERS = {
+    "csv": parse_csv,
+    "ofx": parse_ofx,
+}
@@ -1,8 +1,12 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import Body, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from datetime import date
-from .models import Transaction, TransactionUpdate, Budget, Account
-from . import storage
+from typing import Optional
+from .models import Transaction, TransactionUpdate, TransactionBatchOp, Budget, Account
+from . import storage, export, importers
+from gb_shared.instrumentation import install_metrics, install_profiling
+from gb_shared.storage.responses import stored_json
 
 app = FastAPI(title="GB Finance API", version="1.0.0")
 
@@ -15,6 +19,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+install_metrics(app, "finance", storage._storage)
+install_profiling(app, "finance", storage._storage)
+app.add_event_handler("startup", lambda: storage._storage.start_packer(storage.DATE_COLLECTIONS))
+
 
 # ============ TRANSACTIONS ============
 
@@ -25,9 +33,55 @@ def create_transaction(transaction: Transaction):
 
 
 @app.get("/transactions")
-def list_transactions(limit: int = 100):
+async def list_transactions(limit: int = 100):
     """Get recent transactions."""
-    return storage.get_all_transactions(limit)
+    return await storage.aget_all_transactions(limit)
+
+
+@app.post("/transactions/import")
+def import_transactions(
+    body: str = Body(..., media_type="text/csv"),
+    format: str = "csv",
+    account: Optional[str] = None,
+):
+    """
+    Bulk import a bank statement (CSV or OFX) sent as the raw request body.
+
+    Rows already present with the same date, amount, description and account
+    are skipped as duplicates, as many times as they are already present.
+    """
+    parser = importers.PARSERS.get(format)
+    if not parser:
+        raise HTTPException(status_code=400, detail="format must be 'csv' or 'ofx'")
+
+    transactions, errors = parser(body, account)
+    if errors and not transactions:
+        raise HTTPException(status_code=400, detail=errors)
+
+    result = storage.import_transactions(transactions)
+    result["errors"] = errors
+    return result
+
+
+@app.post("/transactions/batch")
+def batch_transactions(operations: list[TransactionBatchOp]):
+    """
+    Create, update and delete many transactions in one request.
+
+    Operations apply in order, and each affected day file is written once.
+    Returns one {"status", "result" or "detail"} per operation, in order.
+    """
+    return storage.apply_transaction_batch([
+        {
+            "op": operation.op,
+            "id": operation.id,
+            "transaction": operation.transaction.model_dump() if operation.transaction else None,
+            # Filter out None values, as PATCH /transactions/{id} does
+            "updates": {k: v for k, v in operation.updates.model_dump().items() if v is not None}
+            if operation.updates else None,
+        }
+        for operation in operations
+    ])
 
 
 @app.get("/transactions/date/{date_str}")
@@ -71,18 +125,18 @@ def delete_transaction(transaction_id: str):
 # ============ BUDGETS ============
 
 @app.get("/budgets")
-def list_budgets():
+async def list_budgets():
     """Get all budgets."""
-    return storage.get_all_budgets()
+    return await storage.aget_all_budgets()
 
 
 @app.get("/budgets/{month}")
-def get_budget(month: str):
-    """Get budget for a specific month (YYYY-MM format)."""
-    budget = storage.get_budget(month)
-    if not budget:
+def get_budget(month: str, request: Request):
+    """Get budget for a specific month (YYYY-MM format), sent as stored (with an ETag)."""
+    raw = storage.get_budget_raw(month)
+    if raw is None:
         raise HTTPException(status_code=404, detail="Budget not found")
-    return budget
+    return stored_json(raw, request)
 
 
 @app.post("/budgets")
@@ -94,9 +148,9 @@ def create_or_update_budget(budget: Budget):
 # ============ ACCOUNTS ============
 
 @app.get("/accounts")
-def list_accounts():
+async def list_accounts():
     """Get all accounts."""
-    return storage.get_all_accounts()
+    return await storage.aget_all_accounts()
 
 
 @app.post("/accounts")
@@ -114,6 +168,21 @@ def update_account(account_id: str, updates: dict):
     return result
 
 
+@app.get("/accounts/{account_id}/balance")
+def get_account_balance(account_id: str, as_of: Optional[date] = None):
+    """Get an account's balance derived from its transactions, as of a date (inclusive)."""
+    account = next((a for a in storage.get_all_accounts() if a.get("id") == account_id), None)
+    if not account:
+        raise HTTPException(status_code=404, detail="Account not found")
+
+    result = storage.get_account_balance(account_id, as_of)
+    if not result["transaction_count"] and account.get("name"):
+        # Transactions may reference the account by name instead of id
+        result = storage.get_account_balance(account["name"], as_of)
+    result["account_id"] = account_id
+    return result
+
+
 @app.delete("/accounts/{account_id}")
 def delete_account(account_id: str):
     """Delete an account."""
@@ -125,9 +194,92 @@ def delete_account(account_id: str):
 # ============ REPORTS ============
 
 @app.get("/reports/{month}")
-def get_monthly_report(month: str):
+async def get_monthly_report(month: str):
     """Get monthly financial report (YYYY-MM format)."""
-    return storage.generate_monthly_report(month)
+    return await storage.agenerate_monthly_report(month)
+
+
+# ============ ANALYTICS ============
+
+def _analytics():
+    """The analytics module, imported on first use to keep numpy out of startup."""
+    from . import analytics
+    return analytics
+
+
+def _month_range(start: Optional[str], end: Optional[str]) -> tuple[str, str]:
+    """Validate a YYYY-MM range, defaulting to the trailing 12 months."""
+    default_start, default_end = _analytics().default_range()
+    start, end = start or default_start, end or default_end
+    try:
+        if _analytics().month_index(start) > _analytics().month_index(end):
+            raise HTTPException(status_code=400, detail="start must not be after end")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid month format. Use YYYY-MM")
+    return start, end
+
+
+def _transaction_type(type: str) -> str:
+    """Validate a transaction type query parameter."""
+    if type not in _analytics().TYPE_CODES:
+        raise HTTPException(status_code=400, detail="type must be 'income', 'expense' or 'transfer'")
+    return type
+
+
+@app.get("/analytics/categories")
+def get_category_matrix(start: Optional[str] = None, end: Optional[str] = None, type: str = "expense"):
+    """Category x month totals for a YYYY-MM range (default: trailing 12 months)."""
+    start, end = _month_range(start, end)
+    return _analytics().category_matrix(start, end, _transaction_type(type))
+
+
+@app.get("/analytics/yearly")
+def get_yearly_matrix(start_year: Optional[int] = None, end_year: Optional[int] = None, type: str = "expense"):
+    """Category x year totals with year-over-year percent change."""
+    end_year = end_year or date.today().year
+    start_year = start_year or end_year - 1
+    if start_year > end_year:
+        raise HTTPException(status_code=400, detail="start_year must not be after end_year")
+    return _analytics().yearly_matrix(start_year, end_year, _transaction_type(type))
+
+
+@app.get("/analytics/trailing-average")
+def get_trailing_average(
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    window: int = 3,
+    type: str = "expense",
+):
+    """Per-category trailing average of monthly totals over `window` months."""
+    if not 1 <= window <= 60:
+        raise HTTPException(status_code=400, detail="window must be between 1 and 60")
+    start, end = _month_range(start, end)
+    return _analytics().trailing_average(start, end, window, _transaction_type(type))
+
+
+@app.get("/analytics/budget-variance")
+def get_budget_variance(start: Optional[str] = None, end: Optional[str] = None):
+    """Budgeted vs actual spending per category per month."""
+    start, end = _month_range(start, end)
+    return _analytics().budget_variance(start, end)
+
+
+# ============ EXPORT ============
+
+@app.get("/export/transactions")
+def export_transactions(start: Optional[date] = None, end: Optional[date] = None, format: str = "csv"):
+    """Stream all transactions between start and end (inclusive) as CSV or NDJSON."""
+    if format not in export.MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="format must be 'csv' or 'ndjson'")
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+
+    filename = f"transactions.{format}"
+    return StreamingResponse(
+        export.iter_export(format, start, end),
+        media_type=export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 # ============ CATEGORIES ============
@@ -178,6 +330,21 @@ def get_income_categories():
     return INCOME_CATEGORIES
 
 
+# ============ SYNC ============
+
+@app.get("/sync")
+def sync(since: int = 0):
+    """
+    Changes since the client's last sync.
+
+    Returns the current sequence plus the accounts created or updated
+    ("upserted") and the ids deleted after `since`. Returns full_resync=true
+    instead when the client has to refetch everything: on its first sync, or
+    once `since` has aged out of the change journal.
+    """
+    return storage.get_changes(since)
+
+
 # ============ HEALTH CHECK ============
 
 @app.get("/health")
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 from datetime import date
-from typing import Optional
+from typing import Literal, Optional
 from enum import Enum
 
 
@@ -33,6 +33,24 @@ class TransactionUpdate(BaseModel):
     notes: Optional[str] = None
 
 
+class TransactionBatchOp(BaseModel):
+    """One operation of POST /transactions/batch."""
+    op: Literal["create", "update", "delete"] = "create"
+    id: Optional[str] = None  # update, delete
+    transaction: Optional[Transaction] = None  # create
+    updates: Optional[TransactionUpdate] = None  # update
+
+    @model_validator(mode="after")
+    def check_fields(self):
+        if self.op == "create" and self.transaction is None:
+            raise ValueError("create needs 'transaction'")
+        if self.op != "create" and not self.id:
+            raise ValueError(f"{self.op} needs 'id'")
+        if self.op == "update" and self.updates is None:
+            raise ValueError("update needs 'updates'")
+        return self
+
+
 class Budget(BaseModel):
     month: str  # Format: YYYY-MM
     categories: dict[str, float]  # category -> budget amount
@@ -2,18 +2,40 @@
 Storage module for GB Finance - works with both local files and S3.
 """
 
+import hashlib
 import sys
+import threading
+from collections import Counter, defaultdict
 from datetime import date, datetime
 from pathlib import Path
-from typing import Optional
-import uuid
+from typing import Iterator, Optional
+
+try:
+    from gb_shared.storage import Storage, cached, get_storage, new_id
+except ImportError:
+    # Shared package not installed (pip install -e shared): use the source tree
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "shared"))
+    from gb_shared.storage import Storage, cached, get_storage, new_id
+
+# Folders of YYYY-MM-DD.json files, packed into segments once a month closes
+DATE_COLLECTIONS = ["transactions"]
+
+
+def configure(storage: Storage) -> None:
+    """Keep this app's data in `storage`; also called by the benchmarks to point the app at other data."""
+    global _storage
+    _storage = storage
+    # Whole-collection documents whose item changes are journaled for GET /sync
+    storage.track_changes("accounts", "accounts/accounts.json")
 
-# Add shared module to path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "shared"))
-from storage import get_storage
 
 # Initialize storage
-_storage = get_storage("finance", str(Path(__file__).parent.parent.parent / "data"))
+configure(get_storage("finance", str(Path(__file__).parent.parent.parent / "data")))
+
+
+# Bumped on every transaction write by this process, so derived caches (see
+# analytics.py) see its writes before they reach the day files
+_transactions_version = 0
 
 
 # ============ TRANSACTIONS ============
@@ -41,10 +63,43 @@ def get_all_transactions(limit: int = 100) -> list[dict]:
     return all_transactions[:limit]
 
 
+async def aget_all_transactions(limit: int = 100) -> list[dict]:
+    """Async get_all_transactions(), reading up to a month of day files per round."""
+    keys = await _storage.alist_keys("transactions/", ".json")
+    keys = sorted(keys, reverse=True)
+
+    all_transactions = []
+    for i in range(0, len(keys), 31):
+        if len(all_transactions) >= limit:
+            break
+        for transactions in await _storage.aread_many(keys[i:i + 31]):
+            all_transactions.extend(transactions or [])
+
+    all_transactions.sort(key=lambda x: (x.get("date", ""), x.get("created_at", "")), reverse=True)
+    return all_transactions[:limit]
+
+
+def iter_transactions(start: Optional[date] = None, end: Optional[date] = None) -> Iterator[dict]:
+    """Yield transactions in date order, reading one month of day files at a time."""
+    start_str = start.isoformat() if start else ""
+    end_str = end.isoformat() if end else "9999-12-31"
+
+    months = defaultdict(list)
+    for key in _storage.list_keys("transactions/", ".json"):
+        # Key format: transactions/2025-12-14.json
+        day = key.split("/")[-1].replace(".json", "")
+        if start_str <= day <= end_str:
+            months[day[:7]].append(key)
+
+    for keys in months.values():
+        for transactions in _storage.read_many(keys):
+            yield from transactions or []
+
+
 def save_transaction(transaction: dict) -> dict:
     """Save a new transaction."""
     if not transaction.get("id"):
-        transaction["id"] = str(uuid.uuid4())[:8]
+        transaction["id"] = new_id()
 
     now = datetime.now().isoformat()
     transaction["created_at"] = now
@@ -55,14 +110,98 @@ def save_transaction(transaction: dict) -> dict:
         trans_date = trans_date.isoformat()
     transaction["date"] = trans_date
 
-    key = f"transactions/{trans_date}.json"
-    existing = _storage.read_json(key) or []
-    existing.append(transaction)
-    _storage.write_json(key, existing)
+    _storage.append_json(f"transactions/{trans_date}.json", transaction)
+    _transactions_written(added=[transaction])
 
     return transaction
 
 
+def transactions_version() -> tuple:
+    """Current transaction version; changes whenever any transaction is written, by this or another process."""
+    return _transactions_version, _storage.signature("transactions/")
+
+
+def _transactions_written(added: list[dict] = (), removed: list[dict] = ()) -> None:
+    """Keep indexes and caches in step after transactions are added or removed."""
+    global _transactions_version
+    _transactions_version += 1
+    _update_ledgers(added, removed)
+
+
+def _transaction_hash(transaction: dict) -> str:
+    """Fingerprint used to detect duplicate imports: (date, amount, description, account)."""
+    parts = [
+        str(transaction.get("date", "")),
+        f"{float(transaction.get('amount', 0)):.2f}",
+        (transaction.get("description") or "").strip().lower(),
+        transaction.get("account") or "",
+    ]
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()
+
+
+def import_transactions(transactions: list[dict]) -> dict:
+    """
+    Bulk import transactions, skipping duplicates.
+
+    Rows are grouped by date so each day file is read and written once, and
+    all day files are written in one batch (one transaction on SQLite). The
+    duplicate index for a day is built from that day's file, which has to be
+    read anyway to append, so it can never drift out of sync with the data.
+
+    Duplicates are counted, not just matched: the n-th row with a given
+    fingerprint is skipped only if the day already holds n such
+    transactions. Two identical rows in one statement (two coffees on the
+    same day) are both imported, and importing the statement again skips both.
+    """
+    by_date: dict[str, list[dict]] = defaultdict(list)
+    for t in transactions:
+        trans_date = t["date"]
+        if isinstance(trans_date, date):
+            trans_date = trans_date.isoformat()
+        t["date"] = trans_date
+        by_date[trans_date].append(t)
+
+    now = datetime.now().isoformat()
+    imported = []
+    duplicates = 0
+    writes = {}
+
+    for trans_date in sorted(by_date):
+        key = f"transactions/{trans_date}.json"
+        existing = _storage.read_json(key) or []
+        stored = Counter(_transaction_hash(t) for t in existing)
+        seen = Counter()
+
+        added = []
+        for t in by_date[trans_date]:
+            fingerprint = _transaction_hash(t)
+            seen[fingerprint] += 1
+            if seen[fingerprint] <= stored[fingerprint]:
+                duplicates += 1
+                continue
+
+            if not t.get("id"):
+                t["id"] = new_id()
+            t["created_at"] = now
+            t["updated_at"] = now
+            added.append(t)
+
+        if added:
+            existing.extend(added)
+            writes[key] = existing
+            imported.extend(added)
+
+    _storage.write_many(writes)
+    _transactions_written(added=imported)
+
+    return {
+        "imported": len(imported),
+        "duplicates": duplicates,
+        "days_written": len({t["date"] for t in imported}),
+        "transactions": imported,
+    }
+
+
 def get_transaction(transaction_id: str) -> Optional[dict]:
     """Get a specific transaction by ID."""
     keys = _storage.list_keys("transactions/", ".json")
@@ -83,6 +222,7 @@ def update_transaction(transaction_id: str, updates: dict) -> Optional[dict]:
 
         for i, t in enumerate(transactions):
             if t.get("id") == transaction_id:
+                before = dict(t)
                 # Apply updates
                 for k, value in updates.items():
                     if value is not None:
@@ -97,21 +237,24 @@ def update_transaction(transaction_id: str, updates: dict) -> Optional[dict]:
                 old_date = key.split("/")[-1].replace(".json", "")
 
                 if new_date != old_date:
-                    # Remove from old file
-                    transactions.pop(i)
-                    if transactions:
-                        _storage.write_json(key, transactions)
-                    else:
-                        _storage.delete(key)
-
-                    # Add to new file
-                    new_key = f"transactions/{new_date}.json"
-                    new_transactions = _storage.read_json(new_key) or []
-                    new_transactions.append(t)
-                    _storage.write_json(new_key, new_transactions)
+                    # One generation, so a report never sees the record in both days or neither
+                    with _storage.atomic():
+                        # Remove from old file
+                        transactions.pop(i)
+                        if transactions:
+                            _storage.write_json(key, transactions)
+                        else:
+                            _storage.delete(key)
+
+                        # Add to new file
+                        new_key = f"transactions/{new_date}.json"
+                        new_transactions = _storage.read_json(new_key) or []
+                        new_transactions.append(t)
+                        _storage.write_json(new_key, new_transactions)
                 else:
                     _storage.write_json(key, transactions)
 
+                _transactions_written(added=[t], removed=[before])
                 return t
 
     return None
@@ -131,11 +274,110 @@ def delete_transaction(transaction_id: str) -> bool:
                     _storage.write_json(key, transactions)
                 else:
                     _storage.delete(key)
+                _transactions_written(removed=[t])
                 return True
 
     return False
 
 
+def apply_transaction_batch(operations: list[dict]) -> list[dict]:
+    """
+    Apply many creates, updates and deletes, writing each affected day file once.
+
+    Operations run in order and look like:
+        {"op": "create", "transaction": {...}}
+        {"op": "update", "id": "...", "updates": {...}}
+        {"op": "delete", "id": "..."}
+
+    Returns one result per operation, in the same order. A result is either
+    {"status": 200, "result": <what the single-item endpoint returns>} or
+    {"status": 404, "detail": "Transaction not found"}.
+    """
+    days: dict[str, list[dict]] = {}  # key -> transactions, read once
+    where: dict[str, str] = {}  # transaction id -> key of the day file holding it
+    before: dict[str, Optional[dict]] = {}  # id -> state before the batch (None if created in it)
+    dirty: set[str] = set()
+
+    def day(key: str) -> list[dict]:
+        if key not in days:
+            days[key] = _storage.read_json(key) or []
+        return days[key]
+
+    # Find the day files of the transactions to update or delete, stopping once all are found
+    wanted = {op["id"] for op in operations if op["op"] != "create"}
+    keys = sorted(_storage.list_keys("transactions/", ".json"), reverse=True)
+    for i in range(0, len(keys), 31):
+        if not wanted:
+            break
+        chunk = keys[i:i + 31]
+        for key, transactions in zip(chunk, _storage.read_many(chunk)):
+            for t in transactions or []:
+                if t.get("id") in wanted:
+                    wanted.discard(t["id"])
+                    where[t["id"]] = key
+                    days[key] = transactions
+
+    now = datetime.now().isoformat()
+    results = []
+    for op in operations:
+        if op["op"] == "create":
+            t = dict(op["transaction"])
+            if not t.get("id"):
+                t["id"] = new_id()
+            if isinstance(t["date"], date):
+                t["date"] = t["date"].isoformat()
+            t["created_at"] = now
+            t["updated_at"] = now
+            key = f"transactions/{t['date']}.json"
+            day(key).append(t)
+            where[t["id"]] = key
+            before.setdefault(t["id"], None)
+            dirty.add(key)
+            results.append({"status": 200, "result": dict(t)})
+            continue
+
+        key = where.get(op["id"])
+        if key is None:
+            results.append({"status": 404, "detail": "Transaction not found"})
+            continue
+        transactions = days[key]
+        i, t = next((i, t) for i, t in enumerate(transactions) if t.get("id") == op["id"])
+        before.setdefault(t["id"], dict(t))
+        dirty.add(key)
+
+        if op["op"] == "delete":
+            transactions.pop(i)
+            del where[t["id"]]
+            results.append({"status": 200, "result": {"message": "Transaction deleted"}})
+            continue
+
+        for k, value in op["updates"].items():
+            if value is not None:
+                if isinstance(value, date):
+                    value = value.isoformat()
+                t[k] = value
+        t["updated_at"] = now
+        new_key = f"transactions/{t['date']}.json"
+        if new_key != key:
+            # Date changed: move to the new day file
+            transactions.pop(i)
+            day(new_key).append(t)
+            where[t["id"]] = new_key
+            dirty.add(new_key)
+        results.append({"status": 200, "result": dict(t)})
+
+    with _storage.atomic():
+        _storage.write_many({key: days[key] for key in sorted(dirty) if days[key]})
+        for key in sorted(dirty):
+            if not days[key]:
+                _storage.delete(key)
+
+    if before:
+        after = {t["id"]: t for key in dirty for t in days[key] if t.get("id") in before}
+        _transactions_written(added=list(after.values()), removed=[t for t in before.values() if t is not None])
+    return results
+
+
 # ============ BUDGETS ============
 
 def get_budget(month: str) -> Optional[dict]:
@@ -144,6 +386,11 @@ def get_budget(month: str) -> Optional[dict]:
     return _storage.read_json(key)
 
 
+def get_budget_raw(month: str) -> Optional[bytes]:
+    """get_budget() as the stored JSON bytes, unparsed."""
+    return _storage.read_bytes(f"budgets/{month}.json")
+
+
 def save_budget(budget: dict) -> dict:
     """Save or update a budget."""
     month = budget["month"]
@@ -153,6 +400,7 @@ def save_budget(budget: dict) -> dict:
     return budget
 
 
+@cached("finance.budgets")
 def get_all_budgets() -> list[dict]:
     """Get all budgets."""
     keys = _storage.list_keys("budgets/", ".json")
@@ -166,6 +414,14 @@ def get_all_budgets() -> list[dict]:
     return budgets
 
 
+@cached("finance.abudgets")
+async def aget_all_budgets() -> list[dict]:
+    """Async get_all_budgets()."""
+    keys = await _storage.alist_keys("budgets/", ".json")
+    keys = sorted(keys, reverse=True)
+    return [data for data in await _storage.aread_many(keys) if data]
+
+
 # ============ ACCOUNTS ============
 
 def get_all_accounts() -> list[dict]:
@@ -173,10 +429,15 @@ def get_all_accounts() -> list[dict]:
     return _storage.read_json("accounts/accounts.json") or []
 
 
+async def aget_all_accounts() -> list[dict]:
+    """Async get_all_accounts()."""
+    return await _storage.aread_json("accounts/accounts.json") or []
+
+
 def save_account(account: dict) -> dict:
     """Save a new account."""
     if not account.get("id"):
-        account["id"] = str(uuid.uuid4())[:8]
+        account["id"] = new_id()
 
     now = datetime.now().isoformat()
     account["created_at"] = now
@@ -219,29 +480,198 @@ def delete_account(account_id: str) -> bool:
     return False
 
 
+def get_changes(since: int) -> dict:
+    """Accounts created, updated or deleted after sync sequence `since`."""
+    return _storage.sync(since)
+
+
+# ============ LEDGER ============
+
+# Each account's ledger lives in ledger/<digest>/, where <digest> is a hash of
+# the account name (so no two accounts, or an account and _meta.json, share a key):
+#   YYYY-MM.json:     [date, transaction_id, signed_amount] for each transaction
+#                     of that month, in the order they were written
+#   checkpoints.json: {"account": ..., "months": {"YYYY-MM": [net, count]}}
+# A save appends one entry to its month and updates that month's checkpoint,
+# so a balance as of any date is a sum over the checkpoints of earlier months
+# plus one month of entries.
+
+LEDGER_FORMAT = 2
+_LEDGER_META_KEY = "ledger/_meta.json"
+
+# Account -> lock held while its ledger is read and written
+_ledger_locks: dict[str, threading.Lock] = defaultdict(threading.Lock)
+_ledger_locks_lock = threading.Lock()
+
+
+def _signed_amount(transaction: dict) -> float:
+    """Income adds to the account; expenses and outgoing transfers subtract."""
+    amount = float(transaction.get("amount", 0))
+    return amount if transaction.get("type") == "income" else -amount
+
+
+def _ledger_dir(account: str) -> str:
+    """Storage folder of an account's ledger."""
+    return f"ledger/{hashlib.blake2b(account.encode(), digest_size=16).hexdigest()}/"
+
+
+def _ledger_lock(account: str) -> threading.Lock:
+    with _ledger_locks_lock:
+        return _ledger_locks[account]
+
+
+def _ledgers_current() -> bool:
+    """True once the ledgers have been built in the current format."""
+    meta = _storage.read_json(_LEDGER_META_KEY)
+    return isinstance(meta, dict) and meta.get("format") == LEDGER_FORMAT
+
+
+def rebuild_ledgers() -> int:
+    """Rebuild every account ledger from the transaction history."""
+    for key in _storage.list_keys("ledger/", ".json"):
+        _storage.delete(key)
+
+    ledgers: dict[str, dict[str, list]] = defaultdict(lambda: defaultdict(list))
+    for t in iter_transactions():
+        account = t.get("account")
+        if account:
+            ledgers[account][t["date"][:7]].append([t["date"], t["id"], _signed_amount(t)])
+
+    writes = {}
+    for account, months in ledgers.items():
+        folder = _ledger_dir(account)
+        checkpoints = {}
+        for month in sorted(months):
+            entries = months[month]
+            writes[f"{folder}{month}.json"] = entries
+            checkpoints[month] = [round(sum(e[2] for e in entries), 2), len(entries)]
+        writes[f"{folder}checkpoints.json"] = {"account": account, "months": checkpoints}
+    writes[_LEDGER_META_KEY] = {"format": LEDGER_FORMAT, "rebuilt_at": datetime.now().isoformat()}
+    _storage.write_many(writes)
+    return len(ledgers)
+
+
+def _update_ledgers(added: list[dict] = (), removed: list[dict] = ()) -> None:
+    """Apply transaction changes to the affected ledgers."""
+    if not _ledgers_current():
+        # First use: the history already includes this change
+        rebuild_ledgers()
+        return
+
+    changes: dict[str, tuple[list, list]] = defaultdict(lambda: ([], []))
+    for t in removed:
+        if t.get("account"):
+            changes[t["account"]][1].append(t)
+    for t in added:
+        if t.get("account"):
+            changes[t["account"]][0].append([t["date"], t["id"], _signed_amount(t)])
+
+    for account, (new_entries, removed_transactions) in changes.items():
+        folder = _ledger_dir(account)
+        with _ledger_lock(account):
+            doc = _storage.read_json(f"{folder}checkpoints.json") or {"account": account, "months": {}}
+            months = doc["months"]
+
+            removed_by_month: dict[str, set] = defaultdict(set)
+            for t in removed_transactions:
+                removed_by_month[t["date"][:7]].add(t["id"])
+            for month, ids in removed_by_month.items():
+                key = f"{folder}{month}.json"
+                entries = _storage.read_json(key) or []
+                kept = [e for e in entries if e[1] not in ids]
+                if len(kept) == len(entries):
+                    continue
+                if kept:
+                    _storage.write_json(key, kept)
+                    months[month] = [round(sum(e[2] for e in kept), 2), len(kept)]
+                else:
+                    _storage.delete(key)
+                    months.pop(month, None)
+
+            for entry in new_entries:
+                month = entry[0][:7]
+                _storage.append_json(f"{folder}{month}.json", entry)
+                net, count = months.get(month, (0.0, 0))
+                months[month] = [round(net + entry[2], 2), count + 1]
+
+            _storage.write_json(f"{folder}checkpoints.json", doc)
+
+
+def get_account_balance(account: str, as_of: Optional[date] = None) -> dict:
+    """Balance of an account as of a date (inclusive), from its ledger."""
+    if not _ledgers_current():
+        rebuild_ledgers()
+
+    folder = _ledger_dir(account)
+    doc = _storage.read_json(f"{folder}checkpoints.json") or {"months": {}}
+    as_of_str = as_of.isoformat() if as_of else "9999-12-31"
+    month = as_of_str[:7]
+
+    balance, count = 0.0, 0
+    for m, (net, n) in doc["months"].items():
+        if m < month:
+            balance += net
+            count += n
+    if month in doc["months"]:
+        tail = [e for e in _storage.read_json(f"{folder}{month}.json") or [] if e[0] <= as_of_str]
+        balance += sum(e[2] for e in tail)
+        count += len(tail)
+
+    return {
+        "account": account,
+        "as_of": as_of.isoformat() if as_of else None,
+        "balance": round(balance, 2),
+        "transaction_count": count,
+    }
+
+
 # ============ REPORTS ============
 
+def _month_keys(keys: list[str], month: str) -> list[str]:
+    # Key format: transactions/2025-12-14.json
+    return [key for key in keys if key.split("/")[-1].startswith(month)]
+
+
 def get_transactions_for_month(month: str) -> list[dict]:
     """Get all transactions for a specific month."""
     # Month format: YYYY-MM
-    keys = _storage.list_keys("transactions/", ".json")
+    keys = _month_keys(_storage.list_keys("transactions/", ".json"), month)
+
     all_transactions = []
+    for transactions in _storage.read_many(keys):
+        all_transactions.extend(transactions or [])
+    return all_transactions
 
-    for key in keys:
-        # Key format: transactions/2025-12-14.json
-        filename = key.split("/")[-1].replace(".json", "")
-        if filename.startswith(month):
-            transactions = _storage.read_json(key) or []
-            all_transactions.extend(transactions)
 
+async def aget_transactions_for_month(month: str) -> list[dict]:
+    """Async get_transactions_for_month()."""
+    keys = _month_keys(await _storage.alist_keys("transactions/", ".json"), month)
+
+    all_transactions = []
+    for transactions in await _storage.aread_many(keys):
+        all_transactions.extend(transactions or [])
     return all_transactions
 
 
+@cached("finance.monthly_report")
 def generate_monthly_report(month: str) -> dict:
     """Generate a monthly financial report."""
-    transactions = get_transactions_for_month(month)
-    budget = get_budget(month)
+    # Pinned, so a transaction moved between days mid-report is counted exactly once
+    with _storage.snapshot():
+        return _monthly_report(month, get_transactions_for_month(month), get_budget(month))
+
+
+@cached("finance.amonthly_report")
+async def agenerate_monthly_report(month: str) -> dict:
+    """Async generate_monthly_report()."""
+    with _storage.snapshot():
+        transactions = await aget_transactions_for_month(month)
+        budget = await _storage.aread_json(f"budgets/{month}.json")
+    return _monthly_report(month, transactions, budget)
+
 
+def _monthly_report(month: str, transactions: list[dict], budget: Optional[dict]) -> dict:
+    """Totals and budget comparison for one month's transactions."""
     total_income = 0.0
     total_expenses = 0.0
     by_category: dict[str, float] = {}
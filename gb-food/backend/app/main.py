@@ -1,12 +1,15 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from collections import Counter
 from datetime import date, datetime
 from typing import Optional
 from .models import (
-    FoodEntry, DailyFoodLog, Recipe, RecipeUpdate,
+    FoodEntry, FoodEntryBatchOp, DailyFoodLog, Recipe, RecipeUpdate,
     FavoriteFood, FavoriteFoodUpdate
 )
 from . import storage
+from gb_shared.instrumentation import install_metrics, install_profiling
+from gb_shared.storage.responses import stored_json
 
 app = FastAPI(
     title="GB Food API",
@@ -23,6 +26,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+install_metrics(app, "food", storage._storage)
+install_profiling(app, "food", storage._storage)
+app.add_event_handler("startup", lambda: storage._storage.start_packer(storage.DATE_COLLECTIONS))
+
 
 @app.get("/")
 def root():
@@ -31,23 +38,23 @@ def root():
 
 # Daily food log endpoints
 @app.get("/daily/{date_str}")
-def get_daily_log(date_str: str):
-    """Get the food log for a specific date."""
+def get_daily_log(date_str: str, request: Request):
+    """Get the food log for a specific date, sent as stored (with an ETag)."""
     try:
         d = datetime.strptime(date_str, "%Y-%m-%d").date()
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
 
-    log = storage.get_daily_log(d)
-    if not log:
+    raw = storage.get_daily_log_raw(d)
+    if raw is None:
         return {"date": date_str, "entries": []}
-    return log
+    return stored_json(raw, request)
 
 
 @app.get("/daily")
-def list_daily_logs(limit: int = 30):
+async def list_daily_logs(limit: int = 30):
     """List recent daily food logs."""
-    return storage.get_all_daily_logs(limit)
+    return await storage.aget_all_daily_logs(limit)
 
 
 @app.post("/daily/{date_str}")
@@ -81,6 +88,30 @@ def add_food_entry(date_str: str, entry: FoodEntry):
     return saved
 
 
+@app.post("/daily/{date_str}/entries")
+def batch_food_entries(date_str: str, operations: list[FoodEntryBatchOp]):
+    """
+    Add, update and delete many food entries of a date's log in one request.
+
+    The log is read and written once. Returns one {"status", "result" or
+    "detail"} per operation, in order.
+    """
+    try:
+        d = datetime.strptime(date_str, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+
+    # If using favorites, increment their use counts
+    uses = Counter(op.entry.recipe_id for op in operations if op.op == "add" and op.entry.recipe_id)
+    if uses:
+        storage.increment_favorite_uses(uses)
+
+    return storage.apply_entry_batch(d, [
+        {"op": operation.op, "id": operation.id, "entry": operation.entry.model_dump() if operation.entry else None}
+        for operation in operations
+    ])
+
+
 @app.put("/daily/{date_str}/entry/{entry_id}")
 def update_food_entry(date_str: str, entry_id: str, entry: FoodEntry):
     """Update a food entry."""
@@ -111,11 +142,16 @@ def delete_food_entry(date_str: str, entry_id: str):
 
 # Recipe endpoints
 @app.get("/recipes")
-def list_recipes(tag: Optional[str] = None):
-    """List all recipes, optionally filtered by tag."""
-    recipes = storage.load_recipes()
+async def list_recipes(tag: Optional[str] = None, limit: Optional[int] = None, before: Optional[str] = None):
+    """List all recipes, optionally filtered by tag; with limit or before, one page newest first (see GET /todos)."""
+    recipes = await storage.aload_recipes()
     if tag:
         recipes = [r for r in recipes if tag.lower() in [t.lower() for t in r.get("tags", [])]]
+    if limit is not None or before is not None:
+        try:
+            recipes = storage.newest_first(recipes, limit, before)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
     return recipes
 
 
@@ -156,11 +192,11 @@ def delete_recipe(recipe_id: str):
 
 # Favorite foods endpoints
 @app.get("/favorites")
-def list_favorites(top: Optional[int] = None):
+async def list_favorites(top: Optional[int] = None):
     """List favorites, optionally just the top N most used."""
     if top:
-        return storage.get_top_favorites(top)
-    return storage.load_favorites()
+        return await storage.aget_top_favorites(top)
+    return await storage.aload_favorites()
 
 
 @app.get("/favorites/{favorite_id}")
@@ -207,6 +243,20 @@ def use_favorite(favorite_id: str):
     return updated
 
 
+# Sync
+@app.get("/sync")
+def sync(since: int = 0):
+    """
+    Changes since the client's last sync.
+
+    Returns the current sequence plus the recipes and favorites created or
+    updated ("upserted") and the ids deleted after `since`. Returns full_resync=true
+    instead when the client has to refetch everything: on its first sync, or
+    once `since` has aged out of the change journal.
+    """
+    return storage.get_changes(since)
+
+
 # Health check
 @app.get("/health")
 def health_check():
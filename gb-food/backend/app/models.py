@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, model_validator
+from typing import Literal, Optional
 from datetime import date
 
 
@@ -17,6 +17,21 @@ class FoodEntry(BaseModel):
     created_at: Optional[str] = None
 
 
+class FoodEntryBatchOp(BaseModel):
+    """One operation of POST /daily/{date}/entries."""
+    op: Literal["add", "update", "delete"] = "add"
+    id: Optional[str] = None  # update, delete
+    entry: Optional[FoodEntry] = None  # add, update
+
+    @model_validator(mode="after")
+    def check_fields(self):
+        if self.op != "delete" and self.entry is None:
+            raise ValueError(f"{self.op} needs 'entry'")
+        if self.op != "add" and not self.id:
+            raise ValueError(f"{self.op} needs 'id'")
+        return self
+
+
 class DailyFoodLog(BaseModel):
     """Daily food log containing all entries for a day."""
     date: str
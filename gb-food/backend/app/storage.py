@@ -6,14 +6,31 @@ import sys
 from datetime import date, datetime
 from pathlib import Path
 from typing import Optional
-from uuid import uuid4
 
-# Add shared module to path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "shared"))
-from storage import get_storage
+try:
+    from gb_shared.storage import Storage, cached, get_storage, new_id, newest_first
+except ImportError:
+    # Shared package not installed (pip install -e shared): use the source tree
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "shared"))
+    from gb_shared.storage import Storage, cached, get_storage, new_id, newest_first
+
+# Folders of YYYY-MM-DD.json files, packed into segments once a month closes
+DATE_COLLECTIONS = ["daily"]
+
+
+def configure(storage: Storage) -> None:
+    """Keep this app's data in `storage`; also called by the benchmarks to point the app at other data."""
+    global _storage
+    _storage = storage
+    # Whole-collection documents whose item changes are journaled for GET /sync
+    storage.track_changes("recipes", "recipes.json")
+    storage.track_changes("favorites", "favorites.json")
+    # Stored one item per line, so a lookup by id reads and parses only that item
+    storage.index_items("recipes.json")
+
 
 # Initialize storage
-_storage = get_storage("food", str(Path(__file__).parent.parent.parent / "data"))
+configure(get_storage("food", str(Path(__file__).parent.parent.parent / "data")))
 
 
 def date_to_key(d: date) -> str:
@@ -28,6 +45,11 @@ def get_daily_log(d: date) -> Optional[dict]:
     return _storage.read_json(key)
 
 
+def get_daily_log_raw(d: date) -> Optional[bytes]:
+    """get_daily_log() as the stored JSON bytes, unparsed."""
+    return _storage.read_bytes(date_to_key(d))
+
+
 def save_daily_log(log: dict) -> dict:
     """Save a daily food log."""
     log_date = log.get("date")
@@ -45,14 +67,18 @@ def save_daily_log(log: dict) -> dict:
 
 def add_food_entry(d: date, entry: dict) -> dict:
     """Add a food entry to a day's log."""
-    log = get_daily_log(d) or {"date": d.isoformat(), "entries": []}
-
     if not entry.get("id"):
-        entry["id"] = str(uuid4())
-
-    entry["created_at"] = datetime.now().isoformat()
-    log["entries"].append(entry)
-    save_daily_log(log)
+        entry["id"] = new_id()
+
+    now = datetime.now().isoformat()
+    entry["created_at"] = now
+    _storage.append_json(
+        date_to_key(d),
+        entry,
+        field="entries",
+        default={"date": d.isoformat(), "entries": []},
+        updates={"updated_at": now},
+    )
     return entry
 
 
@@ -91,17 +117,65 @@ def delete_food_entry(d: date, entry_id: str) -> bool:
     return False
 
 
+def apply_entry_batch(d: date, operations: list[dict]) -> list[dict]:
+    """
+    Apply many adds, updates and deletes to a day's log with one read and one write.
+
+    Operations run in order and look like {"op": "add", "entry": {...}},
+    {"op": "update", "id": ..., "entry": {...}} or {"op": "delete", "id": ...}.
+    Returns one result per operation: {"status": 200, "result": ...} or
+    {"status": 404, "detail": "Entry not found"}.
+    """
+    log = get_daily_log(d) or {"date": d.isoformat(), "entries": []}
+    entries = log.setdefault("entries", [])
+    results = []
+    changed = False
+
+    for op in operations:
+        now = datetime.now().isoformat()
+        if op["op"] == "add":
+            entry = dict(op["entry"])
+            if not entry.get("id"):
+                entry["id"] = new_id()
+            entry["created_at"] = now
+            entries.append(entry)
+            changed = True
+            results.append({"status": 200, "result": dict(entry)})
+            continue
+
+        entry = next((e for e in entries if e.get("id") == op["id"]), None)
+        if entry is None:
+            results.append({"status": 404, "detail": "Entry not found"})
+            continue
+        changed = True
+
+        if op["op"] == "delete":
+            entries.remove(entry)
+            results.append({"status": 200, "result": {"deleted": True}})
+        else:
+            for key, value in op["entry"].items():
+                if value is not None:
+                    entry[key] = value
+            entry["updated_at"] = now
+            results.append({"status": 200, "result": dict(entry)})
+
+    if changed:
+        save_daily_log(log)
+    return results
+
+
 def get_all_daily_logs(limit: int = 30) -> list[dict]:
     """Get all daily logs, sorted by date descending."""
     keys = _storage.list_keys("daily/", ".json")
     keys = sorted(keys, reverse=True)[:limit]
+    return [data for data in _storage.read_many(keys) if data]
 
-    logs = []
-    for key in keys:
-        data = _storage.read_json(key)
-        if data:
-            logs.append(data)
-    return logs
+
+async def aget_all_daily_logs(limit: int = 30) -> list[dict]:
+    """Async get_all_daily_logs()."""
+    keys = await _storage.alist_keys("daily/", ".json")
+    keys = sorted(keys, reverse=True)[:limit]
+    return [data for data in await _storage.aread_many(keys) if data]
 
 
 # Recipes
@@ -110,6 +184,11 @@ def load_recipes() -> list[dict]:
     return _storage.read_json("recipes.json") or []
 
 
+async def aload_recipes() -> list[dict]:
+    """Async load_recipes()."""
+    return await _storage.aread_json("recipes.json") or []
+
+
 def save_recipes(recipes: list[dict]):
     """Save all recipes."""
     _storage.write_json("recipes.json", recipes)
@@ -120,7 +199,7 @@ def add_recipe(recipe: dict) -> dict:
     recipes = load_recipes()
 
     if not recipe.get("id"):
-        recipe["id"] = str(uuid4())
+        recipe["id"] = new_id()
 
     recipe["created_at"] = datetime.now().isoformat()
     recipe["updated_at"] = datetime.now().isoformat()
@@ -131,11 +210,7 @@ def add_recipe(recipe: dict) -> dict:
 
 def get_recipe(recipe_id: str) -> Optional[dict]:
     """Get a recipe by ID."""
-    recipes = load_recipes()
-    for recipe in recipes:
-        if recipe.get("id") == recipe_id:
-            return recipe
-    return None
+    return _storage.find_item("recipes.json", recipe_id)
 
 
 def update_recipe(recipe_id: str, updates: dict) -> Optional[dict]:
@@ -170,6 +245,11 @@ def load_favorites() -> list[dict]:
     return _storage.read_json("favorites.json") or []
 
 
+async def aload_favorites() -> list[dict]:
+    """Async load_favorites()."""
+    return await _storage.aread_json("favorites.json") or []
+
+
 def save_favorites(favorites: list[dict]):
     """Save all favorites."""
     _storage.write_json("favorites.json", favorites)
@@ -180,7 +260,7 @@ def add_favorite(favorite: dict) -> dict:
     favorites = load_favorites()
 
     if not favorite.get("id"):
-        favorite["id"] = str(uuid4())
+        favorite["id"] = new_id()
 
     favorite["use_count"] = 0
     favorite["created_at"] = datetime.now().isoformat()
@@ -238,7 +318,37 @@ def increment_favorite_use(favorite_id: str) -> Optional[dict]:
     return None
 
 
+def increment_favorite_uses(counts: dict[str, int]) -> None:
+    """Add to the use counts of several favorites with one write."""
+    favorites = load_favorites()
+    changed = False
+    for favorite in favorites:
+        uses = counts.get(favorite.get("id"))
+        if uses:
+            favorite["use_count"] = favorite.get("use_count", 0) + uses
+            favorite["updated_at"] = datetime.now().isoformat()
+            changed = True
+    if changed:
+        save_favorites(favorites)
+
+
+@cached("food.top_favorites")
 def get_top_favorites(limit: int = 10) -> list[dict]:
     """Get the most used favorites."""
-    favorites = load_favorites()
+    return _most_used(load_favorites(), limit)
+
+
+@cached("food.atop_favorites")
+async def aget_top_favorites(limit: int = 10) -> list[dict]:
+    """Async get_top_favorites()."""
+    return _most_used(await aload_favorites(), limit)
+
+
+def _most_used(favorites: list[dict], limit: int) -> list[dict]:
     return sorted(favorites, key=lambda f: f.get("use_count", 0), reverse=True)[:limit]
+
+
+# Sync
+def get_changes(since: int) -> dict:
+    """Recipes and favorites created, updated or deleted after sync sequence `since`."""
+    return _storage.sync(since)
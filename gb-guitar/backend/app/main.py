@@ -1,9 +1,11 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from datetime import date, datetime
 from typing import Optional
 from .models import PracticeSession, Song, SongUpdate, Skills, DailyGuitarEntry
 from . import storage, stats
+from gb_shared.instrumentation import install_metrics, install_profiling
+from gb_shared.storage.responses import stored_json
 
 app = FastAPI(
     title="GB Guitar API",
@@ -20,6 +22,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+install_metrics(app, "guitar", storage._storage)
+install_profiling(app, "guitar", storage._storage)
+app.add_event_handler("startup", lambda: storage._storage.start_packer(storage.DATE_COLLECTIONS))
+
 
 @app.get("/")
 def root():
@@ -35,36 +41,56 @@ def log_practice(session: PracticeSession):
     return saved
 
 
+@app.post("/practice/batch")
+def log_practice_sessions(sessions: list[PracticeSession]):
+    """
+    Log many practice sessions in one request.
+
+    Each day's file is written once. Returns one {"status", "result"} per
+    session, in order.
+    """
+    saved = storage.save_practice_sessions([session.model_dump() for session in sessions])
+    return [{"status": 200, "result": session} for session in saved]
+
+
 @app.get("/practice")
-def list_practice_sessions(limit: int = 30):
+async def list_practice_sessions(limit: int = 30):
     """List recent practice sessions."""
-    return storage.get_all_practice_sessions(limit)
+    return await storage.aget_all_practice_sessions(limit)
 
 
 @app.get("/practice/{date_str}")
-def get_practice_by_date(date_str: str):
-    """Get practice sessions for a specific date."""
+def get_practice_by_date(date_str: str, request: Request):
+    """Get practice sessions for a specific date, sent as stored (with an ETag)."""
     try:
         d = datetime.strptime(date_str, "%Y-%m-%d").date()
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
-    return storage.get_practice_sessions(d)
+    raw = storage.get_practice_sessions_raw(d)
+    if raw is None:
+        return []
+    return stored_json(raw, request)
 
 
 # Stats
 @app.get("/stats")
-def get_stats():
+async def get_stats():
     """Get practice statistics including streak."""
-    return stats.get_stats()
+    return await stats.aget_stats()
 
 
 # Songs
 @app.get("/songs")
-def list_songs(status: Optional[str] = None):
-    """List all songs, optionally filtered by status."""
-    songs = storage.load_songs()
+async def list_songs(status: Optional[str] = None, limit: Optional[int] = None, before: Optional[str] = None):
+    """List all songs, optionally filtered by status; with limit or before, one page newest first."""
+    songs = await storage.aload_songs()
     if status:
         songs = [s for s in songs if s.get("status") == status]
+    if limit is not None or before is not None:
+        try:
+            songs = storage.newest_first(songs, limit, before)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
     return songs
 
 
@@ -148,6 +174,20 @@ def get_tuning_stats():
     return storage.get_days_since_last_tuning()
 
 
+# Sync
+@app.get("/sync")
+def sync(since: int = 0):
+    """
+    Changes since the client's last sync.
+
+    Returns the current sequence plus the songs created or updated
+    ("upserted") and the ids deleted after `since`. Returns full_resync=true
+    instead when the client has to refetch everything: on its first sync, or
+    once `since` has aged out of the change journal.
+    """
+    return storage.get_changes(since)
+
+
 # Health check
 @app.get("/health")
 def health_check():
@@ -1,7 +1,6 @@
 from pydantic import BaseModel
 from typing import Optional
 from datetime import date
-from uuid import UUID, uuid4
 
 
 class PracticeSession(BaseModel):
@@ -32,7 +31,9 @@ class Song(BaseModel):
 
     def generate_id(self):
         if not self.id:
-            self.id = str(uuid4())
+            # Imported here: models load before storage.py puts the shared package on sys.path
+            from gb_shared.storage import new_id
+            self.id = new_id()
         return self
 
 
@@ -48,9 +48,30 @@ def calculate_longest_streak(practice_dates: list[date]) -> int:
 
 def get_stats() -> dict:
     """Calculate all practice statistics."""
+    return _get_stats(date.today())
+
+
+async def aget_stats() -> dict:
+    """Async get_stats()."""
+    return await _aget_stats(date.today())
+
+
+# Cached per day: streaks and weekly/monthly totals are relative to today
+@storage.cached("guitar.stats", storage="storage._storage")
+def _get_stats(today: date) -> dict:
     practice_dates = storage.get_all_practice_dates()
     all_sessions = storage.get_all_practice_sessions(limit=365)  # Get up to a year
+    return _stats(practice_dates, all_sessions)
+
+
+@storage.cached("guitar.astats", storage="storage._storage")
+async def _aget_stats(today: date) -> dict:
+    practice_dates = await storage.aget_all_practice_dates()
+    all_sessions = await storage.aget_all_practice_sessions(limit=365)
+    return _stats(practice_dates, all_sessions)
+
 
+def _stats(practice_dates: list[date], all_sessions: list[dict]) -> dict:
     today = date.today()
     week_start = today - timedelta(days=today.weekday())  # Monday
     month_start = today.replace(day=1)
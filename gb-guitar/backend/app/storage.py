@@ -6,14 +6,30 @@ import sys
 from datetime import date, datetime
 from pathlib import Path
 from typing import Optional
-from uuid import uuid4
 
-# Add shared module to path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "shared"))
-from storage import get_storage
+try:
+    from gb_shared.storage import Storage, cached, get_storage, new_id, newest_first
+except ImportError:
+    # Shared package not installed (pip install -e shared): use the source tree
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "shared"))
+    from gb_shared.storage import Storage, cached, get_storage, new_id, newest_first
+
+# Folders of YYYY-MM-DD.json files, packed into segments once a month closes
+DATE_COLLECTIONS = ["daily", "practice-log"]
+
+
+def configure(storage: Storage) -> None:
+    """Keep this app's data in `storage`; also called by the benchmarks to point the app at other data."""
+    global _storage
+    _storage = storage
+    # Whole-collection documents whose item changes are journaled for GET /sync
+    storage.track_changes("songs", "songs.json")
+    # Stored one item per line, so a lookup by id reads and parses only that item
+    storage.index_items("songs.json")
+
 
 # Initialize storage
-_storage = get_storage("guitar", str(Path(__file__).parent.parent.parent / "data"))
+configure(get_storage("guitar", str(Path(__file__).parent.parent.parent / "data")))
 
 
 def date_to_key(d: date, folder: str) -> str:
@@ -22,45 +38,85 @@ def date_to_key(d: date, folder: str) -> str:
 
 
 # Practice sessions
-def save_practice_session(session: dict) -> dict:
-    """Save a practice session. Multiple sessions per day stored in array."""
+def _new_practice_session(session: dict) -> tuple[str, dict]:
+    """Storage key and stored form of a new practice session."""
     session_date = session.get("date")
     if isinstance(session_date, str):
         session_date = datetime.strptime(session_date, "%Y-%m-%d").date()
 
-    key = date_to_key(session_date, "practice-log")
-    existing = _storage.read_json(key) or []
-
     session_copy = session.copy()
     session_copy["date"] = session_date.isoformat()
     session_copy["created_at"] = datetime.now().isoformat()
-    existing.append(session_copy)
+    return date_to_key(session_date, "practice-log"), session_copy
+
 
-    _storage.write_json(key, existing)
+def save_practice_session(session: dict) -> dict:
+    """Save a practice session. Multiple sessions per day stored in array."""
+    key, session_copy = _new_practice_session(session)
+    _storage.append_json(key, session_copy)
     return session_copy
 
 
+def save_practice_sessions(sessions: list[dict]) -> list[dict]:
+    """Save many practice sessions, reading and writing each day's file once."""
+    saved = []
+    by_key: dict[str, list[dict]] = {}
+    for session in sessions:
+        key, session_copy = _new_practice_session(session)
+        by_key.setdefault(key, []).append(session_copy)
+        saved.append(session_copy)
+
+    keys = sorted(by_key)
+    _storage.write_many({
+        key: (existing or []) + by_key[key] for key, existing in zip(keys, _storage.read_many(keys))
+    })
+    return saved
+
+
 def get_practice_sessions(d: date) -> list[dict]:
     """Get all practice sessions for a date."""
     key = date_to_key(d, "practice-log")
     return _storage.read_json(key) or []
 
 
+def get_practice_sessions_raw(d: date) -> Optional[bytes]:
+    """A date's practice sessions as the stored JSON bytes, unparsed (None if there are none)."""
+    return _storage.read_bytes(date_to_key(d, "practice-log"))
+
+
 def get_all_practice_sessions(limit: int = 30) -> list[dict]:
     """Get all practice sessions, flattened and sorted by date descending."""
     keys = _storage.list_keys("practice-log/", ".json")
     keys = sorted(keys, reverse=True)[:limit]
 
     sessions = []
-    for key in keys:
-        day_sessions = _storage.read_json(key) or []
-        sessions.extend(day_sessions)
+    for day_sessions in _storage.read_many(keys):
+        sessions.extend(day_sessions or [])
+    return sessions
+
+
+async def aget_all_practice_sessions(limit: int = 30) -> list[dict]:
+    """Async get_all_practice_sessions()."""
+    keys = await _storage.alist_keys("practice-log/", ".json")
+    keys = sorted(keys, reverse=True)[:limit]
+
+    sessions = []
+    for day_sessions in await _storage.aread_many(keys):
+        sessions.extend(day_sessions or [])
     return sessions
 
 
 def get_all_practice_dates() -> list[date]:
     """Get all dates that have practice sessions."""
-    keys = _storage.list_keys("practice-log/", ".json")
+    return _dates_from_keys(_storage.list_keys("practice-log/", ".json"))
+
+
+async def aget_all_practice_dates() -> list[date]:
+    """Async get_all_practice_dates()."""
+    return _dates_from_keys(await _storage.alist_keys("practice-log/", ".json"))
+
+
+def _dates_from_keys(keys: list[str]) -> list[date]:
     dates = []
     for key in keys:
         filename = key.split("/")[-1]
@@ -78,6 +134,11 @@ def load_songs() -> list[dict]:
     return _storage.read_json("songs.json") or []
 
 
+async def aload_songs() -> list[dict]:
+    """Async load_songs()."""
+    return await _storage.aread_json("songs.json") or []
+
+
 def save_songs(songs: list[dict]):
     """Save all songs to file."""
     _storage.write_json("songs.json", songs)
@@ -88,7 +149,7 @@ def add_song(song: dict) -> dict:
     songs = load_songs()
 
     if not song.get("id"):
-        song["id"] = str(uuid4())
+        song["id"] = new_id()
 
     song["added_at"] = datetime.now().isoformat()
     song["updated_at"] = datetime.now().isoformat()
@@ -125,11 +186,7 @@ def delete_song(song_id: str) -> bool:
 
 def get_song(song_id: str) -> Optional[dict]:
     """Get a song by ID."""
-    songs = load_songs()
-    for song in songs:
-        if song.get("id") == song_id:
-            return song
-    return None
+    return _storage.find_item("songs.json", song_id)
 
 
 # Skills
@@ -196,7 +253,15 @@ def save_daily_guitar_entry(entry: dict) -> dict:
 def get_days_since_last_tuning() -> dict:
     """Get days since last tuning for each guitar."""
     today = date.today()
+    return {
+        guitar: (today - tuned).days if tuned is not None else None
+        for guitar, tuned in _last_tuning_dates().items()
+    }
+
 
+@cached("guitar.last_tuning_dates")
+def _last_tuning_dates() -> dict:
+    """Date of the latest daily entry marking each guitar as tuned (None if never)."""
     result = {
         "acoustic": None,
         "electric": None,
@@ -219,13 +284,19 @@ def get_days_since_last_tuning() -> dict:
             continue
 
         if result["acoustic"] is None and entry.get("tuned_acoustic"):
-            result["acoustic"] = (today - file_date).days
+            result["acoustic"] = file_date
         if result["electric"] is None and entry.get("tuned_electric"):
-            result["electric"] = (today - file_date).days
+            result["electric"] = file_date
         if result["bass"] is None and entry.get("tuned_bass"):
-            result["bass"] = (today - file_date).days
+            result["bass"] = file_date
 
         if all(v is not None for v in result.values()):
             break
 
     return result
+
+
+# Sync
+def get_changes(since: int) -> dict:
+    """Songs created, updated or deleted after sync sequence `since`."""
+    return _storage.sync(since)
@@ -1,9 +1,11 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from datetime import date, datetime
 from typing import Optional
 from .models import DailyEntry, ExerciseEntry, TodoItem, TodoList
 from . import storage
+from gb_shared.instrumentation import install_metrics, install_profiling
+from gb_shared.storage.responses import stored_json
 
 app = FastAPI(
     title="GB Health API",
@@ -20,6 +22,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+install_metrics(app, "health", storage._storage)
+install_profiling(app, "health", storage._storage)
+app.add_event_handler("startup", lambda: storage._storage.start_packer(storage.DATE_COLLECTIONS))
+app.add_event_handler("shutdown", storage._storage.flush)
+
 
 @app.get("/")
 def root():
@@ -36,23 +43,23 @@ def create_daily_entry(entry: DailyEntry):
 
 
 @app.get("/daily/{date_str}")
-def get_daily_entry(date_str: str):
-    """Get a daily entry by date (YYYY-MM-DD)."""
+def get_daily_entry(date_str: str, request: Request):
+    """Get a daily entry by date (YYYY-MM-DD), sent as stored (with an ETag)."""
     try:
         d = datetime.strptime(date_str, "%Y-%m-%d").date()
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
 
-    entry = storage.get_daily_entry(d)
-    if not entry:
+    raw = storage.get_daily_entry_raw(d)
+    if raw is None:
         raise HTTPException(status_code=404, detail="Entry not found")
-    return entry
+    return stored_json(raw, request)
 
 
 @app.get("/daily")
-def list_daily_entries(limit: int = 30):
+async def list_daily_entries(limit: int = 30):
     """List recent daily entries."""
-    return storage.get_all_daily_entries(limit)
+    return await storage.aget_all_daily_entries(limit)
 
 
 @app.get("/daily/today")
@@ -66,22 +73,36 @@ def get_today():
 
 
 # Exercise entries
-@app.post("/exercise")
-def create_exercise_entry(entry: ExerciseEntry):
-    """Log an exercise session."""
+def _exercise_dict(entry: ExerciseEntry) -> dict:
+    """Dump an exercise entry, with its pace calculated if distance and duration are provided."""
     entry_dict = entry.model_dump()
-
-    # Calculate pace if distance and duration provided
     if entry.distance_miles and entry.duration_minutes and entry.distance_miles > 0:
         pace_minutes = entry.duration_minutes / entry.distance_miles
         pace_min = int(pace_minutes)
         pace_sec = int((pace_minutes - pace_min) * 60)
         entry_dict["pace_per_mile"] = f"{pace_min}:{pace_sec:02d}"
+    return entry_dict
+
 
-    saved = storage.save_exercise_entry(entry_dict)
+@app.post("/exercise")
+def create_exercise_entry(entry: ExerciseEntry):
+    """Log an exercise session."""
+    saved = storage.save_exercise_entry(_exercise_dict(entry))
     return saved
 
 
+@app.post("/exercise/batch")
+def create_exercise_entries(entries: list[ExerciseEntry]):
+    """
+    Log many exercise sessions (e.g. a week's worth) in one request.
+
+    Each day's file is written once. Returns one {"status", "result"} per
+    entry, in order.
+    """
+    saved = storage.save_exercise_entries([_exercise_dict(entry) for entry in entries])
+    return [{"status": 200, "result": entry} for entry in saved]
+
+
 @app.get("/exercise/{date_str}")
 def get_exercise_entries(date_str: str):
     """Get exercise entries for a date."""
@@ -94,9 +115,9 @@ def get_exercise_entries(date_str: str):
 
 
 @app.get("/exercise")
-def list_exercise_entries(limit: int = 30):
+async def list_exercise_entries(limit: int = 30):
     """List recent exercise entries."""
-    return storage.get_all_exercise_entries(limit)
+    return await storage.aget_all_exercise_entries(limit)
 
 
 # Todo list endpoints
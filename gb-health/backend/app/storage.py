@@ -7,12 +7,25 @@ from datetime import date, datetime
 from pathlib import Path
 from typing import Optional
 
-# Add shared module to path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "shared"))
-from storage import get_storage
+try:
+    from gb_shared.storage import Storage, get_storage
+except ImportError:
+    # Shared package not installed (pip install -e shared): use the source tree
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "shared"))
+    from gb_shared.storage import Storage, get_storage
+
+# Folders of YYYY-MM-DD.json files, packed into segments once a month closes
+DATE_COLLECTIONS = ["daily", "exercises", "todos"]
+
+
+def configure(storage: Storage) -> None:
+    """Keep this app's data in `storage`; also called by the benchmarks to point the app at other data."""
+    global _storage
+    _storage = storage
+
 
 # Initialize storage - automatically uses S3 in Lambda, local files otherwise
-_storage = get_storage("health", str(Path(__file__).parent.parent.parent / "data"))
+configure(get_storage("health", str(Path(__file__).parent.parent.parent / "data")))
 
 
 def date_to_key(d: date, folder: str) -> str:
@@ -32,7 +45,8 @@ def save_daily_entry(entry: dict) -> dict:
     entry_copy["updated_at"] = datetime.now().isoformat()
 
     key = date_to_key(entry_date, "daily")
-    _storage.write_json(key, entry_copy)
+    # The form saves on every tick, so bursts are coalesced into one write
+    _storage.write_json(key, entry_copy, defer=True)
     return entry_copy
 
 
@@ -42,38 +56,61 @@ def get_daily_entry(d: date) -> Optional[dict]:
     return _storage.read_json(key)
 
 
+def get_daily_entry_raw(d: date) -> Optional[bytes]:
+    """get_daily_entry() as the stored JSON bytes, unparsed."""
+    return _storage.read_bytes(date_to_key(d, "daily"))
+
+
 def get_all_daily_entries(limit: int = 30) -> list[dict]:
     """Get all daily entries, sorted by date descending."""
     keys = _storage.list_keys("daily/", ".json")
     keys = sorted(keys, reverse=True)[:limit]
+    return [data for data in _storage.read_many(keys) if data]
 
-    entries = []
-    for key in keys:
-        data = _storage.read_json(key)
-        if data:
-            entries.append(data)
-    return entries
+
+async def aget_all_daily_entries(limit: int = 30) -> list[dict]:
+    """Async get_all_daily_entries()."""
+    keys = await _storage.alist_keys("daily/", ".json")
+    keys = sorted(keys, reverse=True)[:limit]
+    return [data for data in await _storage.aread_many(keys) if data]
 
 
 # Exercise entries
-def save_exercise_entry(entry: dict) -> dict:
-    """Save an exercise entry. Multiple exercises per day stored in array."""
+def _new_exercise_entry(entry: dict) -> tuple[str, dict]:
+    """Storage key and stored form of a new exercise entry."""
     entry_date = entry.get("date")
     if isinstance(entry_date, str):
         entry_date = datetime.strptime(entry_date, "%Y-%m-%d").date()
 
-    key = date_to_key(entry_date, "exercises")
-    existing = _storage.read_json(key) or []
-
     entry_copy = entry.copy()
     entry_copy["date"] = entry_date.isoformat()
     entry_copy["created_at"] = datetime.now().isoformat()
-    existing.append(entry_copy)
+    return date_to_key(entry_date, "exercises"), entry_copy
 
-    _storage.write_json(key, existing)
+
+def save_exercise_entry(entry: dict) -> dict:
+    """Save an exercise entry. Multiple exercises per day stored in array."""
+    key, entry_copy = _new_exercise_entry(entry)
+    _storage.append_json(key, entry_copy)
     return entry_copy
 
 
+def save_exercise_entries(entries: list[dict]) -> list[dict]:
+    """Save many exercise entries, reading and writing each day's file once."""
+    saved = []
+    by_key: dict[str, list[dict]] = {}
+    for entry in entries:
+        key, entry_copy = _new_exercise_entry(entry)
+        by_key.setdefault(key, []).append(entry_copy)
+        saved.append(entry_copy)
+
+    keys = sorted(by_key)
+    _storage.write_many({
+        key: (existing or []) + by_key[key] for key, existing in zip(keys, _storage.read_many(keys))
+    })
+    return saved
+
+
 def get_exercise_entries(d: date) -> list[dict]:
     """Get all exercise entries for a date."""
     key = date_to_key(d, "exercises")
@@ -86,9 +123,19 @@ def get_all_exercise_entries(limit: int = 30) -> list[dict]:
     keys = sorted(keys, reverse=True)[:limit]
 
     entries = []
-    for key in keys:
-        day_entries = _storage.read_json(key) or []
-        entries.extend(day_entries)
+    for day_entries in _storage.read_many(keys):
+        entries.extend(day_entries or [])
+    return entries
+
+
+async def aget_all_exercise_entries(limit: int = 30) -> list[dict]:
+    """Async get_all_exercise_entries()."""
+    keys = await _storage.alist_keys("exercises/", ".json")
+    keys = sorted(keys, reverse=True)[:limit]
+
+    entries = []
+    for day_entries in await _storage.aread_many(keys):
+        entries.extend(day_entries or [])
     return entries
 
 
@@ -134,7 +181,7 @@ def toggle_todo_item(d: date, item_id: str, completed: bool) -> Optional[dict]:
         return None
 
     todo_list["updated_at"] = datetime.now().isoformat()
-    _storage.write_json(key, todo_list)
+    _storage.write_json(key, todo_list, defer=True)
     return todo_list
 
 
@@ -1,8 +1,10 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from datetime import datetime
+from typing import List, Optional
 from .models import ProspectCreate, ChecklistUpdate
 from . import storage
+from gb_shared.instrumentation import install_metrics, install_profiling
 
 app = FastAPI(title="GB Sales Close Checklist API", version="1.0.0")
 
@@ -14,21 +16,44 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+install_metrics(app, "sales", storage._storage)
+install_profiling(app, "sales", storage._storage)
+app.add_event_handler("shutdown", storage._storage.flush)
+
 
 @app.get("/")
 def root():
     return {"message": "GB Sales Close Checklist API", "status": "running"}
 
 
+@app.get("/sync")
+def sync(since: int = 0):
+    """
+    Changes since the client's last sync.
+
+    Returns the current sequence plus the prospects created or updated
+    ("upserted") and the ids deleted after `since`. Returns full_resync=true
+    instead when the client has to refetch everything: on its first sync, or
+    once `since` has aged out of the change journal.
+    """
+    return storage.get_changes(since)
+
+
 @app.get("/health")
 def health_check():
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
 
 @app.get("/prospects")
-def get_prospects():
-    """Get all prospects."""
-    return storage.get_all_prospects()
+async def get_prospects(limit: Optional[int] = None, before: Optional[str] = None):
+    """Get all prospects; with limit or before, one page newest first."""
+    prospects = await storage.aget_all_prospects()
+    if limit is not None or before is not None:
+        try:
+            prospects = storage.newest_first(prospects, limit, before)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+    return prospects
 
 
 @app.get("/prospects/{prospect_id}")
@@ -70,6 +95,23 @@ def update_checklist(prospect_id: str, update: ChecklistUpdate):
     return prospect
 
 
+@app.patch("/prospects/{prospect_id}/checklist/batch")
+def update_checklist_batch(prospect_id: str, updates: List[ChecklistUpdate]):
+    """
+    Update many checklist items of a prospect in one request.
+
+    The prospects file is written once. Returns one {"status", "result" or
+    "detail"} per update, in order.
+    """
+    results = storage.update_checklist_items(
+        prospect_id,
+        [{"item": u.item.value, "completed": u.completed, "notes": u.notes} for u in updates]
+    )
+    if results is None:
+        raise HTTPException(status_code=404, detail="Prospect not found")
+    return results
+
+
 @app.delete("/prospects/{prospect_id}")
 def delete_prospect(prospect_id: str):
     """Delete a prospect."""
@@ -6,16 +6,29 @@ import sys
 from datetime import datetime
 from pathlib import Path
 from typing import List, Optional
-import uuid
 
-# Add shared module to path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "shared"))
-from storage import get_storage
+try:
+    from gb_shared.storage import Storage, get_storage, new_id, newest_first
+except ImportError:
+    # Shared package not installed (pip install -e shared): use the source tree
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "shared"))
+    from gb_shared.storage import Storage, get_storage, new_id, newest_first
 
 from .models import ChecklistItem
 
+
+def configure(storage: Storage) -> None:
+    """Keep this app's data in `storage`; also called by the benchmarks to point the app at other data."""
+    global _storage
+    _storage = storage
+    # Whole-collection documents whose item changes are journaled for GET /sync
+    storage.track_changes("prospects", "prospects.json")
+    # Stored one item per line, so a lookup by id reads and parses only that item
+    storage.index_items("prospects.json")
+
+
 # Initialize storage
-_storage = get_storage("sales", str(Path(__file__).parent.parent.parent / "data"))
+configure(get_storage("sales", str(Path(__file__).parent.parent.parent / "data")))
 
 
 def _create_default_checklist() -> List[dict]:
@@ -31,9 +44,9 @@ def _load_prospects() -> List[dict]:
     return _storage.read_json("prospects.json") or []
 
 
-def _save_prospects(prospects: List[dict]):
-    """Save all prospects to file."""
-    _storage.write_json("prospects.json", prospects)
+def _save_prospects(prospects: List[dict], defer: bool = False):
+    """Save all prospects to file; defer coalesces rapid saves (see Storage.write_json)."""
+    _storage.write_json("prospects.json", prospects, defer=defer)
 
 
 def get_all_prospects() -> List[dict]:
@@ -41,13 +54,14 @@ def get_all_prospects() -> List[dict]:
     return _load_prospects()
 
 
+async def aget_all_prospects() -> List[dict]:
+    """Async get_all_prospects()."""
+    return await _storage.aread_json("prospects.json") or []
+
+
 def get_prospect(prospect_id: str) -> Optional[dict]:
     """Get a single prospect by ID."""
-    prospects = _load_prospects()
-    for p in prospects:
-        if p["id"] == prospect_id:
-            return p
-    return None
+    return _storage.find_item("prospects.json", prospect_id)
 
 
 def create_prospect(name: str, vertical: Optional[str] = None, notes: Optional[str] = None) -> dict:
@@ -55,7 +69,7 @@ def create_prospect(name: str, vertical: Optional[str] = None, notes: Optional[s
     prospects = _load_prospects()
 
     new_prospect = {
-        "id": str(uuid.uuid4()),
+        "id": new_id(),
         "name": name,
         "vertical": vertical,
         "checklist": _create_default_checklist(),
@@ -96,11 +110,42 @@ def update_checklist_item(prospect_id: str, item: str, completed: bool, notes: O
                     if notes is not None:
                         prospects[i]["checklist"][j]["notes"] = notes
                     prospects[i]["updated_at"] = datetime.now().isoformat()
-                    _save_prospects(prospects)
+                    _save_prospects(prospects, defer=True)
                     return prospects[i]
     return None
 
 
+def update_checklist_items(prospect_id: str, updates: List[dict]) -> Optional[List[dict]]:
+    """
+    Update several checklist items of a prospect with one read and one write.
+
+    Each update is {"item", "completed", "notes"}. Returns one result per
+    update, {"status": 200, "result": <checklist item>} or {"status": 404,
+    "detail": "Checklist item not found"}, or None if the prospect does not exist.
+    """
+    prospects = _load_prospects()
+    prospect = next((p for p in prospects if p["id"] == prospect_id), None)
+    if prospect is None:
+        return None
+
+    results = []
+    for update in updates:
+        checklist_item = next((c for c in prospect["checklist"] if c["item"] == update["item"]), None)
+        if checklist_item is None:
+            results.append({"status": 404, "detail": "Checklist item not found"})
+            continue
+        checklist_item["completed"] = update["completed"]
+        checklist_item["completed_at"] = datetime.now().isoformat() if update["completed"] else None
+        if update.get("notes") is not None:
+            checklist_item["notes"] = update["notes"]
+        results.append({"status": 200, "result": dict(checklist_item)})
+
+    if any(result["status"] == 200 for result in results):
+        prospect["updated_at"] = datetime.now().isoformat()
+        _save_prospects(prospects)
+    return results
+
+
 def delete_prospect(prospect_id: str) -> bool:
     """Delete a prospect."""
     prospects = _load_prospects()
@@ -111,3 +156,9 @@ def delete_prospect(prospect_id: str) -> bool:
         _save_prospects(prospects)
         return True
     return False
+
+
+# Sync
+def get_changes(since: int) -> dict:
+    """Prospects created, updated or deleted after sync sequence `since`."""
+    return _storage.sync(since)
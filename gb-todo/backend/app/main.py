@@ -2,8 +2,9 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from datetime import datetime
 from typing import Optional
-from .models import TodoItem, TodoUpdate, STORES
+from .models import TodoItem, TodoUpdate, TodoBatchOp, STORES
 from . import storage
+from gb_shared.instrumentation import install_metrics, install_profiling
 
 app = FastAPI(
     title="GB Todo API",
@@ -20,6 +21,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+install_metrics(app, "todo", storage._storage)
+install_profiling(app, "todo", storage._storage)
+app.add_event_handler("shutdown", storage._storage.flush)
+
 
 @app.get("/")
 def root():
@@ -35,9 +40,21 @@ def list_stores():
 
 # Todos
 @app.get("/todos")
-def list_todos(completed: Optional[bool] = None, category: Optional[str] = None, list_type: Optional[str] = None, store: Optional[str] = None):
-    """List all todos, optionally filtered."""
-    todos = storage.load_todos()
+async def list_todos(
+    completed: Optional[bool] = None,
+    category: Optional[str] = None,
+    list_type: Optional[str] = None,
+    store: Optional[str] = None,
+    limit: Optional[int] = None,
+    before: Optional[str] = None,
+):
+    """
+    List all todos, optionally filtered.
+
+    With limit or before, returns one page newest first: up to `limit` todos
+    created before the todo whose id is `before` (the last id of the previous page).
+    """
+    todos = await storage.aload_todos()
     if completed is not None:
         todos = [t for t in todos if t.get("completed") == completed]
     if category:
@@ -46,6 +63,11 @@ def list_todos(completed: Optional[bool] = None, category: Optional[str] = None,
         todos = [t for t in todos if t.get("list_type", "todo") == list_type]
     if store:
         todos = [t for t in todos if t.get("store") == store]
+    if limit is not None or before is not None:
+        try:
+            todos = storage.newest_first(todos, limit, before)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
     return todos
 
 
@@ -66,6 +88,25 @@ def add_todo(todo: TodoItem):
     return saved
 
 
+@app.post("/todos/batch")
+def batch_todos(operations: list[TodoBatchOp]):
+    """
+    Create, update, toggle and delete many todos in one request.
+
+    Operations apply in order with a single rewrite of the todo file.
+    Returns one {"status", "result" or "detail"} per operation, in order.
+    """
+    return storage.apply_todo_batch([
+        {
+            "op": operation.op,
+            "id": operation.id,
+            "todo": operation.todo.model_dump() if operation.todo else None,
+            "updates": operation.updates.model_dump(exclude_unset=True) if operation.updates else None,
+        }
+        for operation in operations
+    ])
+
+
 @app.put("/todos/{todo_id}")
 def update_todo(todo_id: str, updates: TodoUpdate):
     """Update an existing todo."""
@@ -94,6 +135,20 @@ def delete_todo(todo_id: str):
     return {"message": "Todo deleted"}
 
 
+# Sync
+@app.get("/sync")
+def sync(since: int = 0):
+    """
+    Changes since the client's last sync.
+
+    Returns the current sequence plus the todos created or updated
+    ("upserted") and the ids deleted after `since`. Returns full_resync=true
+    instead when the client has to refetch everything: on its first sync, or
+    once `since` has aged out of the change journal.
+    """
+    return storage.get_changes(since)
+
+
 # Health check
 @app.get("/health")
 def health_check():
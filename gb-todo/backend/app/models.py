@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, model_validator
+from typing import Literal, Optional
 from datetime import date
 
 
@@ -24,6 +24,24 @@ class TodoUpdate(BaseModel):
     store: Optional[str] = None
 
 
+class TodoBatchOp(BaseModel):
+    """One operation of POST /todos/batch."""
+    op: Literal["create", "update", "toggle", "delete"]
+    id: Optional[str] = None  # update, toggle, delete
+    todo: Optional[TodoItem] = None  # create
+    updates: Optional[TodoUpdate] = None  # update
+
+    @model_validator(mode="after")
+    def check_fields(self):
+        if self.op == "create" and self.todo is None:
+            raise ValueError("create needs 'todo'")
+        if self.op != "create" and not self.id:
+            raise ValueError(f"{self.op} needs 'id'")
+        if self.op == "update" and self.updates is None:
+            raise ValueError("update needs 'updates'")
+        return self
+
+
 # Predefined stores for shopping lists
 STORES = [
     {"id": "sams_club", "name": "Sam's Club"},
@@ -6,14 +6,27 @@ import sys
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
-from uuid import uuid4
 
-# Add shared module to path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "shared"))
-from storage import get_storage
+try:
+    from gb_shared.storage import Storage, get_storage, new_id, newest_first
+except ImportError:
+    # Shared package not installed (pip install -e shared): use the source tree
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "shared"))
+    from gb_shared.storage import Storage, get_storage, new_id, newest_first
+
+
+def configure(storage: Storage) -> None:
+    """Keep this app's data in `storage`; also called by the benchmarks to point the app at other data."""
+    global _storage
+    _storage = storage
+    # Whole-collection documents whose item changes are journaled for GET /sync
+    storage.track_changes("todos", "todos/todos.json")
+    # Stored one item per line, so a lookup by id reads and parses only that item
+    storage.index_items("todos/todos.json")
+
 
 # Initialize storage
-_storage = get_storage("todo", str(Path(__file__).parent.parent.parent / "data"))
+configure(get_storage("todo", str(Path(__file__).parent.parent.parent / "data")))
 
 
 def load_todos() -> list[dict]:
@@ -21,9 +34,14 @@ def load_todos() -> list[dict]:
     return _storage.read_json("todos/todos.json") or []
 
 
-def save_todos(todos: list[dict]):
-    """Save all todos to file."""
-    _storage.write_json("todos/todos.json", todos)
+async def aload_todos() -> list[dict]:
+    """Async load_todos()."""
+    return await _storage.aread_json("todos/todos.json") or []
+
+
+def save_todos(todos: list[dict], defer: bool = False):
+    """Save all todos to file; defer coalesces rapid saves (see Storage.write_json)."""
+    _storage.write_json("todos/todos.json", todos, defer=defer)
 
 
 def add_todo(todo: dict) -> dict:
@@ -31,7 +49,7 @@ def add_todo(todo: dict) -> dict:
     todos = load_todos()
 
     if not todo.get("id"):
-        todo["id"] = str(uuid4())
+        todo["id"] = new_id()
 
     todo["created_at"] = datetime.now().isoformat()
     todo["updated_at"] = datetime.now().isoformat()
@@ -61,6 +79,64 @@ def update_todo(todo_id: str, updates: dict) -> Optional[dict]:
     return None
 
 
+def apply_todo_batch(operations: list[dict]) -> list[dict]:
+    """
+    Apply many creates, updates, toggles and deletes with one load and one save.
+
+    Operations run in order and look like {"op": "create", "todo": {...}},
+    {"op": "update", "id": ..., "updates": {...}}, {"op": "toggle", "id": ...}
+    or {"op": "delete", "id": ...}. Returns one result per operation:
+    {"status": 200, "result": ...} or {"status": 404, "detail": "Todo not found"}.
+    """
+    todos = load_todos()
+    by_id = {todo.get("id"): todo for todo in todos}
+    results = []
+    changed = False
+
+    for op in operations:
+        now = datetime.now().isoformat()
+        if op["op"] == "create":
+            todo = dict(op["todo"])
+            if not todo.get("id"):
+                todo["id"] = new_id()
+            todo["created_at"] = now
+            todo["updated_at"] = now
+            if todo.get("due_date") and hasattr(todo["due_date"], "isoformat"):
+                todo["due_date"] = todo["due_date"].isoformat()
+            todos.append(todo)
+            by_id[todo["id"]] = todo
+            changed = True
+            results.append({"status": 200, "result": dict(todo)})
+            continue
+
+        todo = by_id.get(op["id"])
+        if todo is None:
+            results.append({"status": 404, "detail": "Todo not found"})
+            continue
+        changed = True
+
+        if op["op"] == "delete":
+            todos.remove(todo)
+            del by_id[op["id"]]
+            results.append({"status": 200, "result": {"message": "Todo deleted"}})
+            continue
+
+        if op["op"] == "toggle":
+            todo["completed"] = not todo.get("completed", False)
+        else:
+            for key, value in op["updates"].items():
+                if value is not None:
+                    if key == "due_date" and hasattr(value, "isoformat"):
+                        value = value.isoformat()
+                    todo[key] = value
+        todo["updated_at"] = now
+        results.append({"status": 200, "result": dict(todo)})
+
+    if changed:
+        save_todos(todos)
+    return results
+
+
 def delete_todo(todo_id: str) -> bool:
     """Delete a todo by ID."""
     todos = load_todos()
@@ -74,11 +150,7 @@ def delete_todo(todo_id: str) -> bool:
 
 def get_todo(todo_id: str) -> Optional[dict]:
     """Get a todo by ID."""
-    todos = load_todos()
-    for todo in todos:
-        if todo.get("id") == todo_id:
-            return todo
-    return None
+    return _storage.find_item("todos/todos.json", todo_id)
 
 
 def toggle_todo(todo_id: str) -> Optional[dict]:
@@ -89,6 +161,12 @@ def toggle_todo(todo_id: str) -> Optional[dict]:
             todo["completed"] = not todo.get("completed", False)
             todo["updated_at"] = datetime.now().isoformat()
             todos[i] = todo
-            save_todos(todos)
+            save_todos(todos, defer=True)
             return todo
     return None
+
+
+# Sync
+def get_changes(since: int) -> dict:
+    """Todos created, updated or deleted after sync sequence `since`."""
+    return _storage.sync(since)
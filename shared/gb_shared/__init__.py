@@ -0,0 +1,3 @@
+"""
+Code shared by the GB Personal backends: storage, instrumentation and the app registry.
+"""
@@ -0,0 +1,58 @@
+"""
+Registry of the GB Personal backends.
+
+Every backend lives in a package called `app`, so they cannot be imported
+side by side under that name. load() imports each one under a unique name
+(gb_<app>_app) so several backends can share one interpreter.
+"""
+
+import importlib
+import importlib.util
+import os
+import sys
+from pathlib import Path
+from types import ModuleType
+
+# Repository checkout holding the gb-* apps. Set GB_APPS_ROOT when the shared
+# package is installed from a copy rather than in editable mode.
+ROOT = Path(os.environ.get("GB_APPS_ROOT", Path(__file__).parent.parent.parent.parent))
+
+# App name -> port it listens on when run as its own service
+APPS = {
+    "health": 8000,
+    "guitar": 8001,
+    "finance": 8002,
+    "todo": 8003,
+    "food": 8004,
+    "sales": 8005,
+}
+
+
+def backend_dir(app_name: str) -> Path:
+    """Directory containing an app's backend `app` package."""
+    return ROOT / f"gb-{app_name}" / "backend"
+
+
+def data_dir(app_name: str) -> Path:
+    """Directory holding an app's data files."""
+    return ROOT / f"gb-{app_name}" / "data"
+
+
+def load(app_name: str, module: str = "main") -> ModuleType:
+    """Import a module of an app's backend, e.g. load("finance", "storage")."""
+    if app_name not in APPS:
+        raise KeyError(f"Unknown app '{app_name}'")
+
+    package_name = f"gb_{app_name}_app"
+    if package_name not in sys.modules:
+        package_dir = backend_dir(app_name) / "app"
+        spec = importlib.util.spec_from_file_location(
+            package_name,
+            package_dir / "__init__.py",
+            submodule_search_locations=[str(package_dir)],
+        )
+        package = importlib.util.module_from_spec(spec)
+        sys.modules[package_name] = package
+        spec.loader.exec_module(package)
+
+    return importlib.import_module(f"{package_name}.{module}")
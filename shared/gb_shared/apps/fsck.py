@@ -0,0 +1,429 @@
+"""
+Integrity check of every app's stored documents.
+
+    python -m gb_shared.apps.fsck [finance ...] [--workers N] [--quarantine] [--json]
+
+Reads each app's data directory directly (loose files, packed segment days
+and SQLite rows), on a process pool, and reports:
+
+- corrupt:   a document that is not valid JSON (read_json would raise)
+- invalid:   a document that does not validate against its pydantic model (RULES)
+- orphan:    a document or item whose date or month differs from its key,
+             e.g. a transaction dated 2024-03-02 in transactions/2024-03-01.json
+- duplicate: an id used twice within a document, or within a collection
+- index:     a segment offset index, sync journal or finance ledger that
+             does not match the data it indexes
+
+--quarantine moves corrupt loose files out of the data directory to
+gb-<app>/quarantine/<timestamp>/<key>, so reads see the key as missing
+instead of failing. Everything else is only reported. The exit status is 1
+when anything is found.
+
+The check reads without locks or write-ahead log replay, so it is safe next
+to running apps. Records still pending in the log are not checked.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from pydantic import TypeAdapter, ValidationError
+
+from . import APPS, data_dir, load
+
+
+class Rule(NamedTuple):
+    """Model of the documents whose key matches `pattern`."""
+    pattern: str
+    # Class in the app's models module
+    model: str
+    # The document is a list of models, rather than one
+    many: bool = False
+    # Where the documents' id-carrying items are: None for the list itself, or a list field of the model
+    items: Optional[str] = None
+    # Ids must be unique per document ("document") or across every key matching the rule ("collection")
+    unique: Optional[str] = None
+
+
+# Named groups of a pattern must equal the same attribute of the document
+# (or of every item, for a list document)
+DAY = r"(?P<date>\d{4}-\d{2}-\d{2})"
+
+RULES: dict[str, list[Rule]] = {
+    "finance": [
+        Rule(rf"transactions/{DAY}\.json", "Transaction", many=True, unique="collection"),
+        Rule(r"budgets/(?P<month>\d{4}-\d{2})\.json", "Budget"),
+        Rule(r"accounts/accounts\.json", "Account", many=True, unique="document"),
+    ],
+    "health": [
+        Rule(rf"daily/{DAY}\.json", "DailyEntry"),
+        Rule(rf"exercises/{DAY}\.json", "ExerciseEntry", many=True),
+        Rule(rf"todos/{DAY}\.json", "TodoList", items="items", unique="document"),
+    ],
+    "guitar": [
+        Rule(rf"practice-log/{DAY}\.json", "PracticeSession", many=True),
+        Rule(rf"daily/{DAY}\.json", "DailyGuitarEntry"),
+        Rule(r"songs\.json", "Song", many=True, unique="document"),
+        Rule(r"skills\.json", "Skills"),
+    ],
+    "food": [
+        Rule(rf"daily/{DAY}\.json", "DailyFoodLog", items="entries", unique="document"),
+        Rule(r"recipes\.json", "Recipe", many=True, unique="document"),
+        Rule(r"favorites\.json", "FavoriteFood", many=True, unique="document"),
+    ],
+    "todo": [
+        Rule(r"todos/todos\.json", "TodoItem", many=True, unique="document"),
+    ],
+    "sales": [
+        Rule(r"prospects\.json", "Prospect", many=True, unique="document"),
+    ],
+}
+
+# Loose files per worker task; a segment or a SQLite chunk is one task
+BATCH_SIZE = 256
+
+# Shown per invalid document
+MAX_ERRORS = 3
+
+# gb-finance storage._ledger_dir(). The storage module itself is not
+# imported: that would open a second Storage on the live data directory.
+def _ledger_dir(account: str) -> str:
+    return f"ledger/{hashlib.blake2b(account.encode(), digest_size=16).hexdigest()}/"
+
+
+_adapters: dict[tuple[str, str, bool], TypeAdapter] = {}
+
+
+class Problem(NamedTuple):
+    app: str
+    key: str
+    kind: str  # corrupt, invalid, orphan, duplicate or index
+    detail: str
+    # Where the document lives: "file", "segment:<path>" or "sqlite"
+    source: str = "file"
+
+
+# ---- worker side ----
+
+def _adapter(app_name: str, rule: Rule) -> TypeAdapter:
+    cache_key = (app_name, rule.model, rule.many)
+    adapter = _adapters.get(cache_key)
+    if adapter is None:
+        model = getattr(load(app_name, "models"), rule.model)
+        adapter = _adapters[cache_key] = TypeAdapter(list[model] if rule.many else model)
+    return adapter
+
+
+def _rule(app_name: str, key: str) -> tuple[Optional[Rule], Optional[re.Match]]:
+    for rule in RULES.get(app_name, []):
+        match = re.fullmatch(rule.pattern, key)
+        if match:
+            return rule, match
+    return None, None
+
+
+def _check_document(app_name: str, key: str, raw: bytes, source: str) -> dict:
+    """Problems of one document, plus what the cross-document checks need."""
+    result = {"key": key, "source": source, "problems": [], "ids": [], "rows": []}
+    problems = result["problems"]
+    rule, match = _rule(app_name, key)
+    try:
+        data = json.loads(raw)
+    except ValueError as exc:
+        problems.append(("corrupt", str(exc)))
+        return result
+    if rule is None:
+        if key == "sync/journal.json":
+            problems += _check_journal(data)
+        elif app_name == "finance" and key.startswith("ledger/") and key != "ledger/_meta.json":
+            result["ledger"] = data
+        return result
+
+    try:
+        doc = _adapter(app_name, rule).validate_python(data)
+    except ValidationError as exc:
+        for error in exc.errors()[:MAX_ERRORS]:
+            location = ".".join(str(part) for part in error["loc"])
+            problems.append(("invalid", f"{location}: {error['msg']}" if location else error["msg"]))
+        return result
+
+    for name, expected in match.groupdict().items():
+        for obj in doc if rule.many else [doc]:
+            value = getattr(obj, name, None)
+            if value is not None and str(value) != expected:
+                label = f" {obj.id}" if getattr(obj, "id", None) else ""
+                problems.append(("orphan", f"{rule.model}{label} has {name} {value}"))
+
+    items = doc if rule.items is None else getattr(doc, rule.items)
+    if rule.unique:
+        ids = [item.id for item in items if getattr(item, "id", None)]
+        seen = set()
+        for item_id in ids:
+            if item_id in seen:
+                problems.append(("duplicate", f"id {item_id} appears more than once"))
+            seen.add(item_id)
+        if rule.unique == "collection":
+            result["ids"] = ids
+    if app_name == "finance" and rule.model == "Transaction":
+        result["rows"] = [
+            (t.id, t.date.isoformat(), t.account, t.amount if t.type.value == "income" else -t.amount)
+            for t in doc
+        ]
+    return result
+
+
+def _check_journal(journal) -> list[tuple[str, str]]:
+    """Sequence numbers must rise above the floor (see storage.journal)."""
+    try:
+        previous = journal["floor"]
+        for entry in journal["entries"]:
+            if entry["seq"] <= previous:
+                return [("index", f"journal seq {entry['seq']} follows {previous}")]
+            previous = entry["seq"]
+    except (KeyError, TypeError) as exc:
+        return [("index", f"malformed journal: {exc!r}")]
+    return []
+
+
+def _check_files(app_name: str, root: str, keys: list[str]) -> list[dict]:
+    results = []
+    for key in keys:
+        try:
+            raw = (Path(root) / key).read_bytes()
+        except FileNotFoundError:
+            # Deleted since the listing
+            continue
+        results.append(_check_document(app_name, key, raw, "file"))
+    return results
+
+
+def _check_segment(app_name: str, root: str, path: str, shadowed: list[str]) -> list[dict]:
+    """Every day of a segment file, except days a loose file overrides."""
+    collection = path.split("/")[1]
+    source = f"segment:{path}"
+    with open(Path(root) / path, "rb") as f:
+        try:
+            index = json.loads(f.readline())["days"]
+        except (ValueError, KeyError, TypeError) as exc:
+            return [{"key": path, "source": source, "problems": [("index", f"unreadable index: {exc}")],
+                     "ids": [], "rows": []}]
+        body = f.read()
+    results = []
+    for day, (offset, length) in index.items():
+        key = f"{collection}/{day}.json"
+        if key in shadowed:
+            continue
+        if offset < 0 or offset + length > len(body):
+            results.append({"key": key, "source": source, "ids": [], "rows": [],
+                            "problems": [("index", f"offset {offset}+{length} is past the end ({len(body)})")]})
+            continue
+        results.append(_check_document(app_name, key, body[offset:offset + length], source))
+    return results
+
+
+def _check_rows(app_name: str, db_path: str, keys: list[str]) -> list[dict]:
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        placeholders = ",".join("?" * len(keys))
+        rows = conn.execute(f"SELECT key, data FROM documents WHERE key IN ({placeholders})", keys).fetchall()
+    finally:
+        conn.close()
+    return [_check_document(app_name, key, raw, "sqlite") for key, raw in rows]
+
+
+# ---- coordinator side ----
+
+def _tasks(app_name: str, root: Path) -> list[tuple]:
+    """(function, *args) per unit of work for an app's data directory."""
+    root_str = str(root)
+    db_path = root / f"{app_name}.sqlite3"
+    if db_path.exists():
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            keys = [key for (key,) in conn.execute("SELECT key FROM documents WHERE key LIKE '%.json'")]
+        finally:
+            conn.close()
+        return [(_check_rows, app_name, str(db_path), keys[i:i + BATCH_SIZE])
+                for i in range(0, len(keys), BATCH_SIZE)]
+
+    loose = sorted(
+        path.relative_to(root).as_posix() for path in root.rglob("*.json")
+        if not path.relative_to(root).parts[0].startswith("_")
+    )
+    tasks: list[tuple] = [(_check_files, app_name, root_str, loose[i:i + BATCH_SIZE])
+                          for i in range(0, len(loose), BATCH_SIZE)]
+    loose_set = set(loose)
+    for segment in sorted((root / "_segments").rglob("*.segment")):
+        path = segment.relative_to(root).as_posix()
+        collection = path.split("/")[1]
+        shadowed = [key for key in loose_set if key.startswith(collection + "/")]
+        tasks.append((_check_segment, app_name, root_str, path, shadowed))
+    return tasks
+
+
+def _run_task(task: tuple) -> list[dict]:
+    fn, *args = task
+    return fn(*args)
+
+
+def _check_ledgers(results: list[dict]) -> list[tuple[str, str, str]]:
+    """Finance ledgers against the transactions they index: (key, kind, detail)."""
+    docs = {r["key"]: r["ledger"] for r in results if "ledger" in r}
+    if not docs:
+        return []
+    from_transactions: dict[str, dict[str, tuple[str, float]]] = defaultdict(dict)
+    for result in results:
+        for transaction_id, day, account, signed in result["rows"]:
+            if account:
+                from_transactions[account][transaction_id] = (day, signed)
+
+    folders: dict[str, dict[str, object]] = defaultdict(dict)
+    for key, doc in docs.items():
+        folder, _, name = key.rpartition("/")
+        folders[folder + "/"][name[:-len(".json")]] = doc
+
+    problems = []
+    indexed = set()
+    for folder, parts in folders.items():
+        checkpoints_key = f"{folder}checkpoints.json"
+        if "checkpoints" not in parts:
+            problems.append((folder, "index", "ledger has no checkpoints.json"))
+            continue
+        try:
+            doc = parts.pop("checkpoints")
+            account, checkpoints = doc["account"], doc["months"]
+            checkpoints = {month: (float(net), int(count)) for month, (net, count) in checkpoints.items()}
+        except (KeyError, TypeError, ValueError) as exc:
+            problems.append((checkpoints_key, "index", f"malformed ledger: {exc!r}"))
+            continue
+        if _ledger_dir(account) != folder:
+            problems.append((checkpoints_key, "index", f"account {account} belongs in {_ledger_dir(account)}"))
+            continue
+        indexed.add(account)
+        expected = from_transactions.get(account, {})
+        seen = set()
+        for month in sorted(parts.keys() | checkpoints.keys()):
+            key = f"{folder}{month}.json"
+            entries = parts.get(month, [])
+            try:
+                net = sum(signed for _, _, signed in entries)
+            except (TypeError, ValueError) as exc:
+                problems.append((key, "index", f"malformed ledger: {exc!r}"))
+                continue
+            for day, transaction_id, signed in entries:
+                seen.add(transaction_id)
+                actual = expected.get(transaction_id)
+                if actual is None:
+                    problems.append((key, "index", f"entry {transaction_id} has no transaction"))
+                elif actual[0] != day or abs(actual[1] - signed) > 0.005:
+                    problems.append((key, "index", f"entry {transaction_id} is {day} {signed}, transaction is "
+                                                   f"{actual[0]} {actual[1]}"))
+                elif day[:7] != month:
+                    problems.append((key, "index", f"entry {transaction_id} is dated {day}"))
+            checkpoint = checkpoints.get(month, (0.0, 0))
+            if checkpoint[1] != len(entries) or abs(checkpoint[0] - net) > 0.005:
+                problems.append((checkpoints_key, "index", f"checkpoint {month} does not match the entries"))
+        for transaction_id in expected.keys() - seen:
+            problems.append((folder, "index", f"transaction {transaction_id} is missing from the ledger"))
+    for account in from_transactions.keys() - indexed:
+        problems.append(("ledger/", "index", f"account {account} has no ledger"))
+    return problems
+
+
+def check(app_name: str, root: Optional[Path] = None, executor=None) -> tuple[list[Problem], int]:
+    """Check one app's data directory. Returns (problems, documents checked)."""
+    root = Path(root) if root is not None else data_dir(app_name)
+    if not root.exists():
+        return [], 0
+    tasks = _tasks(app_name, root)
+    batches = executor.map(_run_task, tasks) if executor is not None else map(_run_task, tasks)
+    results = [result for batch in batches for result in batch]
+
+    problems = [
+        Problem(app_name, r["key"], kind, detail, r["source"])
+        for r in results for kind, detail in r["problems"]
+    ]
+    owners: dict[str, list[str]] = defaultdict(list)
+    for result in results:
+        for item_id in result["ids"]:
+            owners[item_id].append(result["key"])
+    for item_id, keys in owners.items():
+        if len(set(keys)) > 1:
+            for key in sorted(set(keys)):
+                others = ", ".join(k for k in sorted(set(keys)) if k != key)
+                problems.append(Problem(app_name, key, "duplicate", f"id {item_id} is also in {others}"))
+    if app_name == "finance":
+        ledger_keys = {r["key"] for r in results if "ledger" in r}
+        if "ledger/_meta.json" in {r["key"] for r in results} or ledger_keys:
+            problems += [Problem(app_name, key, kind, detail) for key, kind, detail in _check_ledgers(results)]
+    return problems, len(results)
+
+
+def quarantine(problems: list[Problem], roots: dict[str, Path]) -> list[Path]:
+    """Move corrupt loose files to gb-<app>/quarantine/<timestamp>/. Returns their new paths."""
+    stamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+    moved = []
+    for problem in problems:
+        if problem.kind != "corrupt" or problem.source != "file":
+            continue
+        root = roots[problem.app]
+        source = root / problem.key
+        target = root.parent / "quarantine" / stamp / problem.key
+        if source.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(str(source), target)
+            moved.append(target)
+    return moved
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m gb_shared.apps.fsck", description="Check every app's stored data.")
+    parser.add_argument("apps", nargs="*", help="Apps to check (default: all)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--quarantine", action="store_true", help="Move corrupt files out of the data directory")
+    parser.add_argument("--json", action="store_true", help="Print problems as JSON")
+    args = parser.parse_args(argv)
+
+    names = args.apps or list(APPS)
+    roots = {name: data_dir(name) for name in names}
+    started = time.perf_counter()
+    report = {}
+    executor = ProcessPoolExecutor(args.workers) if args.workers > 1 else None
+    try:
+        for name in names:
+            app_started = time.perf_counter()
+            problems, documents = check(name, roots[name], executor)
+            report[name] = (problems, documents, time.perf_counter() - app_started)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    all_problems = [p for problems, _, _ in report.values() for p in problems]
+    if args.json:
+        print(json.dumps([p._asdict() for p in all_problems], indent=2))
+    else:
+        for name, (problems, documents, seconds) in report.items():
+            print(f"{name}: {documents} documents, {len(problems)} problems ({seconds:.2f}s)")
+            for p in problems:
+                where = "" if p.source in ("file", "sqlite") else f" [{p.source}]"
+                print(f"  {p.key}{where}: {p.kind}: {p.detail}")
+        print(f"Checked in {time.perf_counter() - started:.2f}s")
+    if args.quarantine:
+        for path in quarantine(all_problems, roots):
+            print(f"Quarantined {path}", file=sys.stderr)
+    sys.exit(1 if all_problems else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Rewrite the ids of records created before time-ordered ids (see storage.ids).
+
+    python -m gb_shared.apps.migrate_ids [finance ...] [--dry-run]
+
+Opt-in and one-off. Stop the app first: the migration writes through the
+app's own storage module, and a running app would overwrite it from memory.
+
+Each record gets an id that encodes its created_at, or its day for records
+without one, so old records sort by creation time like new ones. Records
+with the same time keep their stored order. Ids that are already
+time-ordered are left alone, so running the migration again changes nothing.
+The records are the id-carrying collections that fsck knows about
+(fsck.RULES with a uniqueness scope).
+
+References to a rewritten id are rewritten with it:
+- finance: a transaction's account, when it holds an account id. The
+  ledgers, which list transaction ids, are rebuilt.
+- food: a log entry's recipe_id.
+
+All of an app's documents are written in one generation, so a snapshot
+reader never sees them half migrated. Tracked collections journal the
+change as a delete of the old id and an upsert of the new one. Synced
+clients therefore pick it up on their next GET /sync.
+"""
+
+import argparse
+import re
+import time
+from datetime import datetime
+from typing import Optional
+
+from gb_shared.storage.ids import IdSequence, is_time_id
+
+from . import APPS, load
+from .fsck import RULES, Rule
+
+# App -> (keys holding the reference, its field, keys of the records it may point to)
+REFERENCES = {
+    "finance": [(r"transactions/.*", "account", r"accounts/accounts\.json")],
+    "food": [(r"daily/.*", "recipe_id", r"recipes\.json|favorites\.json")],
+}
+
+
+def _items(rule: Rule, doc) -> list[dict]:
+    if rule.items:
+        doc = doc.get(rule.items) if isinstance(doc, dict) else None
+    return [item for item in doc if isinstance(item, dict)] if isinstance(doc, list) else []
+
+
+def _created_ms(item: dict, match: re.Match) -> int:
+    """Milliseconds since the epoch when the record was created, as best the record says."""
+    for value in (item.get("created_at"), item.get("date"), match.groupdict().get("date")):
+        if isinstance(value, str):
+            try:
+                return int(datetime.fromisoformat(value).timestamp() * 1000)
+            except ValueError:
+                continue
+    return 0
+
+
+def migrate(app_name: str, dry_run: bool = False) -> dict:
+    """Rewrite one app's ids. Returns {"documents": ..., "ids": ..., "references": ...} changed."""
+    module = load(app_name, "storage")
+    storage = module._storage
+    rules = [rule for rule in RULES.get(app_name, []) if rule.unique]
+
+    docs: dict[str, object] = {}
+    records = []  # (created ms, key, position, item)
+    for key in storage.list_keys(""):
+        for rule in rules:
+            match = re.fullmatch(rule.pattern, key)
+            if match:
+                break
+        else:
+            continue
+        doc = storage.read_json(key)
+        docs[key] = doc
+        for position, item in enumerate(_items(rule, doc)):
+            if item.get("id") and not is_time_id(item["id"]):
+                records.append((_created_ms(item, match), key, position, item))
+
+    sequence = IdSequence()
+    renamed: dict[str, dict[str, str]] = {}  # key -> old id -> new id
+    changed: set[str] = set()
+    for ms, key, _, item in sorted(records, key=lambda r: r[:3]):
+        new = sequence.next(ms)
+        renamed.setdefault(key, {}).setdefault(item["id"], new)
+        item["id"] = new
+        changed.add(key)
+
+    references = 0
+    for pattern, field, targets in REFERENCES.get(app_name, []):
+        renamed_targets = {}
+        for key, ids in renamed.items():
+            if re.fullmatch(targets, key):
+                renamed_targets.update(ids)
+        if not renamed_targets:
+            continue
+        for key, doc in docs.items():
+            if not re.fullmatch(pattern, key):
+                continue
+            rule = next(rule for rule in rules if re.fullmatch(rule.pattern, key))
+            for item in _items(rule, doc):
+                target = item.get(field)
+                if isinstance(target, str) and target in renamed_targets:
+                    item[field] = renamed_targets[target]
+                    references += 1
+                    changed.add(key)
+
+    if changed and not dry_run:
+        with storage.atomic():
+            storage.write_many({key: docs[key] for key in sorted(changed)})
+        if hasattr(module, "rebuild_ledgers"):
+            module.rebuild_ledgers()
+    return {"documents": len(changed), "ids": len(records), "references": references}
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m gb_shared.apps.migrate_ids",
+                                     description="Give existing records time-ordered ids.")
+    parser.add_argument("apps", nargs="*", help="Apps to migrate (default: all)")
+    parser.add_argument("--dry-run", action="store_true", help="Count what would change without writing")
+    args = parser.parse_args(argv)
+
+    for name in args.apps or list(APPS):
+        started = time.perf_counter()
+        result = migrate(name, args.dry_run)
+        verb = "would rewrite" if args.dry_run else "rewrote"
+        print(f"{name}: {verb} {result['ids']} ids and {result['references']} references "
+              f"in {result['documents']} documents ({time.perf_counter() - started:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
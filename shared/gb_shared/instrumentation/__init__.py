@@ -0,0 +1,65 @@
+"""
+Shared instrumentation for GB Personal backends.
+
+Records per-route and per-storage-operation latency histograms, bytes read
+and written, cache hits and in-flight requests, and serves them at /metrics
+in Prometheus text format.
+
+Per-request storage profiling (see profiling.py) is separately switched on
+with GB_PROFILING=1.
+
+Metrics are off unless GB_METRICS=1. When off, install_metrics() and
+instrument_storage() leave the app and storage untouched, so there is no
+overhead at all.
+"""
+
+import os
+from typing import Optional
+
+from .metrics import Counter, Gauge, Histogram, Registry
+
+ENABLED = os.environ.get("GB_METRICS", "").lower() in ("1", "true", "yes")
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "gb_http_requests_total", "HTTP requests handled.", ("app", "method", "route", "status"))
+HTTP_LATENCY = REGISTRY.histogram(
+    "gb_http_request_duration_seconds", "HTTP request latency.", ("app", "method", "route"))
+HTTP_IN_FLIGHT = REGISTRY.gauge(
+    "gb_http_requests_in_flight", "HTTP requests currently being handled.", ("app",))
+STORAGE_LATENCY = REGISTRY.histogram(
+    "gb_storage_operation_duration_seconds", "Storage operation latency.", ("app", "op"))
+STORAGE_BYTES_READ = REGISTRY.counter(
+    "gb_storage_bytes_read_total", "Bytes read from storage.", ("app",))
+STORAGE_BYTES_WRITTEN = REGISTRY.counter(
+    "gb_storage_bytes_written_total", "Bytes written to storage.", ("app",))
+CACHE_REQUESTS = REGISTRY.counter(
+    "gb_cache_requests_total", "Cache lookups by result (hit or miss).", ("cache", "result"))
+CACHE_HIT_RATIO = REGISTRY.gauge(
+    "gb_cache_hit_ratio", "Share of cache lookups that were hits since start.", ("cache",))
+
+
+def record_cache(cache: str, hit: bool, hit_ratio: Optional[float] = None) -> None:
+    """Count a cache lookup, and update the cache's hit ratio if the cache tracks one."""
+    if ENABLED:
+        CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+        if hit_ratio is not None:
+            CACHE_HIT_RATIO.set(hit_ratio, cache=cache)
+
+
+from .middleware import install_metrics, instrument_storage  # noqa: E402
+from .profiling import install_profiling  # noqa: E402
+
+__all__ = [
+    "ENABLED",
+    "REGISTRY",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "Registry",
+    "install_metrics",
+    "install_profiling",
+    "instrument_storage",
+    "record_cache",
+]
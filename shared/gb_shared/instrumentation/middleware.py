@@ -0,0 +1,94 @@
+"""
+ASGI middleware and Storage observers that feed the shared metrics.
+"""
+
+import time
+
+from . import (
+    ENABLED,
+    HTTP_IN_FLIGHT,
+    HTTP_LATENCY,
+    HTTP_REQUESTS,
+    REGISTRY,
+    STORAGE_BYTES_READ,
+    STORAGE_BYTES_WRITTEN,
+    STORAGE_LATENCY,
+)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency, status and in-flight count per route."""
+
+    def __init__(self, app, app_name: str):
+        self.app = app
+        self.app_name = app_name
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc(app=self.app_name)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_IN_FLIGHT.dec(app=self.app_name)
+            # Label by route template (/transactions/{transaction_id}), not raw path
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            method = scope.get("method", "")
+            HTTP_LATENCY.observe(elapsed, app=self.app_name, method=method, route=route_path)
+            HTTP_REQUESTS.inc(app=self.app_name, method=method, route=route_path, status=status["code"])
+
+
+def instrument_storage(storage) -> None:
+    """Observe a Storage instance's operations: latency per op and bytes moved (once)."""
+    if not ENABLED or getattr(storage, "_instrumented", False):
+        return
+    app_name = storage.app_name
+
+    def record(event):
+        STORAGE_LATENCY.observe(event.duration, app=app_name, op=event.op)
+
+    def record_read(event):
+        record(event)
+        STORAGE_BYTES_READ.inc(event.bytes, app=app_name)
+
+    def record_write(event):
+        record(event)
+        STORAGE_BYTES_WRITTEN.inc(event.bytes, app=app_name)
+
+    storage.add_observer(on_read=record_read, on_write=record_write, on_list=record, on_delete=record)
+    storage._instrumented = True
+
+
+def install_metrics(app, app_name: str, storage=None, record_requests: bool = True) -> None:
+    """
+    Add request metrics and a /metrics endpoint to a FastAPI app.
+
+    Pass record_requests=False for an app that only mounts other apps which
+    record their own requests (the gateway), so requests aren't counted twice.
+    """
+    if not ENABLED:
+        return
+
+    from fastapi.responses import PlainTextResponse
+
+    if storage is not None:
+        instrument_storage(storage)
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+    if record_requests:
+        app.add_middleware(MetricsMiddleware, app_name=app_name)
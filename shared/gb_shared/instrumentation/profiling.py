@@ -0,0 +1,239 @@
+"""
+Per-request storage profiling, switched on with a request header.
+
+With GB_PROFILING=1, a request carrying `X-GB-Profile: 1` gets two things:
+- Every storage operation it makes is recorded, grouped by calling function.
+- A sampling profiler collects its stacks.
+The breakdown is logged to the "gb.profile" logger, kept in memory for
+GET /debug/profiles and summarised in a Server-Timing response header.
+N+1 file patterns (one read_json per day file from one caller) show up as
+a single caller with a large op count.
+
+Requests without the header pay only the header check. The storage
+observer is attached only while a profiled request is in flight, and other
+requests served meanwhile are kept out of its profile. Storage operations
+count only in the profiled request's context (a ContextVar). Stack samples
+count only from a thread while it works for that request: the event loop
+while it runs the request's own coroutine, and a worker thread from its
+first storage operation for the request until it makes one for any other.
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Optional
+
+PROFILING_ENABLED = os.environ.get("GB_PROFILING", "").lower() in ("1", "true", "yes")
+PROFILE_HEADER = b"x-gb-profile"
+SAMPLE_INTERVAL = float(os.environ.get("GB_PROFILE_INTERVAL", "0.001"))
+
+ROOT = str(Path(__file__).parent.parent.parent.parent)
+
+logger = logging.getLogger("gb.profile")
+
+_current: ContextVar[Optional["RequestProfile"]] = ContextVar("gb_request_profile", default=None)
+_recent: deque = deque(maxlen=50)
+# Worker thread -> profile of the request its latest storage operation was for (None: unprofiled)
+_thread_profiles: dict[int, Optional["RequestProfile"]] = {}
+
+
+class RequestProfile:
+    """Storage operations and stack samples collected for one request."""
+
+    def __init__(self, app_name: str, method: str, path: str):
+        self.app_name = app_name
+        self.method = method
+        self.path = path
+        self.status = None
+        self.started = time.perf_counter()
+        self.events = []
+        # The event loop thread, and the middleware's frame for this request,
+        # which is on that thread's stack only while this request's code runs
+        self.loop_thread = threading.get_ident()
+        self.frame = None
+        self.samples: Counter = Counter()
+
+    def record(self, event) -> None:
+        self.events.append(event)
+
+    def owns(self, thread_id: int, frame) -> bool:
+        """True if the thread, at this sampled frame, is working for this request."""
+        if thread_id != self.loop_thread:
+            if _thread_profiles.get(thread_id) is not self:
+                return False
+            # A worker thread idling in its pool has no frames from this repo
+            while frame is not None:
+                if frame.f_code.co_filename.startswith(ROOT):
+                    return True
+                frame = frame.f_back
+            return False
+        while frame is not None:
+            if frame is self.frame:
+                return True
+            frame = frame.f_back
+        return False
+
+    def storage_ms(self) -> float:
+        return sum(e.duration for e in self.events) * 1000
+
+    def server_timing(self) -> str:
+        return f'storage;dur={self.storage_ms():.2f};desc="{len(self.events)} ops"'
+
+    def report(self) -> dict:
+        by_op: dict[str, dict] = {}
+        by_caller: dict[str, dict] = {}
+        for e in self.events:
+            # Group callers by function, so an N+1 loop adds up in one place
+            function = e.caller.rsplit(":", 1)[0]
+            for group, name in ((by_op, e.op), (by_caller, function)):
+                entry = group.setdefault(name, {"count": 0, "ms": 0.0, "bytes": 0})
+                entry["count"] += 1
+                entry["ms"] += e.duration * 1000
+                entry["bytes"] += e.bytes
+
+        for group in (by_op, by_caller):
+            for entry in group.values():
+                entry["ms"] = round(entry["ms"], 3)
+
+        callers = sorted(by_caller.items(), key=lambda item: item[1]["count"], reverse=True)
+        total_samples = sum(self.samples.values())
+        return {
+            "app": self.app_name,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "duration_ms": round((time.perf_counter() - self.started) * 1000, 3),
+            "storage": {
+                "ops": len(self.events),
+                "ms": round(self.storage_ms(), 3),
+                "by_op": by_op,
+                "by_caller": dict(callers),
+            },
+            "samples": {
+                "interval_ms": SAMPLE_INTERVAL * 1000,
+                "total": total_samples,
+                "stacks": [
+                    {"stack": stack, "count": count, "percent": round(count / total_samples * 100, 1)}
+                    for stack, count in self.samples.most_common(20)
+                ],
+            },
+        }
+
+
+def _collapse(frame) -> str:
+    """Collapse a stack to 'outer;...;inner', keeping only frames from this repo."""
+    frames = []
+    leaf = frame
+    while frame is not None:
+        if frame.f_code.co_filename.startswith(ROOT):
+            frames.append(f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_name}:{frame.f_lineno}")
+        frame = frame.f_back
+    if not frames:
+        frames.append(f"{leaf.f_code.co_name} ({Path(leaf.f_code.co_filename).name})")
+    return ";".join(reversed(frames))
+
+
+class SamplingProfiler(threading.Thread):
+    """Samples the stacks of a request's threads until stopped."""
+
+    def __init__(self, profile: RequestProfile, interval: float = SAMPLE_INTERVAL):
+        super().__init__(name="gb-profile-sampler", daemon=True)
+        self.profile = profile
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != self.ident and self.profile.owns(thread_id, frame):
+                    self.profile.samples[_collapse(frame)] += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware that profiles requests carrying the X-GB-Profile header."""
+
+    def __init__(self, app, app_name: str, storage=None):
+        self.app = app
+        self.app_name = app_name
+        self.storage = storage
+        self._active = 0
+        self._observer = None
+        self._lock = threading.Lock()
+
+    def _on_storage_event(self, event) -> None:
+        # Called for every request's storage operations while attached
+        profile = _current.get()
+        _thread_profiles[threading.get_ident()] = profile
+        if profile is not None:
+            profile.record(event)
+
+    def _attach(self) -> None:
+        with self._lock:
+            self._active += 1
+            if self.storage is not None and self._observer is None:
+                cb = self._on_storage_event
+                self._observer = self.storage.add_observer(on_read=cb, on_write=cb, on_list=cb, on_delete=cb)
+
+    def _detach(self) -> None:
+        with self._lock:
+            self._active -= 1
+            if self._active == 0 and self._observer is not None:
+                self.storage.remove_observer(self._observer)
+                self._observer = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or dict(scope["headers"]).get(PROFILE_HEADER, b"0") in (b"", b"0"):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(self.app_name, scope["method"], scope["path"])
+        profile.frame = sys._getframe()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", profile.server_timing().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = _current.set(profile)
+        self._attach()
+        sampler = SamplingProfiler(profile)
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            self._detach()
+            _current.reset(token)
+            for thread_id, owner in list(_thread_profiles.items()):
+                if owner is profile:
+                    _thread_profiles.pop(thread_id, None)
+            profile.frame = None
+            report = profile.report()
+            _recent.append(report)
+            logger.info(json.dumps(report))
+
+
+def install_profiling(app, app_name: str, storage=None) -> None:
+    """Add header-triggered request profiling and GET /debug/profiles to a FastAPI app."""
+    if not PROFILING_ENABLED:
+        return
+
+    @app.get("/debug/profiles", include_in_schema=False)
+    def recent_profiles(limit: int = 10):
+        """Most recent profiled requests, newest first."""
+        return [p for p in reversed(_recent) if p["app"] == app_name][:limit]
+
+    app.add_middleware(ProfilingMiddleware, app_name=app_name, storage=storage)
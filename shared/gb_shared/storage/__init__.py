@@ -0,0 +1,10 @@
+"""
+Shared storage module that works with both local files and S3.
+Automatically uses S3 when running in Lambda (USE_S3=true), otherwise uses local files.
+"""
+
+from .base import Storage, StorageEvent, get_storage
+from .cache import cached
+from .ids import id_time, is_time_id, new_id, newest_first
+
+__all__ = ["Storage", "StorageEvent", "cached", "get_storage", "id_time", "is_time_id", "new_id", "newest_first"]
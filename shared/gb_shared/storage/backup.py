@@ -0,0 +1,429 @@
+"""
+Incremental, deduplicated snapshots of the apps' data directories.
+
+    python -m gb_shared.storage.backup snapshot [--app finance ...]
+    python -m gb_shared.storage.backup list
+    python -m gb_shared.storage.backup restore finance --to DIR [--at 2026-10-01T03:00] [--key KEY ...]
+    python -m gb_shared.storage.backup export [--at ...] > snapshot.tar
+    python -m gb_shared.storage.backup cat finance transactions/2024-01-01.json [--at ...]
+
+The repository (GB_BACKUP_DIR, default `backups/` next to the gb-* folders)
+holds each distinct file content once, and one manifest per snapshot:
+
+    blobs/ab/abcdef....gz       gzip of a file, named by the SHA-256 of its content
+    snapshots/<id>.json         {"id", "created_at", "apps": {app: {"consistent": bool,
+                                 "files": {path: {"sha256", "size", "stat": [size, mtime_ns]}}}}}
+
+A snapshot only reads files whose size or mtime differ from the previous
+snapshot, and only stores contents the repository does not have yet. Past
+days never change, so a nightly snapshot reads and stores little more than
+the day's new files.
+
+Writers are never blocked. Storage writes a file by renaming a finished
+copy over it, and the write-ahead log is append-only, so every file read is
+some whole version of it. After reading, the directory is listed again.
+Files that changed in the meantime are read again, until a listing matches
+everything read. At that moment the captured versions were all current at
+once, so the snapshot is consistent across files too. That normally takes
+one pass. A directory that keeps changing for MAX_PASSES passes is saved
+anyway, marked "consistent": false. SQLite databases are copied with
+SQLite's online backup API. Deferred writes that a running app has not yet
+flushed are in memory only, and are not included.
+
+A restore writes files exactly as they were. The apps fold pending log
+records in, as after a restart. `--at` picks the latest snapshot taken at or
+before that time. `cat` and `restore --key` produce a single document as
+Storage would have read it, even from a packed segment or with log records
+still pending. `export` streams a whole snapshot as a tar archive.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import sys
+import tarfile
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+
+from .base import TMP_SUFFIX, _data_dir
+from .segments import DATE_KEY, PERIODS, SEGMENT_SUFFIX, SEGMENTS_DIR
+from .wal import WAL_DIR, apply_entries
+
+ROOT = Path(__file__).parent.parent.parent.parent
+BACKUP_DIR = Path(os.environ.get("GB_BACKUP_DIR", ROOT / "backups"))
+
+# Listing/reading passes before a still-changing directory is saved as is
+MAX_PASSES = 5
+
+_CHUNK = 1 << 20
+
+# SQLite's side files; the database itself is copied with the backup API
+_SQLITE_SIDE_FILES = ("-wal", "-shm", "-journal")
+
+logger = logging.getLogger("gb.storage")
+
+
+def default_apps() -> dict[str, Path]:
+    """App name -> data directory, for every gb-<app>/data next to the shared package."""
+    return {
+        path.parent.name[len("gb-"):]: path
+        for path in sorted(ROOT.glob("gb-*/data"))
+        if path.is_dir()
+    }
+
+
+class Repository:
+    """Content-addressed blobs plus snapshot manifests in one directory."""
+
+    def __init__(self, path: Path = BACKUP_DIR):
+        self.path = Path(path)
+        self.blobs = self.path / "blobs"
+        self.snapshots = self.path / "snapshots"
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.blobs / digest[:2] / f"{digest}.gz"
+
+    def has_blob(self, digest: str) -> bool:
+        return self._blob_path(digest).exists()
+
+    def open_blob(self, digest: str) -> BinaryIO:
+        """A stream of a stored file's content."""
+        return gzip.open(self._blob_path(digest), "rb")
+
+    def put_blob(self, src: BinaryIO, size: int, digest: str) -> None:
+        """Store the next `size` bytes of `src` as blob `digest`, unless the repository already has it."""
+        path = self._blob_path(digest)
+        if path.exists():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}{TMP_SUFFIX}")
+        with open(tmp, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as out:
+            while size > 0:
+                chunk = src.read(min(size, _CHUNK))
+                if not chunk:
+                    break
+                out.write(chunk)
+                size -= len(chunk)
+        os.replace(tmp, path)
+
+    # ---- manifests ----
+
+    def list(self) -> list[dict]:
+        """Every snapshot's manifest, oldest first."""
+        if not self.snapshots.exists():
+            return []
+        return [json.loads(path.read_bytes()) for path in sorted(self.snapshots.glob("*.json"))]
+
+    def find(self, at: Optional[datetime] = None) -> Optional[dict]:
+        """The latest snapshot taken at or before `at` (default: the latest)."""
+        found = None
+        for manifest in self.list():
+            if at is not None and datetime.fromisoformat(manifest["created_at"]) > at:
+                break
+            found = manifest
+        return found
+
+    def save(self, manifest: dict) -> None:
+        # Written last and renamed into place: a failed snapshot leaves only unreferenced blobs
+        self.snapshots.mkdir(parents=True, exist_ok=True)
+        path = self.snapshots / f"{manifest['id']}.json"
+        tmp = path.with_name(path.name + TMP_SUFFIX)
+        tmp.write_text(json.dumps(manifest, indent=2))
+        os.replace(tmp, path)
+
+
+# ---- snapshot ----
+
+def _listing(data_dir: Path) -> dict[str, tuple[int, int]]:
+    """Relative path -> (size, mtime_ns) of every file worth backing up."""
+    listing = {}
+    for path in data_dir.rglob("*"):
+        name = path.name
+        if name.endswith(TMP_SUFFIX) or name.endswith(_SQLITE_SIDE_FILES):
+            continue
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            continue
+        if not path.is_file():
+            continue
+        identity = (st.st_size, st.st_mtime_ns)
+        if name.endswith(".sqlite3"):
+            # Committed pages may still be in the -wal file
+            wal = path.with_name(name + "-wal")
+            if wal.exists():
+                wal_st = wal.stat()
+                identity = (st.st_size + wal_st.st_size, max(st.st_mtime_ns, wal_st.st_mtime_ns))
+        listing[path.relative_to(data_dir).as_posix()] = identity
+    return listing
+
+
+def _hash(f: BinaryIO) -> str:
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: f.read(_CHUNK), b""):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _capture_file(repo: Repository, path: Path) -> tuple[str, int]:
+    """Store one file's content; returns (digest, size)."""
+    with open(path, "rb") as f:
+        digest = _hash(f)
+        size = f.tell()
+        if not repo.has_blob(digest):
+            # Only the hashed bytes: a log may have grown since
+            f.seek(0)
+            repo.put_blob(f, size, digest)
+    return digest, size
+
+
+def _capture_sqlite(repo: Repository, path: Path) -> tuple[str, int]:
+    """Store a consistent copy of a live SQLite database; returns (digest, size)."""
+    with tempfile.TemporaryDirectory(prefix="gb-backup-") as tmp:
+        copy = Path(tmp) / path.name
+        src = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        dst = sqlite3.connect(copy)
+        try:
+            src.backup(dst)
+        finally:
+            dst.close()
+            src.close()
+        return _capture_file(repo, copy)
+
+
+def _capture(repo: Repository, data_dir: Path, previous: dict[str, dict]) -> tuple[dict[str, dict], bool]:
+    """Capture a data directory, re-reading changed files until a listing matches. Returns (files, consistent)."""
+    files = dict(previous)
+    for _ in range(MAX_PASSES):
+        listing = _listing(data_dir)
+        changed = [path for path, identity in listing.items()
+                   if path not in files or tuple(files[path]["stat"]) != identity]
+        for path in set(files) - set(listing):
+            del files[path]
+        if not changed:
+            return files, True
+        for path in changed:
+            full = data_dir / path
+            try:
+                capture = _capture_sqlite if path.endswith(".sqlite3") else _capture_file
+                digest, size = capture(repo, full)
+            except FileNotFoundError:
+                files.pop(path, None)
+                continue
+            # The listing's identity, not the file's current one: a write since
+            # the listing shows up as a change in the next pass
+            files[path] = {"sha256": digest, "size": size, "stat": list(listing[path])}
+    return files, False
+
+
+def snapshot(repo: Repository, apps: Optional[dict[str, Path]] = None) -> dict:
+    """Take a snapshot of every app's data directory. Returns its manifest."""
+    apps = apps if apps is not None else default_apps()
+    created = datetime.now(timezone.utc)
+    previous = repo.find()
+    manifest = {
+        "id": created.strftime("%Y%m%dT%H%M%S%fZ"),
+        "created_at": created.isoformat(),
+        "apps": {},
+    }
+    for app_name, data_dir in apps.items():
+        before = (previous or {}).get("apps", {}).get(app_name, {}).get("files", {})
+        files, consistent = _capture(repo, Path(data_dir), before)
+        if not consistent:
+            logger.warning("Backup of %s kept changing; saved without a consistent cut", app_name)
+        manifest["apps"][app_name] = {"consistent": consistent, "files": files}
+    repo.save(manifest)
+    return manifest
+
+
+# ---- restore ----
+
+def restore(repo: Repository, manifest: dict, app_name: str, target: Path) -> int:
+    """Write an app's files from a snapshot into `target`, one blob stream at a time. Returns the count."""
+    files = manifest["apps"][app_name]["files"]
+    for path, entry in files.items():
+        dest = target / path
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dest.with_name(dest.name + TMP_SUFFIX)
+        with repo.open_blob(entry["sha256"]) as src, open(tmp, "wb") as out:
+            shutil.copyfileobj(src, out, _CHUNK)
+        os.replace(tmp, dest)
+    return len(files)
+
+
+def export_tar(repo: Repository, manifest: dict, out: BinaryIO, apps: Optional[list[str]] = None) -> None:
+    """Stream a snapshot as an uncompressed tar of `<app>/<path>` entries to a non-seekable `out`."""
+    with tarfile.open(fileobj=out, mode="w|") as tar:
+        for app_name, app in manifest["apps"].items():
+            if apps and app_name not in apps:
+                continue
+            for path, entry in app["files"].items():
+                info = tarfile.TarInfo(f"{app_name}/{path}")
+                info.size = entry["size"]
+                info.mtime = entry["stat"][1] // 1_000_000_000
+                with repo.open_blob(entry["sha256"]) as src:
+                    tar.addfile(info, src)
+
+
+def _read(repo: Repository, files: dict[str, dict], path: str) -> Optional[bytes]:
+    entry = files.get(path)
+    if entry is None:
+        return None
+    with repo.open_blob(entry["sha256"]) as f:
+        return f.read()
+
+
+def _packed(repo: Repository, files: dict[str, dict], key: str) -> Optional[bytes]:
+    """A day's bytes from the snapshot's segment for it, if it was packed."""
+    match = DATE_KEY.match(key)
+    if not match:
+        return None
+    for length in PERIODS.values():
+        segment = f"{SEGMENTS_DIR}/{match['collection']}/{match['day'][:length]}{SEGMENT_SUFFIX}"
+        if segment in files:
+            with repo.open_blob(files[segment]["sha256"]) as f:
+                index = json.loads(f.readline())["days"]
+                if match["day"] in index:
+                    offset, size = index[match["day"]]
+                    f.seek(offset, os.SEEK_CUR)
+                    return f.read(size)
+    return None
+
+
+def _pending(repo: Repository, files: dict[str, dict], key: str) -> list[dict]:
+    """Log records for key still pending in the snapshot, in replay order (see WriteAheadLog._replay)."""
+    log = f"{WAL_DIR}/{key.split('/', 1)[0]}.ndjson"
+    entries = []
+    for path in (log + ".compacting", log):
+        raw = _read(repo, files, path)
+        for line in (raw or b"").splitlines():
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if entry["key"] != key:
+                continue
+            if entry.get("clear"):
+                entries.clear()
+            else:
+                entries.append(entry)
+    return entries
+
+
+def read_document(repo: Repository, manifest: dict, app_name: str, key: str) -> Optional[bytes]:
+    """One key's JSON as Storage would have read it when the snapshot was taken (file backend only)."""
+    files = manifest["apps"][app_name]["files"]
+    raw = _read(repo, files, key)
+    if raw is None:
+        raw = _packed(repo, files, key)
+    entries = _pending(repo, files, key)
+    if not entries:
+        return raw
+    data = json.loads(raw) if raw is not None else None
+    for entry in entries:
+        # Replay skips records that compaction already wrote into the file
+        existing = data.get(entry.get("field")) if isinstance(data, dict) else data
+        if not (existing and entry["record"] in existing):
+            data = apply_entries(data, [entry])
+    return json.dumps(data, indent=2).encode()
+
+
+# ---- command line ----
+
+def _parse_at(value: Optional[str]) -> Optional[datetime]:
+    if value is None:
+        return None
+    at = datetime.fromisoformat(value)
+    return at if at.tzinfo else at.astimezone()
+
+
+def _require(repo: Repository, at: Optional[str]) -> dict:
+    manifest = repo.find(_parse_at(at))
+    if manifest is None:
+        sys.exit(f"No snapshot in {repo.path}" + (f" at or before {at}" if at else ""))
+    return manifest
+
+
+def _sizes(manifest: dict) -> Iterator[int]:
+    for app in manifest["apps"].values():
+        for entry in app["files"].values():
+            yield entry["size"]
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m gb_shared.storage.backup", description="Snapshot and restore the apps' data directories."
+    )
+    parser.add_argument("--repo", default=str(BACKUP_DIR), help="Backup repository (default: GB_BACKUP_DIR)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    take = commands.add_parser("snapshot", help="Take a snapshot")
+    take.add_argument("--app", action="append", help="Only this app (repeatable; default: all)")
+
+    commands.add_parser("list", help="List snapshots")
+
+    put_back = commands.add_parser("restore", help="Restore an app's files")
+    put_back.add_argument("app")
+    put_back.add_argument("--to", required=True, help="Directory to restore into")
+    put_back.add_argument("--at", help="Latest snapshot at or before this ISO time (default: latest)")
+    put_back.add_argument("--key", action="append", help="Only this key (repeatable)")
+
+    export = commands.add_parser("export", help="Stream a snapshot as tar to stdout")
+    export.add_argument("--at", help="Latest snapshot at or before this ISO time (default: latest)")
+    export.add_argument("--app", action="append", help="Only this app (repeatable; default: all)")
+
+    cat = commands.add_parser("cat", help="Write one document to stdout")
+    cat.add_argument("app")
+    cat.add_argument("key")
+    cat.add_argument("--at", help="Latest snapshot at or before this ISO time (default: latest)")
+
+    args = parser.parse_args(argv)
+    repo = Repository(Path(args.repo))
+
+    if args.command == "snapshot":
+        apps = default_apps()
+        if args.app:
+            apps = {name: apps.get(name, _data_dir(name)) for name in args.app}
+        manifest = snapshot(repo, apps)
+        files = sum(len(app["files"]) for app in manifest["apps"].values())
+        print(f"Snapshot {manifest['id']}: {files} files, {sum(_sizes(manifest))} bytes")
+    elif args.command == "list":
+        for manifest in repo.list():
+            apps = ", ".join(
+                name + ("" if app["consistent"] else " (inconsistent)") for name, app in manifest["apps"].items()
+            )
+            print(f"{manifest['id']}  {manifest['created_at']}  {sum(_sizes(manifest)):>12} bytes  {apps}")
+    elif args.command == "restore":
+        manifest = _require(repo, args.at)
+        target = Path(args.to)
+        if args.key:
+            for key in args.key:
+                raw = read_document(repo, manifest, args.app, key)
+                if raw is None:
+                    sys.exit(f"{key} is not in snapshot {manifest['id']}")
+                dest = target / key
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                dest.write_bytes(raw)
+            print(f"Restored {len(args.key)} documents from {manifest['id']} into {target}")
+        else:
+            count = restore(repo, manifest, args.app, target)
+            print(f"Restored {count} files from {manifest['id']} into {target}")
+    elif args.command == "export":
+        export_tar(repo, _require(repo, args.at), sys.stdout.buffer, args.app)
+    elif args.command == "cat":
+        manifest = _require(repo, args.at)
+        raw = read_document(repo, manifest, args.app, args.key)
+        if raw is None:
+            sys.exit(f"{args.key} is not in snapshot {manifest['id']}")
+        sys.stdout.buffer.write(raw)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,875 @@
+"""
+Local file storage for GB Personal apps.
+"""
+
+import asyncio
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from stat import S_ISDIR
+from typing import Callable, Iterator, NamedTuple, Optional, List
+
+from .cache import recording
+from .generations import Generations, pinned
+from .journal import ChangeJournal
+from .lazy import LineIndex, iter_array
+from .segments import DATE_KEY, SEGMENT_SUFFIX, SEGMENTS_DIR, SegmentStore, start_packer
+from .wal import WAL_DIR, WriteAheadLog
+from .writebehind import WINDOW as WRITE_BEHIND_WINDOW, WriteBehind
+
+_PACKAGE_DIR = str(Path(__file__).parent)
+
+# Suffix of files being written, before they are renamed into place
+TMP_SUFFIX = ".tmp"
+
+STORAGE_BACKEND = os.environ.get("GB_STORAGE_BACKEND", "file").lower()
+
+# Threads for the async API, separate from the AnyIO pool that runs sync
+# endpoints, so slow storage I/O cannot starve request handling
+IO_THREADS = int(os.environ.get("GB_STORAGE_IO_THREADS", "64"))
+# Parallel reads per aread_many() call
+READ_FANOUT = int(os.environ.get("GB_STORAGE_READ_FANOUT", "8"))
+
+# How far a folder's mtime may trail the write that set it (coarse file system clocks)
+MTIME_SLACK_NS = 2_000_000_000
+
+_io_executor: Optional[ThreadPoolExecutor] = None
+
+
+class StorageEvent(NamedTuple):
+    """One storage operation, as reported to observers."""
+    op: str          # "read", "write", "list" or "delete"
+    key: str         # the key, or the prefix for "list"
+    bytes: int       # bytes read or written (0 for list/delete)
+    duration: float  # seconds
+    caller: str      # first frame outside the storage package, "module.function:line"
+
+
+Observer = Callable[[StorageEvent], None]
+
+
+def _caller() -> str:
+    """Describe the code that called into storage."""
+    frame = sys._getframe(2)
+    while frame and frame.f_code.co_filename.startswith(_PACKAGE_DIR):
+        frame = frame.f_back
+    if frame is None:
+        return "unknown"
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}.{frame.f_code.co_name}:{frame.f_lineno}"
+
+
+class Storage:
+    """Local file system storage."""
+
+    def __init__(self, app_name: str, base_path: str = None):
+        """
+        Initialize storage for a specific app.
+
+        Args:
+            app_name: Name of the app (e.g., 'health', 'guitar', 'food')
+            base_path: Base path for storage
+        """
+        self.app_name = app_name
+        self.data_dir = _data_dir(app_name, base_path)
+        # Each observer maps an op ("read", "write", ...) to a callback.
+        # Replaced, never mutated, so it can be iterated without a lock.
+        self._observers: tuple[dict[str, Observer], ...] = ()
+        # Called with the written keys after each write (see storage.cache); replaced like _observers
+        self._change_listeners: tuple[Callable[[List[str]], None], ...] = ()
+        # Deferred write_json() documents; created by the first deferred write
+        self._write_behind: Optional[WriteBehind] = None
+        # Item-level change journal for delta sync; created by track_changes()
+        self._journal: Optional[ChangeJournal] = None
+        # Packed day files; created by the first pack()
+        self._segments: Optional[SegmentStore] = None
+        if (self.data_dir / SEGMENTS_DIR).exists():
+            self._segments = SegmentStore(self.data_dir)
+        # Generation counter and pre-write content for snapshot() readers
+        self._generations = Generations(self._current_bytes)
+        # Keys written in line layout (see index_items) -> index of the latest known version
+        self._line_indexes: dict[str, Optional[LineIndex]] = {}
+        # Folder -> ((inode, mtime_ns), subfolders) when last listed, for signature()
+        self._folders: dict[str, tuple[tuple[int, int], list[str]]] = {}
+        # Created by the first append_json(), or here if an earlier process left log files.
+        # Last: replaying those reads and writes through the state set up above.
+        self._wal: Optional[WriteAheadLog] = None
+        if (self.data_dir / WAL_DIR).exists():
+            self._wal = WriteAheadLog(self.data_dir, self._read_bytes, self._compacted)
+
+    def add_observer(
+        self,
+        on_read: Optional[Observer] = None,
+        on_write: Optional[Observer] = None,
+        on_list: Optional[Observer] = None,
+        on_delete: Optional[Observer] = None,
+    ) -> dict[str, Observer]:
+        """
+        Register callbacks that receive a StorageEvent after each operation.
+
+        Returns a handle for remove_observer(). With no observers registered
+        operations are not timed at all.
+        """
+        callbacks = {"read": on_read, "write": on_write, "list": on_list, "delete": on_delete}
+        handle = {op: cb for op, cb in callbacks.items() if cb}
+        self._observers = self._observers + (handle,)
+        return handle
+
+    def remove_observer(self, handle: dict[str, Observer]) -> None:
+        """Unregister an observer returned by add_observer()."""
+        self._observers = tuple(o for o in self._observers if o is not handle)
+
+    def add_change_listener(self, listener: Callable[[List[str]], None]) -> None:
+        """Call listener(keys) after every write_json(), write_many(), append_json() and delete()."""
+        self._change_listeners = self._change_listeners + (listener,)
+
+    def remove_change_listener(self, listener: Callable[[List[str]], None]) -> None:
+        """Unregister a listener added with add_change_listener()."""
+        self._change_listeners = tuple(cb for cb in self._change_listeners if cb != listener)
+
+    def _changed(self, keys: List[str]) -> None:
+        for listener in self._change_listeners:
+            listener(keys)
+
+    def _notify(self, op: str, key: str, nbytes: int, started: float) -> None:
+        event = StorageEvent(op, key, nbytes, time.perf_counter() - started, _caller())
+        for observer in self._observers:
+            callback = observer.get(op)
+            if callback:
+                callback(event)
+
+    def _get_path(self, key: str) -> Path:
+        """Convert key to file path."""
+        return self.data_dir / key
+
+    def _ensure_dir(self, path: Path) -> None:
+        """Ensure parent directory exists."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+    # ---- file primitives (no observers, no write-ahead log) ----
+    # Loose files win over segments; writing a packed day drops it from its segment.
+
+    def _read_bytes(self, key: str) -> Optional[bytes]:
+        path = self._get_path(key)
+        if not path.exists():
+            return self._segments.read(key) if self._segments is not None else None
+        with open(path, "rb") as f:
+            return f.read()
+
+    def _write_bytes(self, key: str, raw: bytes) -> None:
+        segments = self._segments
+        if segments is not None and DATE_KEY.match(key):
+            with segments.lock:
+                self._write_file(key, raw)
+                segments.discard(key)
+        else:
+            self._write_file(key, raw)
+
+    def _write_file(self, key: str, raw: bytes) -> None:
+        # Written aside and renamed over the file, so a reader in any process
+        # (e.g. storage.backup) sees the old or the new content, never a torn file
+        path = self._get_path(key)
+        self._ensure_dir(path)
+        tmp = path.with_name(f"{path.name}.{threading.get_ident()}{TMP_SUFFIX}")
+        with open(tmp, "wb") as f:
+            f.write(raw)
+        os.replace(tmp, path)
+
+    def _delete(self, key: str) -> bool:
+        segments = self._segments
+        if segments is not None and DATE_KEY.match(key):
+            with segments.lock:
+                packed = segments.has(key)
+                segments.discard(key)
+                return self._delete_file(key) or packed
+        return self._delete_file(key)
+
+    def _delete_file(self, key: str) -> bool:
+        path = self._get_path(key)
+        deleted = path.exists()
+        if deleted:
+            path.unlink()
+        return deleted
+
+    def _open_file(self, key: str):
+        """The key's loose file opened for reading, or None (packed days and other backends have none)."""
+        try:
+            return open(self._get_path(key), "rb")
+        except FileNotFoundError:
+            return None
+
+    def _exists(self, key: str) -> bool:
+        return self._get_path(key).exists() or (self._segments is not None and self._segments.has(key))
+
+    def _read_many_bytes(self, keys: List[str]) -> dict[str, bytes]:
+        """Contents of the keys that exist; packed days are read one segment at a time."""
+        results = {}
+        missing = []
+        for key in keys:
+            try:
+                with open(self._get_path(key), "rb") as f:
+                    results[key] = f.read()
+            except FileNotFoundError:
+                missing.append(key)
+        if self._segments is not None and missing:
+            results.update(self._segments.read_many(missing))
+        return results
+
+    def _write_many_bytes(self, items: dict[str, bytes]) -> None:
+        for key, raw in items.items():
+            self._write_bytes(key, raw)
+
+    @property
+    def wal(self) -> WriteAheadLog:
+        """Write-ahead log for append_json(), created (and replayed) on first use."""
+        if self._wal is None:
+            with _instances_lock:
+                if self._wal is None:
+                    self._wal = WriteAheadLog(self.data_dir, self._read_bytes, self._compacted)
+        return self._wal
+
+    @property
+    def write_behind(self) -> WriteBehind:
+        """Queue for write_json(defer=True), created on first use."""
+        if self._write_behind is None:
+            with _instances_lock:
+                if self._write_behind is None:
+                    self._write_behind = WriteBehind(self._flushed)
+        return self._write_behind
+
+    def _flushed(self, items: dict[str, bytes]) -> None:
+        """Write documents parked by write_json(defer=True)."""
+        started = time.perf_counter() if self._observers else 0.0
+        self._write_many_bytes(items)
+        if self._observers:
+            keys = list(items)
+            self._notify("write", f"{keys[0]} (+{len(keys) - 1})", sum(map(len, items.values())), started)
+
+    def track_changes(self, collection: str, key: str) -> None:
+        """
+        Journal item-level changes to a JSON list of dicts with ids, for sync().
+
+        Only write_json(), write_many() and delete() are journaled, so a
+        tracked key must not be written with append_json().
+        """
+        if self._journal is None:
+            with _instances_lock:
+                if self._journal is None:
+                    self._journal = ChangeJournal(self)
+        self._journal.track(collection, key)
+
+    def index_items(self, key: str) -> None:
+        """
+        Store a JSON list of dicts with ids one item per line, for find_item() lookups (see storage.lazy).
+
+        The file is still a JSON list, so every other read is unaffected.
+        """
+        self._line_indexes.setdefault(key, None)
+
+    def _serialize(self, key: str, data: dict | list) -> tuple[bytes, Optional[dict[str, int]]]:
+        """The document's bytes, and its items' fingerprints for the change journal when in line layout."""
+        if key in self._line_indexes and isinstance(data, list):
+            raw, index = LineIndex.dumps(data)
+            self._line_indexes[key] = index
+            return raw, index.fingerprints
+        return json.dumps(data, indent=2).encode(), None
+
+    def sync(self, since: int) -> dict:
+        """Documents of tracked collections changed after sequence `since` (see storage.journal)."""
+        if self._journal is None:
+            return {"seq": 0, "full_resync": True, "changes": {}}
+        return self._journal.sync(since)
+
+    def _tracked(self, keys) -> list:
+        journal = self._journal
+        if journal is None:
+            return []
+        return [key for key in keys if key in journal.collections]
+
+    def _compacted(self, key: str, raw: bytes) -> None:
+        """Write a file folded from the write-ahead log."""
+        started = time.perf_counter() if self._observers else 0.0
+        self._write_bytes(key, raw)
+        if self._observers:
+            self._notify("write", key, len(raw), started)
+
+    # ---- public API ----
+
+    def read_json(self, key: str) -> Optional[dict | list]:
+        """Read a JSON file, including deferred writes and records still pending in the write-ahead log."""
+        started = time.perf_counter() if self._observers else 0.0
+        deps = recording.get()
+        if deps is not None:
+            deps.read(self, [key])
+        raw, data = self._read_merged(key)
+        generation = pinned.get().get(self._generations)
+        if generation is not None:
+            raw, data = self._as_of(key, generation, raw, data)
+        if self._observers:
+            self._notify("read", key, len(raw) if raw else 0, started)
+        return data
+
+    def _read_merged(self, key: str, raw: Optional[bytes] = None) -> tuple[Optional[bytes], Optional[dict | list]]:
+        write_behind = self._write_behind
+        if write_behind is not None:
+            parked = write_behind.get(key)
+            if parked is not None:
+                return parked, json.loads(parked)
+        wal = self._wal
+        if wal is not None and wal.has(key):
+            with wal.lock:
+                raw = self._read_bytes(key)
+                return raw, wal.merge(key, json.loads(raw) if raw is not None else None)
+        if raw is None:
+            raw = self._read_bytes(key)
+        return raw, json.loads(raw) if raw is not None else None
+
+    def _current_bytes(self, key: str) -> Optional[bytes]:
+        """The document as read_json() sees it now, serialized; parsed only to merge pending log records."""
+        write_behind = self._write_behind
+        if write_behind is not None:
+            parked = write_behind.get(key)
+            if parked is not None:
+                return parked
+        wal = self._wal
+        if wal is not None and wal.has(key):
+            with wal.lock:
+                raw = self._read_bytes(key)
+                data = wal.merge(key, json.loads(raw) if raw is not None else None)
+            return json.dumps(data, indent=2).encode() if data is not None else None
+        return self._read_bytes(key)
+
+    def _as_of(self, key: str, generation: int, raw: Optional[bytes], data):
+        """Swap a document just read for its content at a pinned generation, if it has changed since."""
+        changed, old = self._generations.content_at(key, generation)
+        if not changed:
+            return raw, data
+        return old, json.loads(old) if old is not None else None
+
+    def read_bytes(self, key: str) -> Optional[bytes]:
+        """
+        A JSON document as stored, without parsing it: the bytes read_json() would decode.
+
+        For endpoints that return a document unchanged. Only a document with
+        records pending in the write-ahead log is parsed, to merge them in.
+        """
+        started = time.perf_counter() if self._observers else 0.0
+        deps = recording.get()
+        if deps is not None:
+            deps.read(self, [key])
+        raw = self._current_bytes(key)
+        generation = pinned.get().get(self._generations)
+        if generation is not None:
+            changed, old = self._generations.content_at(key, generation)
+            if changed:
+                raw = old
+        if self._observers:
+            self._notify("read", key, len(raw) if raw else 0, started)
+        return raw
+
+    def iter_items(self, key: str) -> Iterator:
+        """
+        The items of a JSON list document, parsed one at a time as they are consumed.
+
+        The bytes are read up front, as read_bytes() does. Only the items taken
+        are parsed, so a scan that stops early skips the rest of the document.
+        """
+        raw = self.read_bytes(key)
+        return iter_array(raw) if raw is not None else iter(())
+
+    def find_item(self, key: str, item_id: str) -> Optional[dict]:
+        """
+        The dict item with this "id" in a JSON list document, or None.
+
+        In a collection registered with index_items(), reads and parses just
+        that item's line. Otherwise, or while the key has a deferred write,
+        pending log records or a pinned snapshot, parses items only up to the match.
+        """
+        if key in self._line_indexes and pinned.get().get(self._generations) is None \
+                and not any(queue is not None and queue.has(key) for queue in (self._wal, self._write_behind)):
+            started = time.perf_counter() if self._observers else 0.0
+            deps = recording.get()
+            if deps is not None:
+                deps.read(self, [key])
+            found = self._find_indexed(key, str(item_id))
+            if found is not None:
+                item, nbytes = found
+                if self._observers:
+                    self._notify("read", key, nbytes, started)
+                return item
+        return next((item for item in self.iter_items(key)
+                     if isinstance(item, dict) and item.get("id") == item_id), None)
+
+    def _find_indexed(self, key: str, item_id: str) -> Optional[tuple[Optional[dict], int]]:
+        """(item or None, bytes read) using the line index, or None when the key's file cannot be indexed."""
+        f = self._open_file(key)
+        if f is None:
+            return None
+        with f:
+            stat = os.fstat(f.fileno())
+            # Every write renames a new file into place, so the inode changes too
+            signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+            index = self._line_indexes.get(key)
+            nbytes = 0
+            if index is None or index.signature != signature:
+                # Checked against the open file, which a write replaces rather than changes
+                raw = f.read()
+                nbytes = len(raw)
+                if index is not None and index.signature is None and index.source == raw:
+                    index.source = None
+                else:
+                    index = LineIndex.scan(raw) or LineIndex(None)
+                index.signature = signature
+                self._line_indexes[key] = index
+                if index.spans is None:
+                    item = next((item for item in iter_array(raw)
+                                 if isinstance(item, dict) and item.get("id") == item_id), None)
+                    return item, nbytes
+            elif index.spans is None:
+                # Known not to be in line layout: find_item() scans it lazily
+                return None
+            span = index.spans.get(item_id)
+            if span is None:
+                return None, nbytes
+            f.seek(span[0])
+            line = f.read(span[1])
+            return json.loads(line), nbytes + len(line)
+
+    def read_many(self, keys: List[str]) -> List[Optional[dict | list]]:
+        """
+        Read several JSON files, in the order given (None for missing keys).
+
+        Packed days are read with one open per segment rather than one
+        per day, and SQLite reads them in one query, so pass a month or a
+        range of day keys at a time.
+        """
+        started = time.perf_counter() if self._observers else 0.0
+        deps = recording.get()
+        if deps is not None:
+            deps.read(self, keys)
+        found = self._read_many_bytes(keys)
+        generation = pinned.get().get(self._generations)
+        results, nbytes = [], 0
+        for key in keys:
+            raw, data = self._read_merged(key, found.get(key))
+            if generation is not None:
+                raw, data = self._as_of(key, generation, raw, data)
+            nbytes += len(raw) if raw else 0
+            results.append(data)
+        if self._observers:
+            self._notify("read", f"{keys[0]} (+{len(keys) - 1})" if keys else "", nbytes, started)
+        return results
+
+    def write_json(self, key: str, data: dict | list, defer: bool = False) -> None:
+        """
+        Write a JSON file. Replaces any records pending for it in the write-ahead log.
+
+        Args:
+            key: Key to write
+            data: Document to store
+            defer: Queue the write for up to GB_WRITE_BEHIND_WINDOW seconds, so a
+                burst of writes to the same key becomes one (see storage.writebehind).
+                Reads see the new content immediately.
+        """
+        started = time.perf_counter() if self._observers else 0.0
+        raw, fingerprints = self._serialize(key, data)
+        wal = self._wal
+        with self._generations.writing([key]):
+            # Diffed and journaled under the write lock, against the version the last writer left
+            diff = self._journal.diff(key, data, fingerprints) if self._tracked([key]) else None
+            if defer and WRITE_BEHIND_WINDOW > 0 and not (wal is not None and wal.has(key)):
+                self.write_behind.put(key, raw)
+            else:
+                write_behind = self._write_behind
+                if write_behind is not None and write_behind.has(key):
+                    with write_behind.lock:
+                        write_behind.drop(key)
+                        self._write_now(key, raw)
+                else:
+                    self._write_now(key, raw)
+            if diff is not None:
+                self._journal.record(diff)
+        if self._change_listeners:
+            self._changed([key])
+        if self._observers:
+            self._notify("write", key, len(raw), started)
+
+    def _write_now(self, key: str, raw: bytes) -> None:
+        wal = self._wal
+        if wal is not None and wal.has(key):
+            with wal.lock:
+                self._write_bytes(key, raw)
+                wal.clear(key)
+        else:
+            self._write_bytes(key, raw)
+
+    def write_many(self, items: dict[str, dict | list]) -> None:
+        """Write several JSON files; a single transaction on backends that have them."""
+        started = time.perf_counter() if self._observers else 0.0
+        serialized = {key: self._serialize(key, data) for key, data in items.items()}
+        raws = {key: raw for key, (raw, _) in serialized.items()}
+        write_behind = self._write_behind
+        with self._generations.writing(raws):
+            diffs = [self._journal.diff(key, items[key], serialized[key][1]) for key in self._tracked(items)]
+            if write_behind is not None and any(write_behind.has(key) for key in raws):
+                with write_behind.lock:
+                    for key in raws:
+                        write_behind.drop(key)
+                    self._write_many_now(raws)
+            else:
+                self._write_many_now(raws)
+            for diff in diffs:
+                self._journal.record(diff)
+        if self._change_listeners and raws:
+            self._changed(list(raws))
+        if self._observers and raws:
+            keys = list(raws)
+            self._notify("write", f"{keys[0]} (+{len(keys) - 1})", sum(map(len, raws.values())), started)
+
+    def _write_many_now(self, raws: dict[str, bytes]) -> None:
+        wal = self._wal
+        if wal is not None and any(wal.has(key) for key in raws):
+            with wal.lock:
+                self._write_many_bytes(raws)
+                for key in raws:
+                    wal.clear(key)
+        else:
+            self._write_many_bytes(raws)
+
+    def append_json(
+        self,
+        key: str,
+        record,
+        field: Optional[str] = None,
+        default: Optional[dict] = None,
+        updates: Optional[dict] = None,
+    ) -> None:
+        """
+        Append a record to the list stored at key, without rewriting the file.
+
+        The record goes to the write-ahead log in a single write() and is
+        folded into the file in the background; reads see it immediately.
+
+        Args:
+            key: Key holding a JSON list, or a dict when `field` is given
+            record: The record to append
+            field: Append to this list field of a dict instead of to a list
+            default: Content to start from when key does not exist yet
+                (default: an empty list)
+            updates: Fields to set on the dict alongside the append,
+                e.g. {"updated_at": ...}
+        """
+        started = time.perf_counter() if self._observers else 0.0
+        write_behind = self._write_behind
+        with self._generations.writing([key]):
+            if write_behind is not None and write_behind.has(key):
+                # The log appends to the file, so a deferred write must land first
+                write_behind.flush([key])
+            nbytes = self.wal.append(key, record, field, default, updates)
+        if self._change_listeners:
+            self._changed([key])
+        if self._observers:
+            self._notify("write", key, nbytes, started)
+
+    def pack(self, collection: str, period: str = "month", before: Optional[str] = None) -> dict:
+        """
+        Pack the closed months (or years) of a collection's day files into segments.
+
+        Args:
+            collection: Folder of YYYY-MM-DD.json files, e.g. "transactions"
+            period: "month" or "year"
+            before: First period to leave unpacked, "YYYY-MM" or "YYYY"
+                (default: the current one)
+        """
+        if self._segments is None:
+            with _instances_lock:
+                if self._segments is None:
+                    self._segments = SegmentStore(self.data_dir)
+        return self._segments.pack(self, collection, period, before)
+
+    def start_packer(self, collections: List[str]) -> None:
+        """Pack closed periods of these collections in the background when GB_PACK_SEGMENTS is set."""
+        start_packer(self, collections)
+
+    def flush(self) -> int:
+        """Write out deferred write_json() documents now. Returns the number written."""
+        return self._write_behind.flush() if self._write_behind is not None else 0
+
+    def compact(self) -> int:
+        """Fold pending write-ahead log records into their files now. Returns the number folded."""
+        return self._wal.compact() if self._wal is not None else 0
+
+    def delete(self, key: str) -> bool:
+        """Delete a file, along with a deferred write or records pending for it in the write-ahead log."""
+        started = time.perf_counter() if self._observers else 0.0
+        write_behind = self._write_behind
+        with self._generations.writing([key]):
+            diff = self._journal.diff(key, None) if self._tracked([key]) else None
+            if write_behind is not None and write_behind.has(key):
+                with write_behind.lock:
+                    write_behind.drop(key)
+                    self._delete_now(key)
+                deleted = True
+            else:
+                deleted = self._delete_now(key)
+            if diff is not None:
+                self._journal.record(diff)
+        if self._change_listeners:
+            self._changed([key])
+        if self._observers:
+            self._notify("delete", key, 0, started)
+        return deleted
+
+    @contextmanager
+    def snapshot(self) -> Iterator[None]:
+        """
+        Make every read in the block see the data as it was on entry (see storage.generations).
+
+        Covers list_keys(), read_json(), read_bytes(), read_many(), exists()
+        and their async twins, including reads on the I/O threads. Writers
+        are not blocked. Nested snapshots keep the outer one's generation.
+        """
+        pins = pinned.get()
+        if self._generations in pins:
+            yield
+            return
+        generation = self._generations.pin()
+        token = pinned.set({**pins, self._generations: generation})
+        try:
+            yield
+        finally:
+            pinned.reset(token)
+            self._generations.unpin(generation)
+
+    @contextmanager
+    def atomic(self) -> Iterator[None]:
+        """
+        Commit the writes in the block as one generation, so a snapshot() sees all of them or none.
+
+        Other writers wait for the block to finish, so keep it to the writes themselves.
+        """
+        with self._generations.atomic():
+            yield
+
+    def _delete_now(self, key: str) -> bool:
+        wal = self._wal
+        if wal is not None and wal.has(key):
+            with wal.lock:
+                self._delete(key)
+                wal.clear(key)
+            return True
+        return self._delete(key)
+
+    def list_keys(self, prefix: str = "", suffix: str = ".json") -> List[str]:
+        """List all keys matching prefix and suffix."""
+        deps = recording.get()
+        if deps is not None:
+            deps.listed(self, prefix)
+        started = time.perf_counter() if self._observers else 0.0
+        keys = self._list_all_keys(prefix, suffix)
+        generation = pinned.get().get(self._generations)
+        if generation is not None:
+            keys = self._generations.keys_at(keys, prefix, suffix, generation)
+        if self._observers:
+            self._notify("list", prefix, 0, started)
+        return keys
+
+    def _list_all_keys(self, prefix: str, suffix: str) -> List[str]:
+        keys = self._list_keys(prefix, suffix)
+        # Keys whose first record is still in the log, or whose first write is deferred
+        for queue in (self._wal, self._write_behind):
+            if queue is not None:
+                pending = [k for k in queue.keys() if k.startswith(prefix) and k.endswith(suffix)]
+                if pending:
+                    keys = sorted(set(keys).union(pending))
+        return keys
+
+    def _list_keys(self, prefix: str, suffix: str) -> List[str]:
+        keys = self._list_files(prefix, suffix)
+        if self._segments is not None:
+            packed = self._segments.keys(prefix, suffix)
+            if packed:
+                keys = sorted(set(keys).union(packed))
+        return keys
+
+    def _list_files(self, prefix: str, suffix: str) -> List[str]:
+        self._ensure_dir(self.data_dir / "dummy")
+        results = []
+        search_dir = self.data_dir / prefix if prefix else self.data_dir
+
+        if not search_dir.exists():
+            return []
+
+        for path in search_dir.rglob(f"*{suffix}"):
+            # Convert to relative key
+            rel_path = path.relative_to(self.data_dir)
+            results.append(str(rel_path).replace("\\", "/"))
+
+        return sorted(results)
+
+    def signature(self, prefix: str, suffix: str = ".json") -> tuple:
+        """
+        A value that changes whenever a stored document under prefix changes, whichever process wrote it.
+
+        For caches of data derived from stored documents, to tell that another
+        process has written since they were filled. The prefix may also be a
+        single key. Only what has reached the data directory counts: this
+        process's records pending in the write-ahead log and its deferred
+        writes do not.
+        """
+        return self._signature(prefix, suffix)
+
+    def _signature(self, prefix: str, suffix: str) -> tuple:
+        # Every write renames a file into its folder, which updates the
+        # folder's mtime, so the folders alone show that something changed.
+        # File system clocks tick coarsely: a folder changed within the last
+        # MTIME_SLACK_NS may change again without a new mtime. For those,
+        # each file counts too (a write by rename gives it a new inode).
+        path = self.data_dir / prefix if prefix else self.data_dir
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            st = None
+        if st is not None and not S_ISDIR(st.st_mode):
+            # One document
+            return ((str(path), st.st_ino, st.st_size, st.st_mtime_ns),)
+        if st is None and prefix:
+            # A key not written yet, or part of a file name ("transactions/2025-01"): its folder
+            path = self.data_dir / prefix[:prefix.rfind("/") + 1]
+        entries = []
+        folders = [str(path)]
+        collection = prefix.split("/")[0]
+        if collection and self._segments is not None:
+            folders.append(str(self.data_dir / SEGMENTS_DIR / collection))
+        recent = time.time_ns() - MTIME_SLACK_NS
+        while folders:
+            folder = folders.pop()
+            try:
+                st = os.stat(folder)
+            except FileNotFoundError:
+                continue
+            entries.append((folder, st.st_ino, st.st_mtime_ns))
+            known = self._folders.get(folder)
+            if known is not None and known[0] == (st.st_ino, st.st_mtime_ns) and st.st_mtime_ns < recent:
+                folders += known[1]
+                continue
+            subfolders = []
+            try:
+                with os.scandir(folder) as scan:
+                    for entry in scan:
+                        if entry.is_dir():
+                            subfolders.append(entry.path)
+                        elif st.st_mtime_ns >= recent and entry.name.endswith((suffix, SEGMENT_SUFFIX)):
+                            try:
+                                file_st = entry.stat()
+                            except FileNotFoundError:
+                                continue
+                            entries.append((entry.path, file_st.st_ino, file_st.st_size, file_st.st_mtime_ns))
+            except FileNotFoundError:
+                continue
+            self._folders[folder] = ((st.st_ino, st.st_mtime_ns), subfolders)
+            folders += subfolders
+        return tuple(sorted(entries))
+
+    # ---- async API ----
+    # Each call runs the sync method on the storage I/O threads. The caller's
+    # context goes along, so observers still see which request did the work.
+
+    async def _run(self, fn, *args):
+        global _io_executor
+        if _io_executor is None:
+            with _instances_lock:
+                if _io_executor is None:
+                    _io_executor = ThreadPoolExecutor(IO_THREADS, thread_name_prefix="gb-storage-io")
+        call = functools.partial(contextvars.copy_context().run, fn, *args)
+        return await asyncio.get_running_loop().run_in_executor(_io_executor, call)
+
+    async def aread_json(self, key: str) -> Optional[dict | list]:
+        """Async read_json()."""
+        return await self._run(self.read_json, key)
+
+    async def aread_bytes(self, key: str) -> Optional[bytes]:
+        """Async read_bytes()."""
+        return await self._run(self.read_bytes, key)
+
+    async def awrite_json(self, key: str, data: dict | list, defer: bool = False) -> None:
+        """Async write_json()."""
+        await self._run(self.write_json, key, data, defer)
+
+    async def alist_keys(self, prefix: str = "", suffix: str = ".json") -> List[str]:
+        """Async list_keys()."""
+        return await self._run(self.list_keys, prefix, suffix)
+
+    async def aread_many(self, keys: List[str]) -> List[Optional[dict | list]]:
+        """Async read_many(), split into up to READ_FANOUT contiguous chunks read in parallel."""
+        if len(keys) <= 1 or READ_FANOUT <= 1:
+            return await self._run(self.read_many, keys)
+        size = -(-len(keys) // READ_FANOUT)
+        chunks = await asyncio.gather(*(self._run(self.read_many, keys[i:i + size])
+                                        for i in range(0, len(keys), size)))
+        return [data for chunk in chunks for data in chunk]
+
+    def exists(self, key: str) -> bool:
+        """Check if a key exists."""
+        deps = recording.get()
+        if deps is not None:
+            deps.read(self, [key])
+        found = any(queue is not None and queue.has(key) for queue in (self._wal, self._write_behind))
+        found = found or self._exists(key)
+        generation = pinned.get().get(self._generations)
+        if generation is not None:
+            changed, old = self._generations.content_at(key, generation)
+            if changed:
+                return old is not None
+        return found
+
+
+# One Storage per data directory, shared by everything in the process
+# (e.g. all six apps when they run together under the gateway), keyed by
+# (app name, resolved data directory, backend)
+_instances: dict[tuple[str, str, str], Storage] = {}
+_instances_lock = threading.Lock()
+
+
+def _data_dir(app_name: str, base_path: str = None) -> Path:
+    if base_path:
+        return Path(base_path)
+    # Default: relative to the backend directory
+    return Path(__file__).parent.parent.parent.parent / f"gb-{app_name}" / "data"
+
+
+def _backend(name: str) -> type[Storage]:
+    if name == "file":
+        return Storage
+    if name == "sqlite":
+        from .sqlite import SQLiteStorage
+        return SQLiteStorage
+    raise ValueError(f"Unknown storage backend '{name}' (expected 'file' or 'sqlite')")
+
+
+def get_storage(app_name: str, base_path: str = None, backend: str = None) -> Storage:
+    """
+    Get storage for an app, reusing an existing instance for the same directory.
+
+    Args:
+        app_name: Name of the app
+        base_path: Data directory
+        backend: "file" (default) or "sqlite"; GB_STORAGE_BACKEND sets the default
+    """
+    backend = backend or STORAGE_BACKEND
+    storage_class = _backend(backend)
+    # Only construct a Storage for a new directory: construction replays
+    # write-ahead logs, which must happen once per process
+    cache_key = (app_name, str(_data_dir(app_name, base_path).resolve()), backend)
+    with _instances_lock:
+        storage = _instances.get(cache_key)
+        if storage is None:
+            storage = _instances[cache_key] = storage_class(app_name, base_path)
+        return storage
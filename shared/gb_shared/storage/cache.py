@@ -0,0 +1,347 @@
+"""
+Memoized results of derived computations, invalidated by the storage keys they read.
+
+    @cached("guitar.stats")
+    def get_stats() -> dict: ...
+
+While a cached function runs, every key it reads through its Storage
+(read_json, read_bytes, read_many, exists, or their async twins) is
+recorded. So is every prefix it lists. The result is stored with those
+dependencies. Writes notify
+the cache: write_json, write_many, append_json and delete. A write to a key
+drops exactly the entries that read that key, or listed a prefix of it.
+A new day file therefore also invalidates whatever listed its folder.
+
+Writes by other processes (the gateway, a second worker, a maintenance
+script) never reach those listeners. So each dependency is also stamped with
+Storage.signature() before it is first read, and a hit whose stamps no
+longer match is dropped and recomputed. A key under a prefix the computation
+already listed is covered by the prefix's stamp.
+
+Misses are single-flight: a call that finds the same call already running
+waits for it and shares its result (or its exception) instead of running
+the same scan again. A write that lands while a computation is still
+running, on a key it already read, stops that result from being stored and
+makes later calls start a fresh run rather than join it. When cached functions
+call each other, the outer one inherits the inner one's dependencies,
+including on a hit.
+
+Entries are bounded per function (LRU) and keyed by the call's arguments,
+which must be hashable. Results are shared between callers and must not be
+mutated. Lookups are counted with instrumentation.record_cache, which also
+keeps a per-cache hit-ratio gauge when GB_METRICS is on.
+
+GB_RESULT_CACHE=0 turns caching off, single-flight included: cached() then
+returns the function as is.
+"""
+
+import asyncio
+import functools
+import inspect
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextvars import ContextVar
+from typing import Callable, Iterable, Optional
+
+try:
+    from gb_shared.instrumentation import record_cache
+except ImportError:
+    # Storage used without the instrumentation package
+    record_cache = None
+
+ENABLED = os.environ.get("GB_RESULT_CACHE", "1").lower() not in ("0", "false", "no")
+
+# Every ResultCache made by cached(), for clear_all()
+_caches: "weakref.WeakSet[ResultCache]" = weakref.WeakSet()
+
+
+class Dependencies:
+    """Keys read and prefixes listed by one computation, with their signatures when first read."""
+
+    __slots__ = ("keys", "prefixes", "stamps", "stale")
+
+    def __init__(self):
+        self.keys: set[str] = set()
+        self.prefixes: set[str] = set()
+        # (Storage, key or prefix) -> its signature() before the first read
+        self.stamps: dict[tuple, tuple] = {}
+        self.stale = False
+
+    def read(self, storage, keys: Iterable[str]) -> None:
+        """Record keys about to be read (called by Storage)."""
+        for key in keys:
+            if key not in self.keys:
+                self.keys.add(key)
+                if not any(key.startswith(prefix) for prefix in self.prefixes):
+                    self.stamps.setdefault((storage, key), storage.signature(key))
+
+    def listed(self, storage, prefix: str) -> None:
+        """Record a prefix about to be listed (called by Storage)."""
+        if prefix not in self.prefixes:
+            self.prefixes.add(prefix)
+            self.stamps.setdefault((storage, prefix), storage.signature(prefix))
+
+    def current(self) -> bool:
+        """Whether nothing read has changed on disk since, whichever process wrote it."""
+        return all(storage.signature(name) == stamp for (storage, name), stamp in self.stamps.items())
+
+    def touches(self, key: str) -> bool:
+        return key in self.keys or any(key.startswith(prefix) for prefix in self.prefixes)
+
+    def merge(self, other: "Dependencies") -> None:
+        self.keys |= other.keys
+        self.prefixes |= other.prefixes
+        for name, stamp in other.stamps.items():
+            self.stamps.setdefault(name, stamp)
+
+
+# The Dependencies of the computation running in this context, filled in by Storage reads
+recording: ContextVar[Optional[Dependencies]] = ContextVar("gb_storage_reads", default=None)
+
+
+class Flight:
+    """One running computation, which concurrent identical calls wait on."""
+
+    __slots__ = ("future", "deps")
+
+    def __init__(self):
+        self.future: Future = Future()
+        self.deps = Dependencies()
+
+
+class ResultCache:
+    """LRU results of one function, indexed by the keys and prefixes they depend on."""
+
+    def __init__(self, name: str, maxsize: int = 128):
+        self.name = name
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # Misses that waited on a computation already in flight
+        self.coalesced = 0
+        self._entries: OrderedDict[tuple, tuple[object, Dependencies]] = OrderedDict()
+        self._by_key: dict[str, set[tuple]] = {}
+        self._by_prefix: dict[str, set[tuple]] = {}
+        self._flights: dict[tuple, Flight] = {}
+        self._lock = threading.Lock()
+        self._storage = None
+        _caches.add(self)
+
+    def bind(self, storage) -> None:
+        """Follow writes to `storage`; switching to another Storage empties the cache."""
+        if storage is self._storage:
+            return
+        with self._lock:
+            if storage is self._storage:
+                return
+            if self._storage is not None:
+                self._storage.remove_change_listener(self.invalidate)
+            storage.add_change_listener(self.invalidate)
+            self._storage = storage
+            self._entries.clear()
+            self._by_key.clear()
+            self._by_prefix.clear()
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def lookup(self, call_key: tuple) -> tuple[Optional[tuple[object, Dependencies]], Optional[Flight], bool]:
+        """
+        Returns (entry, None, False) on a hit. On a miss, returns (None, flight,
+        leader): leader is True when the caller must run the computation and
+        then call store() or fail(), False when it should wait on the flight.
+        """
+        with self._lock:
+            entry = self._entries.get(call_key)
+        # Checked outside the lock: signatures touch the disk
+        if entry is not None and not entry[1].current():
+            with self._lock:
+                if self._entries.get(call_key) is entry:
+                    self._remove(call_key)
+                    self.invalidations += 1
+            entry = None
+        with self._lock:
+            flight, leader = None, False
+            if entry is not None:
+                if call_key in self._entries:
+                    self._entries.move_to_end(call_key)
+                self.hits += 1
+            else:
+                self.misses += 1
+                flight = self._flights.get(call_key)
+                if flight is None:
+                    flight = self._flights[call_key] = Flight()
+                    leader = True
+                else:
+                    self.coalesced += 1
+        if record_cache is not None:
+            record_cache(self.name, entry is not None, self.hit_ratio)
+        return entry, flight, leader
+
+    def store(self, call_key: tuple, flight: Flight, value) -> None:
+        deps = flight.deps
+        with self._lock:
+            if self._flights.get(call_key) is flight:
+                del self._flights[call_key]
+            if not deps.stale:
+                self._remove(call_key)
+                self._entries[call_key] = (value, deps)
+                for key in deps.keys:
+                    self._by_key.setdefault(key, set()).add(call_key)
+                for prefix in deps.prefixes:
+                    self._by_prefix.setdefault(prefix, set()).add(call_key)
+                while len(self._entries) > self.maxsize:
+                    self._remove(next(iter(self._entries)))
+        flight.future.set_result(value)
+
+    def fail(self, call_key: tuple, flight: Flight, exc: BaseException) -> None:
+        with self._lock:
+            if self._flights.get(call_key) is flight:
+                del self._flights[call_key]
+        flight.future.set_exception(exc)
+
+    def _remove(self, call_key: tuple) -> None:
+        entry = self._entries.pop(call_key, None)
+        if entry is None:
+            return
+        deps = entry[1]
+        for key in deps.keys:
+            self._discard(self._by_key, key, call_key)
+        for prefix in deps.prefixes:
+            self._discard(self._by_prefix, prefix, call_key)
+
+    @staticmethod
+    def _discard(index: dict[str, set[tuple]], name: str, call_key: tuple) -> None:
+        entries = index.get(name)
+        if entries is not None:
+            entries.discard(call_key)
+            if not entries:
+                del index[name]
+
+    def invalidate(self, keys: list[str]) -> None:
+        """Drop the entries that depend on any of these keys (called by Storage after writes)."""
+        with self._lock:
+            doomed: set[tuple] = set()
+            for key in keys:
+                doomed |= self._by_key.get(key, set())
+                for prefix, entries in self._by_prefix.items():
+                    if key.startswith(prefix):
+                        doomed |= entries
+                for call_key, flight in list(self._flights.items()):
+                    if flight.deps.touches(key):
+                        # Callers that arrive after this write must not get its result
+                        flight.deps.stale = True
+                        del self._flights[call_key]
+            for call_key in doomed:
+                self._remove(call_key)
+            self.invalidations += len(doomed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_key.clear()
+            self._by_prefix.clear()
+
+
+def clear_all() -> None:
+    """Empty every result cache, e.g. so a benchmark times the computation rather than a hit."""
+    for cache in list(_caches):
+        cache.clear()
+
+
+def _call_key(args: tuple, kwargs: dict) -> tuple:
+    return args + tuple(sorted(kwargs.items())) if kwargs else args
+
+
+def _inherit(deps: Dependencies) -> None:
+    outer = recording.get()
+    if outer is not None:
+        outer.merge(deps)
+
+
+def cached(name: str, maxsize: int = 128, storage: str = "_storage") -> Callable:
+    """
+    Decorate a function (sync or async) whose result depends only on its arguments and its Storage.
+
+    `storage` is where the function's module keeps that Storage, as an
+    attribute path from the module's globals ("_storage", or "storage._storage"
+    from a module that imports its app's storage module). It is looked up on
+    every call, so repointing the module at another Storage, as the benchmarks
+    do, starts over with an empty cache.
+
+    The wrapper's `cache` attribute is its ResultCache (hits, misses,
+    coalesced, hit_ratio, clear()).
+    """
+    head, *path = storage.split(".")
+
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+        cache = ResultCache(name, maxsize)
+
+        def bind():
+            target = fn.__globals__[head]
+            for attr in path:
+                target = getattr(target, attr)
+            cache.bind(target)
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                bind()
+                call_key = _call_key(args, kwargs)
+                entry, flight, leader = cache.lookup(call_key)
+                if entry is not None:
+                    _inherit(entry[1])
+                    return entry[0]
+                if not leader:
+                    # Shielded: a waiter being cancelled must not cancel the shared run
+                    value = await asyncio.shield(asyncio.wrap_future(flight.future))
+                    _inherit(flight.deps)
+                    return value
+                token = recording.set(flight.deps)
+                try:
+                    value = await fn(*args, **kwargs)
+                except BaseException as exc:
+                    cache.fail(call_key, flight, exc)
+                    raise
+                finally:
+                    recording.reset(token)
+                cache.store(call_key, flight, value)
+                _inherit(flight.deps)
+                return value
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                bind()
+                call_key = _call_key(args, kwargs)
+                entry, flight, leader = cache.lookup(call_key)
+                if entry is not None:
+                    _inherit(entry[1])
+                    return entry[0]
+                if not leader:
+                    value = flight.future.result()
+                    _inherit(flight.deps)
+                    return value
+                token = recording.set(flight.deps)
+                try:
+                    value = fn(*args, **kwargs)
+                except BaseException as exc:
+                    cache.fail(call_key, flight, exc)
+                    raise
+                finally:
+                    recording.reset(token)
+                cache.store(call_key, flight, value)
+                _inherit(flight.deps)
+                return value
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorate
@@ -0,0 +1,129 @@
+"""
+Generation-pinned read snapshots, so multi-file reads see one consistent state.
+
+    with storage.snapshot():
+        keys = storage.list_keys("transactions/")
+        days = storage.read_many(keys)
+        budget = storage.read_json("budgets/2025-12.json")
+
+Every write_json(), write_many(), append_json() or delete() commits a new
+generation of the Storage. storage.atomic() groups several writes into one
+generation. update_transaction() uses it to move a record from one day file
+to another.
+
+snapshot() pins the current generation for the code it wraps. That includes
+async reads, because they carry the caller's context to the I/O threads.
+While any reader is pinned, a writer saves the logical content of each key
+it is about to touch (None if the key does not exist yet), tagged with the
+generation it is about to commit. Files are still replaced by rename, so a
+reader never sees a half-written file. A pinned read takes the file as it is
+now, then checks for saved content from a generation after its pin, and
+prefers that. The content is saved before the file changes, so the check
+after the read cannot miss a write that the read saw. Listings are corrected
+the same way: keys created after the pin are dropped, deleted ones restored.
+
+Readers never block writers. Writers pay for one extra read per key, and
+only while a snapshot is open. Saved content is dropped once no pinned
+reader can still ask for it. A snapshot covers its own Storage only.
+Writes made inside a snapshot are not visible to it.
+"""
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterable, Iterator, List, Optional
+
+# Generations -> generation pinned by the snapshot open in this context
+pinned: ContextVar[dict] = ContextVar("gb_storage_snapshot", default={})
+
+
+class Generations:
+    """Generation counter and the pre-write content kept for pinned readers of one Storage."""
+
+    def __init__(self, read_current: Callable[[str], Optional[bytes]]):
+        self._read_current = read_current
+        # Held by each write and atomic() block, and while pinning
+        self.lock = threading.RLock()
+        self.generation = 0
+        self._depth = 0
+        # Pinned generation -> number of readers pinned there
+        self._pins: dict[int, int] = {}
+        # key -> [(generation that replaced it, content before that write)], oldest first
+        self._history: dict[str, list[tuple[int, Optional[bytes]]]] = {}
+
+    @contextmanager
+    def atomic(self) -> Iterator[None]:
+        with self.lock:
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if not self._depth:
+                    self.generation += 1
+
+    @contextmanager
+    def writing(self, keys: Iterable[str]) -> Iterator[None]:
+        """Wrap one write of these keys; saves their content first if anyone is pinned."""
+        with self.atomic():
+            if self._pins:
+                self._save(keys)
+            yield
+
+    def _save(self, keys: Iterable[str]) -> None:
+        upcoming = self.generation + 1
+        for key in keys:
+            versions = self._history.get(key)
+            if versions and versions[-1][0] == upcoming:
+                # Already saved earlier in this atomic() block
+                continue
+            entry = (upcoming, self._read_current(key))
+            self._history[key] = (versions or []) + [entry]
+
+    def pin(self) -> int:
+        with self.lock:
+            generation = self.generation
+            self._pins[generation] = self._pins.get(generation, 0) + 1
+            return generation
+
+    def unpin(self, generation: int) -> None:
+        with self.lock:
+            count = self._pins.pop(generation) - 1
+            if count:
+                self._pins[generation] = count
+            if not self._pins:
+                self._history = {}
+                return
+            # Content replaced at or before the oldest pin is no longer wanted
+            oldest = min(self._pins)
+            history = {}
+            for key, versions in self._history.items():
+                kept = [v for v in versions if v[0] > oldest]
+                if kept:
+                    history[key] = kept
+            self._history = history
+
+    def content_at(self, key: str, generation: int) -> tuple[bool, Optional[bytes]]:
+        """(True, content) if key changed after `generation`, with its content as of then; else (False, None)."""
+        for replaced_at, raw in self._history.get(key, ()):
+            if replaced_at > generation:
+                return True, raw
+        return False, None
+
+    def keys_at(self, keys: List[str], prefix: str, suffix: str, generation: int) -> List[str]:
+        """Correct a listing taken now to what it was at `generation`."""
+        changed = {}
+        for key in list(self._history):
+            if key.startswith(prefix) and key.endswith(suffix):
+                found, raw = self.content_at(key, generation)
+                if found:
+                    changed[key] = raw is not None
+        if not changed:
+            return keys
+        existed = set(keys)
+        for key, present in changed.items():
+            if present:
+                existed.add(key)
+            else:
+                existed.discard(key)
+        return sorted(existed)
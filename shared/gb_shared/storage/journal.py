@@ -0,0 +1,149 @@
+"""
+Change journal for delta sync of whole-collection documents.
+
+Collections such as todos, songs or recipes are stored as one JSON list of
+dicts with an "id". Storage.track_changes(collection, key) registers such a
+key. From then on, every write_json(), write_many() or delete() of the key is
+diffed against the previous version, item by item. The ids that changed are
+appended to the journal under the next sequence number:
+
+    sync/journal.json  {"floor": 1, "entries": [{"seq": 2, "changes": [[collection, id, "upsert"|"delete"], ...]}]}
+
+The diff compares per-item fingerprints kept in memory. The stored document is
+read once, before the first tracked write, so no write pays for an extra read.
+A collection stored in line layout (see storage.lazy) is fingerprinted from
+the item lines the write serializes anyway, so only other collections pay
+for encoding every item again. The diff, the write and the journal entry
+happen under the Storage's write lock, so concurrent writers of a collection
+are each diffed against the version the other left. Entries are added with
+append_json(), at the cost of one log write each.
+
+sync(since) returns the current version of each document changed after
+`since`, plus the ids deleted after it. The journal keeps the last
+JOURNAL_SIZE entries (GB_SYNC_JOURNAL_SIZE). Dropping older entries raises
+the floor. A client whose `since` is below the floor, or not issued by this
+journal at all, is told to do a full resync instead.
+"""
+
+import json
+import os
+import threading
+from bisect import bisect_right
+from typing import Optional
+
+JOURNAL_KEY = "sync/journal.json"
+JOURNAL_SIZE = int(os.environ.get("GB_SYNC_JOURNAL_SIZE", "1000"))
+
+
+def _fingerprints(items) -> dict[str, int]:
+    # Hashes of the items' lines as LineIndex.dumps() writes them
+    return {
+        item["id"]: hash(json.dumps(item).encode())
+        for item in items or []
+        if isinstance(item, dict) and item.get("id")
+    }
+
+
+class ChangeJournal:
+    """Sequence-numbered changes to the tracked collections of one Storage."""
+
+    def __init__(self, storage, size: int = JOURNAL_SIZE):
+        self._storage = storage
+        self.size = size
+        # Tracked key -> collection name
+        self.collections: dict[str, str] = {}
+        self.lock = threading.RLock()
+        self._fingerprints: dict[str, dict[str, int]] = {}
+        self._floor: Optional[int] = None
+        self._entries: list[dict] = []
+
+    def track(self, collection: str, key: str) -> None:
+        self.collections[key] = collection
+
+    @property
+    def seq(self) -> int:
+        """The current sequence number: the version a client has after syncing now."""
+        with self.lock:
+            self._load()
+            return self._entries[-1]["seq"] if self._entries else self._floor
+
+    def _load(self) -> None:
+        if self._floor is None:
+            doc = self._storage.read_json(JOURNAL_KEY) or {"floor": 1, "entries": []}
+            self._entries = doc["entries"]
+            self._floor = doc["floor"]
+
+    # ---- recording ----
+
+    def diff(
+        self, key: str, data, fingerprints: Optional[dict[str, int]] = None
+    ) -> tuple[str, dict[str, int], list[list[str]]]:
+        """
+        Changes a write of `data` (None for a delete) makes to a tracked key; pass to record().
+
+        Call both while holding the Storage's write lock, with the write in
+        between. `fingerprints` are those of data's items, if already computed.
+        """
+        with self.lock:
+            old = self._fingerprints.get(key)
+            if old is None:
+                old = _fingerprints(self._storage.read_json(key))
+        new = fingerprints if fingerprints is not None else _fingerprints(data)
+        collection = self.collections[key]
+        changes = [[collection, item_id, "upsert"] for item_id, fp in new.items() if old.get(item_id) != fp]
+        changes += [[collection, item_id, "delete"] for item_id in old if item_id not in new]
+        return key, new, changes
+
+    def record(self, diff: tuple[str, dict[str, int], list[list[str]]]) -> None:
+        """Store the fingerprints of a completed write and journal its changes."""
+        key, fingerprints, changes = diff
+        with self.lock:
+            self._fingerprints[key] = fingerprints
+            if not changes:
+                return
+            self._load()
+            entry = {"seq": self.seq + 1, "changes": changes}
+            self._entries.append(entry)
+            if len(self._entries) > self.size:
+                dropped, self._entries = self._entries[:-(self.size // 2)], self._entries[-(self.size // 2):]
+                self._floor = dropped[-1]["seq"]
+                self._storage.write_json(JOURNAL_KEY, {"floor": self._floor, "entries": self._entries})
+            else:
+                self._storage.append_json(
+                    JOURNAL_KEY, entry, field="entries", default={"floor": self._floor, "entries": []}
+                )
+
+    # ---- reading ----
+
+    def sync(self, since: int) -> dict:
+        """
+        Everything that changed after sequence `since`.
+
+        Returns {"seq": current, "full_resync": False, "changes": {collection:
+        {"upserted": [documents], "deleted": [ids]}}}, or {"seq": current,
+        "full_resync": True, "changes": {}} when `since` is no longer covered.
+        """
+        with self.lock:
+            self._load()
+            seq = self.seq
+            if since < self._floor or since > seq:
+                return {"seq": seq, "full_resync": True, "changes": {}}
+            latest: dict[tuple[str, str], str] = {}
+            start = bisect_right(self._entries, since, key=lambda entry: entry["seq"])
+            for entry in self._entries[start:]:
+                for collection, item_id, op in entry["changes"]:
+                    latest[(collection, item_id)] = op
+
+        changes: dict[str, dict[str, list]] = {}
+        for key, collection in self.collections.items():
+            upserted = [item_id for (c, item_id), op in latest.items() if c == collection and op == "upsert"]
+            deleted = [item_id for (c, item_id), op in latest.items() if c == collection and op == "delete"]
+            if not upserted and not deleted:
+                continue
+            docs = {item.get("id"): item for item in self._storage.read_json(key) or []} if upserted else {}
+            changes[collection] = {
+                "upserted": [docs[item_id] for item_id in upserted if item_id in docs],
+                # Deleted again since the journal entry was read
+                "deleted": deleted + [item_id for item_id in upserted if item_id not in docs],
+            }
+        return {"seq": seq, "full_resync": False, "changes": changes}
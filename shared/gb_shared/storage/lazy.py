@@ -0,0 +1,127 @@
+"""
+Lazy parsing of list documents, and an offset index over one-item-per-line lists.
+
+Collections such as recipes.json or todos/todos.json are one JSON list.
+Storage.iter_items(key) yields the items of such a list one at a time, so a
+scan that stops early (the first N, or the item with some id) parses only
+the items up to that point. ijson is used when its C backend is installed
+(pip install gb-shared[stream]). Otherwise a pure-Python walker hands
+each item to json's own decoder.
+
+Storage.index_items(key) opts a collection into a line layout that is
+still a valid JSON list, with one item per line:
+
+    [
+    {"id": "01JF...", "name": "..."},
+    {"id": "01JG...", "name": "..."}
+    ]
+
+For such a file, a LineIndex maps each id to the byte span of its line.
+Storage.find_item(key, id) opens the file, checks the index against the
+open file's inode, size and mtime, seeks to the item's line and parses only that
+line. The index of a file this process wrote comes with the write. A file
+written elsewhere is indexed by one scan on its first lookup. A file that
+is not in line layout (written before index_items(), or by another writer)
+is not indexed; lookups scan it lazily instead, and its next write converts
+it to line layout.
+"""
+
+import json
+import re
+from typing import Iterator, Optional
+
+try:
+    import ijson
+    _ijson = ijson.get_backend("yajl2_c")
+except Exception:
+    # Not installed, or only its slow pure-Python backend is
+    _ijson = None
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def iter_array(raw: bytes) -> Iterator:
+    """Items of a JSON list document, parsed one at a time (nothing for any other document)."""
+    if _ijson is not None:
+        yield from _ijson.items(raw, "item", use_float=True)
+        return
+    text = raw.decode()
+    i = _WHITESPACE.match(text).end()
+    if not text.startswith("[", i):
+        return
+    i = _WHITESPACE.match(text, i + 1).end()
+    if text.startswith("]", i):
+        return
+    while True:
+        item, i = _decoder.raw_decode(text, i)
+        yield item
+        i = _WHITESPACE.match(text, i).end()
+        if text.startswith(",", i):
+            i = _WHITESPACE.match(text, i + 1).end()
+        elif text.startswith("]", i):
+            return
+        else:
+            raise ValueError(f"Expected ',' or ']' at character {i}")
+
+
+class LineIndex:
+    """Byte span of each item line of a line-layout list document, by the item's id."""
+
+    __slots__ = ("spans", "signature", "source", "fingerprints")
+
+    def __init__(self, spans: Optional[dict[str, tuple[int, int]]], signature: Optional[tuple] = None):
+        # None when the file is not in line layout
+        self.spans = spans
+        # (inode, size, mtime_ns) of the file indexed, once known
+        self.signature = signature
+        # The serialized document, kept from dumps() until a file with these bytes is found
+        self.source: Optional[bytes] = None
+        # Item id -> hash of its line, from dumps(); the change journal diffs with these
+        self.fingerprints: Optional[dict[str, int]] = None
+
+    @classmethod
+    def dumps(cls, items: list) -> tuple[bytes, "LineIndex"]:
+        """Serialize a list in line layout, with the index of the result."""
+        spans = {}
+        fingerprints = {}
+        parts = [b"[\n"] if items else [b"[]"]
+        offset = 2
+        for n, item in enumerate(items):
+            line = json.dumps(item).encode()
+            if isinstance(item, dict) and item.get("id") is not None:
+                spans.setdefault(str(item["id"]), (offset, len(line)))
+                if item["id"]:
+                    fingerprints[item["id"]] = hash(line)
+            parts.append(line)
+            parts.append(b",\n" if n < len(items) - 1 else b"\n]")
+            offset += len(line) + 2
+        raw = b"".join(parts)
+        index = cls(spans)
+        index.source = raw
+        index.fingerprints = fingerprints
+        return raw, index
+
+    @classmethod
+    def scan(cls, raw: bytes) -> Optional["LineIndex"]:
+        """Index a document written by dumps(), or None if it is in any other layout."""
+        if raw == b"[]":
+            return cls({})
+        if not (raw.startswith(b"[\n") and raw.endswith(b"\n]")):
+            return None
+        spans = {}
+        offset = 2
+        end = len(raw) - 2
+        while offset < end:
+            stop = raw.find(b"\n", offset)
+            length = stop - offset - (raw[stop - 1:stop] == b",")
+            try:
+                item = json.loads(raw[offset:offset + length])
+            except ValueError:
+                return None
+            if not isinstance(item, dict):
+                return None
+            if item.get("id") is not None:
+                spans.setdefault(str(item["id"]), (offset, length))
+            offset = stop + 1
+        return cls(spans)
@@ -0,0 +1,53 @@
+"""
+HTTP responses that send stored JSON documents exactly as stored.
+
+    @app.get("/budgets/{month}")
+    def get_budget(month: str, request: Request):
+        raw = storage.get_budget_raw(month)
+        if raw is None:
+            raise HTTPException(status_code=404, detail="Budget not found")
+        return stored_json(raw, request)
+
+Storage.read_bytes() returns the document's bytes, and they go out
+unchanged. There is no json.loads, no jsonable_encoder and no json.dumps.
+
+The ETag is a hash of those bytes, so it changes exactly when the document
+does. A request whose If-None-Match carries the ETag gets an empty 304.
+
+Documents are small, so they are sent from memory rather than with
+FileResponse. read_bytes() has already merged in deferred writes and
+pending log records, so the file alone would be stale. Also, on Windows a
+file held open for sending cannot be replaced by the next write.
+"""
+
+import hashlib
+from typing import Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+
+class StoredJSONResponse(Response):
+    """Serialized JSON sent as is."""
+    media_type = "application/json"
+
+
+def etag(raw: bytes) -> str:
+    """Strong ETag of a document's bytes."""
+    return f'"{hashlib.blake2b(raw, digest_size=16).hexdigest()}"'
+
+
+def _matches(if_none_match: Optional[str], tag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return tag in (t.strip().removeprefix("W/") for t in if_none_match.split(","))
+
+
+def stored_json(raw: bytes, request: Optional[Request] = None) -> Response:
+    """Response for a document read with Storage.read_bytes(): 200 with an ETag, or 304 if the client has it."""
+    headers = {"ETag": etag(raw)}
+    if request is not None and _matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return StoredJSONResponse(raw, headers=headers)
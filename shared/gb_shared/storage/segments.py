@@ -0,0 +1,238 @@
+"""
+Segment files: closed months (or years) of daily files packed into one file.
+
+Date-partitioned collections store one `<collection>/YYYY-MM-DD.json` per
+day. pack() merges the days of each closed period into
+`_segments/<collection>/<period>.segment`:
+
+    {"days": {"2024-01-01": [offset, length], ...}}\\n
+    <day file bytes><day file bytes>...
+
+The first line is an offset index into the body that follows, and the day
+files' bytes are copied unchanged. The index of every segment is loaded once,
+so reading a packed day is a seek into an already known file. read_many()
+reads all of a segment's days with one open.
+
+Loose day files always win over a segment. Storage writes go to loose
+files and drop the day from its segment, so packing never changes what a
+reader sees. A segment is replaced with os.replace() before the loose files
+it absorbed are deleted. A crash between the two steps only leaves both
+copies, and the next pack() merges them.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from datetime import date
+from pathlib import Path
+from typing import Iterable, Optional
+
+SEGMENTS_DIR = "_segments"
+SEGMENT_SUFFIX = ".segment"
+
+DATE_KEY = re.compile(r"^(?P<collection>[^/]+)/(?P<day>\d{4}-\d{2}-\d{2})\.json$")
+
+# Period length -> characters of the YYYY-MM-DD day that name it
+PERIODS = {"month": 7, "year": 4}
+
+# Background packing: "month", "year" or unset (off)
+PACK_PERIOD = os.environ.get("GB_PACK_SEGMENTS", "").lower()
+PACK_INTERVAL = float(os.environ.get("GB_PACK_INTERVAL", "86400"))
+
+logger = logging.getLogger("gb.storage")
+
+
+class Segment:
+    """One segment file and its offset index."""
+
+    def __init__(self, path: Path, collection: str, days: dict[str, list[int]], body_offset: int):
+        self.path = path
+        self.collection = collection
+        self.days = days
+        self.body_offset = body_offset
+
+    @classmethod
+    def load(cls, path: Path) -> "Segment":
+        with open(path, "rb") as f:
+            header = f.readline()
+        return cls(path, path.parent.name, json.loads(header)["days"], len(header))
+
+    def key(self, day: str) -> str:
+        return f"{self.collection}/{day}.json"
+
+    def read(self, f, day: str) -> bytes:
+        offset, length = self.days[day]
+        f.seek(self.body_offset + offset)
+        return f.read(length)
+
+    def read_all(self) -> dict[str, bytes]:
+        with open(self.path, "rb") as f:
+            return {day: self.read(f, day) for day in self.days}
+
+    @staticmethod
+    def write(path: Path, days: dict[str, bytes]) -> None:
+        """Write a segment atomically (or remove it when there are no days left)."""
+        if not days:
+            path.unlink(missing_ok=True)
+            return
+        index, offset = {}, 0
+        for day in sorted(days):
+            index[day] = [offset, len(days[day])]
+            offset += len(days[day])
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(json.dumps({"days": index}, separators=(",", ":")).encode() + b"\n")
+            for day in sorted(days):
+                f.write(days[day])
+        os.replace(tmp, path)
+
+
+class SegmentStore:
+    """All segments under a data directory, with a key -> segment map."""
+
+    def __init__(self, data_dir: Path):
+        self.dir = data_dir / SEGMENTS_DIR
+        # Held while a segment and the loose files next to it change together
+        self.lock = threading.RLock()
+        self._by_key: dict[str, Segment] = {}
+        for path in sorted(self.dir.glob(f"*/*{SEGMENT_SUFFIX}")):
+            self._add(Segment.load(path))
+
+    def _add(self, segment: Segment) -> None:
+        for day in segment.days:
+            self._by_key[segment.key(day)] = segment
+
+    def _remove(self, segment: Segment) -> None:
+        for day in segment.days:
+            if self._by_key.get(segment.key(day)) is segment:
+                del self._by_key[segment.key(day)]
+
+    def has(self, key: str) -> bool:
+        return key in self._by_key
+
+    def keys(self, prefix: str, suffix: str) -> list[str]:
+        return [k for k in self._by_key if k.startswith(prefix) and k.endswith(suffix)]
+
+    def read(self, key: str) -> Optional[bytes]:
+        segment = self._by_key.get(key)
+        if segment is None:
+            return None
+        with open(segment.path, "rb") as f:
+            return segment.read(f, DATE_KEY.match(key)["day"])
+
+    def read_many(self, keys: Iterable[str]) -> dict[str, bytes]:
+        """Read packed keys, opening each segment once."""
+        grouped: dict[Segment, list[str]] = {}
+        for key in keys:
+            segment = self._by_key.get(key)
+            if segment is not None:
+                grouped.setdefault(segment, []).append(key)
+        results = {}
+        for segment, segment_keys in grouped.items():
+            with open(segment.path, "rb") as f:
+                for key in segment_keys:
+                    results[key] = segment.read(f, DATE_KEY.match(key)["day"])
+        return results
+
+    def discard(self, key: str) -> None:
+        """Drop one day from its segment; its loose file now holds the current content."""
+        with self.lock:
+            segment = self._by_key.get(key)
+            if segment is None:
+                return
+            days = segment.read_all()
+            del days[DATE_KEY.match(key)["day"]]
+            self._replace(segment.path, segment, days)
+
+    def _replace(self, path: Path, old: Optional[Segment], days: dict[str, bytes]) -> None:
+        Segment.write(path, days)
+        if old is not None:
+            self._remove(old)
+        if days:
+            self._add(Segment.load(path))
+
+    def pack(self, storage, collection: str, period: str = "month", before: Optional[str] = None) -> dict:
+        """
+        Pack the loose day files of every closed period of a collection.
+
+        Args:
+            storage: The Storage owning the data directory
+            collection: Folder of YYYY-MM-DD.json files, e.g. "transactions"
+            period: "month" or "year"
+            before: First period to leave loose (default: the current one)
+
+        Returns:
+            {"segments": periods written, "files": loose files packed}
+        """
+        width = PERIODS[period]
+        before = before or date.today().isoformat()[:width]
+        folder = storage.data_dir / collection
+        loose: dict[str, list[Path]] = {}
+        for path in folder.glob("*.json") if folder.exists() else []:
+            day = path.stem
+            if DATE_KEY.match(f"{collection}/{path.name}") and day[:width] < before:
+                loose.setdefault(day[:width], []).append(path)
+        # Finer segments of a closed period (months, packing years) are merged too
+        for segment in {*self._by_key.values()}:
+            name = segment.path.stem
+            if segment.collection == collection and len(name) > width and name[:width] < before:
+                loose.setdefault(name[:width], [])
+
+        packed_files = 0
+        for name in sorted(loose):
+            path = self.dir / collection / f"{name}{SEGMENT_SUFFIX}"
+            with self.lock:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                # Segments already covering the period (or, packing a year, its months) are merged in
+                old = [s for s in {*self._by_key.values()}
+                       if s.collection == collection and (s.path == path or s.path.stem.startswith(name))]
+                days: dict[str, bytes] = {}
+                for segment in old:
+                    days.update(segment.read_all())
+                # Deleted since the listing above
+                loose[name] = [file for file in loose[name] if file.exists()]
+                for file in loose[name]:
+                    days[file.stem] = file.read_bytes()
+                self._replace(path, None, days)
+                # Only now that the new segment is in place are the sources removed
+                for segment in old:
+                    self._remove(segment)
+                    if segment.path != path:
+                        segment.path.unlink()
+                for file in loose[name]:
+                    file.unlink()
+                packed_files += len(loose[name])
+
+        return {"segments": len(loose), "files": packed_files}
+
+
+def start_packer(storage, collections: list[str], period: str = PACK_PERIOD,
+                 interval: float = PACK_INTERVAL) -> Optional[threading.Thread]:
+    """
+    Pack closed periods of `collections` in a daemon thread, now and every `interval` seconds.
+
+    Packing must run in the process that serves the data: the segment index
+    lives in memory, and the locks that keep writes and packing apart
+    are per process. Off unless `period` (GB_PACK_SEGMENTS) is set.
+    """
+    if period not in PERIODS:
+        return None
+
+    def run():
+        while True:
+            for collection in collections:
+                try:
+                    result = storage.pack(collection, period)
+                    if result["files"]:
+                        logger.info("Packed %d %s files into %d segments", result["files"], collection,
+                                    result["segments"])
+                except Exception:
+                    logger.exception("Packing %s failed", collection)
+            time.sleep(interval)
+
+    thread = threading.Thread(target=run, name="gb-segment-packer", daemon=True)
+    thread.start()
+    return thread
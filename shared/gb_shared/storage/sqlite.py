@@ -0,0 +1,168 @@
+"""
+SQLite storage backend: every document is a row in one table.
+
+    CREATE TABLE documents (key TEXT PRIMARY KEY, data BLOB NOT NULL) WITHOUT ROWID
+
+Documents are stored as the same JSON bytes the file backend writes. The
+key is the clustered primary key, so list_keys(prefix) is a range scan
+(key >= prefix AND key < next prefix) instead of a directory walk, and
+read_many() is one query. The database runs in WAL journal mode with one
+connection per thread. write_many() commits in one transaction.
+
+Select it with GB_STORAGE_BACKEND=sqlite (or get_storage(..., backend="sqlite")).
+The database lives at <data_dir>/<app>.sqlite3. Copy existing files in with:
+
+    python -m gb_shared.storage.sqlite finance [--data-dir PATH]
+"""
+
+import argparse
+import sqlite3
+import threading
+from typing import List, Optional
+
+from .base import Storage, _data_dir, get_storage
+
+SCHEMA = "CREATE TABLE IF NOT EXISTS documents (key TEXT PRIMARY KEY, data BLOB NOT NULL) WITHOUT ROWID"
+
+# Keys per statement for IN (...) lookups; below SQLite's variable limit
+_CHUNK = 500
+
+
+def _prefix_end(prefix: str) -> str:
+    """Smallest string greater than every string starting with prefix."""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class SQLiteStorage(Storage):
+    """Storage backed by a single SQLite database per app."""
+
+    def __init__(self, app_name: str, base_path: str = None):
+        # The database must be usable before Storage.__init__ replays a
+        # write-ahead log left by a previous run through _read_bytes()
+        self.db_path = _data_dir(app_name, base_path) / f"{app_name}.sqlite3"
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        # Only ever reads PRAGMA data_version, see _signature()
+        self._watcher: Optional[sqlite3.Connection] = None
+        self._ensure_dir(self.db_path)
+        with self._connection() as conn:
+            conn.execute(SCHEMA)
+        super().__init__(app_name, base_path)
+        # Segments are a file-layout optimisation; rows are already packed
+        self._segments = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Transactions are managed explicitly, see _write_many_bytes()
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self) -> None:
+        """Close every thread's connection."""
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+            if self._watcher is not None:
+                self._watcher.close()
+                self._watcher = None
+        self._local = threading.local()
+
+    # ---- primitives ----
+
+    def _read_bytes(self, key: str) -> Optional[bytes]:
+        row = self._connection().execute("SELECT data FROM documents WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _write_bytes(self, key: str, raw: bytes) -> None:
+        self._connection().execute("INSERT OR REPLACE INTO documents (key, data) VALUES (?, ?)", (key, raw))
+
+    def _write_many_bytes(self, items: dict[str, bytes]) -> None:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("INSERT OR REPLACE INTO documents (key, data) VALUES (?, ?)", items.items())
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _delete(self, key: str) -> bool:
+        return self._connection().execute("DELETE FROM documents WHERE key = ?", (key,)).rowcount > 0
+
+    def _open_file(self, key: str):
+        # Rows, not files: find_item() falls back to a lazy scan
+        return None
+
+    def _exists(self, key: str) -> bool:
+        return self._connection().execute("SELECT 1 FROM documents WHERE key = ?", (key,)).fetchone() is not None
+
+    def _read_many_bytes(self, keys: List[str]) -> dict[str, bytes]:
+        conn = self._connection()
+        results = {}
+        for i in range(0, len(keys), _CHUNK):
+            chunk = keys[i:i + _CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            results.update(conn.execute(f"SELECT key, data FROM documents WHERE key IN ({placeholders})", chunk))
+        return results
+
+    def _list_keys(self, prefix: str, suffix: str) -> List[str]:
+        conn = self._connection()
+        if prefix:
+            rows = conn.execute(
+                "SELECT key FROM documents WHERE key >= ? AND key < ? ORDER BY key", (prefix, _prefix_end(prefix))
+            )
+        else:
+            rows = conn.execute("SELECT key FROM documents ORDER BY key")
+        return [key for (key,) in rows if key.endswith(suffix)]
+
+    def _signature(self, prefix: str, suffix: str) -> tuple:
+        # data_version changes when any other connection commits, including
+        # this process's per-thread ones. It covers the whole database, not
+        # just the prefix, so a derived cache may reload more often than needed
+        with self._connections_lock:
+            if self._watcher is None:
+                self._watcher = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            return self._watcher.execute("PRAGMA data_version").fetchone()
+
+    def pack(self, collection: str, period: str = "month", before: Optional[str] = None) -> dict:
+        """Nothing to pack: every document is already a row in one file."""
+        return {"segments": 0, "files": 0}
+
+    # ---- migration ----
+
+    def import_from(self, source: Storage, batch_size: int = 500) -> int:
+        """Copy every JSON document from another storage. Returns the number copied."""
+        source.flush()
+        source.compact()
+        keys = source.list_keys("", ".json")
+        for i in range(0, len(keys), batch_size):
+            chunk = keys[i:i + batch_size]
+            self._write_many_bytes(source._read_many_bytes(chunk))
+        return len(keys)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m gb_shared.storage.sqlite", description="Copy an app's JSON files into its SQLite database."
+    )
+    parser.add_argument("app", help="App name, e.g. finance")
+    parser.add_argument("--data-dir", help="Data directory (default: gb-<app>/data)")
+    args = parser.parse_args(argv)
+
+    source = get_storage(args.app, args.data_dir, backend="file")
+    target = get_storage(args.app, args.data_dir, backend="sqlite")
+    copied = target.import_from(source)
+    print(f"Copied {copied} documents into {target.db_path}")
+
+
+if __name__ == "__main__":
+    main()
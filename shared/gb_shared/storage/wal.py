@@ -0,0 +1,226 @@
+"""
+Append-only write-ahead log for collections that grow one record at a time.
+
+Storage.append_json() adds a record to the list stored at a key (or to a
+list field of the dict stored there) by appending one NDJSON line to
+`_wal/<collection>.ndjson`, where the collection is the key's first path
+component. The cost is one write() whatever the size of the target file.
+
+Pending records are kept in memory and merged into reads. A background
+thread folds them into their target files every COMPACT_INTERVAL seconds,
+or sooner once COMPACT_THRESHOLD records are pending:
+
+1. The active logs are renamed to *.ndjson.compacting under the lock, so
+   new appends start fresh logs.
+2. Each key's records are written into its file, and dropped from memory
+   in the same locked step, so readers never see a record twice or miss it.
+3. The *.compacting files are deleted.
+
+Logs left behind by a crash are replayed when the Storage is created.
+A record already present in its target file is skipped, which covers a
+crash between steps 2 and 3. write_json() and delete() on a key with
+pending records supersede them. A "clear" line in the log stops those
+records from coming back on replay.
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Optional
+
+COMPACT_INTERVAL = float(os.environ.get("GB_WAL_COMPACT_INTERVAL", "5"))
+COMPACT_THRESHOLD = int(os.environ.get("GB_WAL_COMPACT_THRESHOLD", "256"))
+
+WAL_DIR = "_wal"
+
+logger = logging.getLogger("gb.storage")
+
+
+def apply_entries(data, entries: list[dict]):
+    """Apply pending log entries to the current content of their key."""
+    for entry in entries:
+        field = entry.get("field")
+        if data is None:
+            data = json.loads(json.dumps(entry["default"])) if entry.get("default") is not None else []
+            if field is not None:
+                data.setdefault(field, [])
+        target = data[field] if field is not None else data
+        target.append(entry["record"])
+        if entry.get("updates"):
+            data.update(entry["updates"])
+    return data
+
+
+class WriteAheadLog:
+    """Pending appends for one Storage, backed by NDJSON logs in its data directory."""
+
+    def __init__(
+        self,
+        data_dir: Path,
+        read: Callable[[str], Optional[bytes]],
+        write: Callable[[str, bytes], None],
+    ):
+        self.dir = data_dir / WAL_DIR
+        self._read = read
+        self._write = write
+        # Held while changing pending records together with the files they target
+        self.lock = threading.RLock()
+        self._compact_lock = threading.Lock()
+        self._pending: dict[str, list[dict]] = {}
+        self._count = 0
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if self.dir.exists():
+            self._replay()
+
+    def has(self, key: str) -> bool:
+        return key in self._pending
+
+    def keys(self) -> list[str]:
+        return list(self._pending)
+
+    def merge(self, key: str, data):
+        """`data` (the stored content of key, or None) with pending records applied."""
+        entries = self._pending.get(key)
+        return apply_entries(data, entries) if entries else data
+
+    def append(self, key: str, record, field: Optional[str], default, updates: Optional[dict]) -> int:
+        """Log one record for key. Returns the number of bytes written."""
+        entry = {"key": key, "record": record}
+        if field is not None:
+            entry["field"] = field
+        if default is not None:
+            entry["default"] = default
+        if updates:
+            entry["updates"] = updates
+        line = (json.dumps(entry) + "\n").encode()
+        with self.lock:
+            self._append_line(key, line)
+            self._pending.setdefault(key, []).append(entry)
+            self._count += 1
+            count = self._count
+        self._ensure_compactor()
+        if count >= COMPACT_THRESHOLD:
+            self._wake.set()
+        return len(line)
+
+    def clear(self, key: str) -> None:
+        """Forget pending records for key; its file has been overwritten. Caller holds the lock."""
+        entries = self._pending.pop(key, None)
+        if entries:
+            self._count -= len(entries)
+            self._append_line(key, (json.dumps({"key": key, "clear": True}) + "\n").encode())
+
+    def _log_path(self, key: str) -> Path:
+        return self.dir / f"{key.split('/', 1)[0]}.ndjson"
+
+    def _append_line(self, key: str, line: bytes) -> None:
+        path = self._log_path(key)
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        except FileNotFoundError:
+            self.dir.mkdir(parents=True, exist_ok=True)
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+
+    # ---- compaction ----
+
+    def compact(self) -> int:
+        """Fold every pending record into its target file. Returns the number of records written."""
+        with self._compact_lock:
+            with self.lock:
+                # Leftovers from a crash or a failed run were replayed into memory
+                rotated = list(self.dir.glob("*.ndjson.compacting")) if self.dir.exists() else []
+                for log in list(self.dir.glob("*.ndjson")) if self.dir.exists() else []:
+                    target = log.with_name(log.name + ".compacting")
+                    if target.exists():
+                        # Keep the older records: they're only gone once this run writes them
+                        with open(target, "ab") as out, open(log, "rb") as src:
+                            out.write(src.read())
+                        log.unlink()
+                    else:
+                        os.replace(log, target)
+                        rotated.append(target)
+                batch = {key: list(entries) for key, entries in self._pending.items()}
+
+            written = 0
+            for key, entries in batch.items():
+                with self.lock:
+                    current = self._pending.get(key, [])
+                    # Entries cleared by write_json() since the snapshot are gone already
+                    n = 0
+                    while n < len(entries) and n < len(current) and current[n] is entries[n]:
+                        n += 1
+                    if not n:
+                        continue
+                    raw = self._read(key)
+                    data = apply_entries(json.loads(raw) if raw is not None else None, current[:n])
+                    self._write(key, json.dumps(data, indent=2).encode())
+                    del current[:n]
+                    if not current:
+                        del self._pending[key]
+                    self._count -= n
+                    written += n
+
+            # The rotated logs only hold records from `batch`, now written or cleared
+            for log in rotated:
+                log.unlink(missing_ok=True)
+            return written
+
+    def _ensure_compactor(self) -> None:
+        if self._thread is not None:
+            return
+        with self.lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="gb-wal-compactor", daemon=True)
+                self._thread.start()
+                atexit.register(self.compact)
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(COMPACT_INTERVAL)
+            self._wake.clear()
+            if self._pending:
+                try:
+                    self.compact()
+                except Exception:
+                    # Records stay pending and are retried on the next pass
+                    logger.exception("WAL compaction failed in %s", self.dir)
+
+    # ---- recovery ----
+
+    def _replay(self) -> None:
+        """Load logs left by a previous process, skipping records already in their files."""
+        logs = sorted(self.dir.glob("*.ndjson.compacting")) + sorted(self.dir.glob("*.ndjson"))
+        for log in logs:
+            with open(log, "rb") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn final line from a crash mid-write
+                        continue
+                    key = entry["key"]
+                    if entry.get("clear"):
+                        self._count -= len(self._pending.pop(key, []))
+                        continue
+                    raw = self._read(key)
+                    current = self.merge(key, json.loads(raw) if raw is not None else None)
+                    if current is not None:
+                        existing = current.get(entry.get("field")) if isinstance(current, dict) else current
+                        if existing and entry["record"] in existing:
+                            continue
+                    self._pending.setdefault(key, []).append(entry)
+                    self._count += 1
+        if self._pending:
+            self._ensure_compactor()
+            self._wake.set()
+        else:
+            for log in logs:
+                log.unlink()
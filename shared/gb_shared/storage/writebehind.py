@@ -0,0 +1,131 @@
+"""
+Write-behind queue that coalesces bursts of whole-document rewrites.
+
+Storage.write_json(key, data, defer=True) serializes the document but parks
+the bytes here instead of writing the file. Deferred writes to the same key
+within WINDOW seconds replace the parked bytes, so a burst of clicks (ticking
+checklist items, toggling todos) costs one physical write. A background thread
+writes each key out WINDOW seconds after it was first parked. Keys that fall
+due together are written with one _write_many_bytes() call, which SQLite runs
+as a single transaction.
+
+Reads, listings and exists() see parked documents. Other operations supersede
+or flush a parked key first:
+- A plain write or a delete drops it.
+- An append writes it out.
+So the order of writes to a key never changes.
+
+Parked documents live only in memory, so a crash loses at most WINDOW seconds
+of deferred writes. flush() writes everything immediately. It runs at
+interpreter exit and from the apps' shutdown handlers.
+GB_WRITE_BEHIND_WINDOW=0 turns deferral off.
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+WINDOW = float(os.environ.get("GB_WRITE_BEHIND_WINDOW", "0.5"))
+
+logger = logging.getLogger("gb.storage")
+
+
+class WriteBehind:
+    """Parked documents for one Storage, keyed like the files they replace."""
+
+    def __init__(self, write_many: Callable[[dict[str, bytes]], None], window: float = WINDOW):
+        self.window = window
+        self._write_many = write_many
+        # Held while parked documents are written, or superseded by the caller
+        self.lock = threading.RLock()
+        # Guards _pending itself; never held during I/O
+        self._pending_lock = threading.Lock()
+        # key -> (serialized document, monotonic time it was first parked)
+        self._pending: dict[str, tuple[bytes, float]] = {}
+        self.coalesced = 0
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def has(self, key: str) -> bool:
+        return key in self._pending
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self._pending.get(key)
+        return entry[0] if entry is not None else None
+
+    def keys(self) -> list[str]:
+        return list(self._pending)
+
+    def put(self, key: str, raw: bytes) -> None:
+        """Park a document, replacing any parked version of the same key."""
+        with self._pending_lock:
+            entry = self._pending.get(key)
+            if entry is None:
+                self._pending[key] = (raw, time.monotonic())
+            else:
+                self._pending[key] = (raw, entry[1])
+                self.coalesced += 1
+        self._ensure_flusher()
+        self._wake.set()
+
+    def drop(self, key: str) -> None:
+        """Forget a parked document the caller is about to overwrite or delete (hold `lock`)."""
+        with self._pending_lock:
+            self._pending.pop(key, None)
+
+    def flush(self, keys: Optional[Iterable[str]] = None) -> int:
+        """Write parked documents now (all of them, or just `keys`). Returns the number written."""
+        with self.lock:
+            with self._pending_lock:
+                wanted = self._pending if keys is None else {k: self._pending[k] for k in keys if k in self._pending}
+                batch = {key: raw for key, (raw, _) in wanted.items()}
+            return self._write(batch)
+
+    def _flush_due(self) -> int:
+        cutoff = time.monotonic() - self.window
+        with self.lock:
+            with self._pending_lock:
+                batch = {key: raw for key, (raw, first) in self._pending.items() if first <= cutoff}
+            return self._write(batch)
+
+    def _write(self, batch: dict[str, bytes]) -> int:
+        if not batch:
+            return 0
+        self._write_many(batch)
+        with self._pending_lock:
+            for key, raw in batch.items():
+                # Parked again while being written: the newer version stays queued
+                entry = self._pending.get(key)
+                if entry is not None and entry[0] is raw:
+                    del self._pending[key]
+        return len(batch)
+
+    def _ensure_flusher(self) -> None:
+        if self._thread is not None:
+            return
+        with self.lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="gb-write-behind", daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait()
+            with self._pending_lock:
+                if not self._pending:
+                    self._wake.clear()
+                    continue
+                oldest = min(first for _, first in self._pending.values())
+            delay = oldest + self.window - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            try:
+                self._flush_due()
+            except Exception:
+                # Documents stay parked and are retried after another window
+                logger.exception("Write-behind flush failed")
+                time.sleep(self.window)
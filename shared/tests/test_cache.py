@@ -0,0 +1,45 @@
+"""Cached results see writes made through another Storage on the same data, as from another process."""
+
+from gb_shared.storage import cached
+from gb_shared.storage.base import Storage
+
+_storage = None
+
+
+@cached("test.value")
+def get_value() -> int:
+    return _storage.read_json("value.json")["v"]
+
+
+@cached("test.days")
+def count_days() -> int:
+    return len(_storage.list_keys("days/"))
+
+
+def test_hit_checks_key_written_elsewhere(tmp_path):
+    global _storage
+    _storage = Storage("test", str(tmp_path))
+    other = Storage("test", str(tmp_path))
+    _storage.write_json("value.json", {"v": 1})
+
+    assert get_value() == 1
+    hits = get_value.cache.hits
+    assert get_value() == 1
+    assert get_value.cache.hits == hits + 1
+
+    other.write_json("value.json", {"v": 2})
+    assert _storage.read_json("value.json") == {"v": 2}
+    assert get_value() == 2
+
+
+def test_hit_checks_prefix_written_elsewhere(tmp_path):
+    global _storage
+    _storage = Storage("test", str(tmp_path))
+    other = Storage("test", str(tmp_path))
+    _storage.write_json("days/2025-01-01.json", {})
+
+    assert count_days() == 1
+    other.write_json("days/2025-01-02.json", {})
+    assert count_days() == 2
+    other.delete("days/2025-01-01.json")
+    assert count_days() == 1
@@ -0,0 +1,44 @@
+"""Paging through collections with newest_first()."""
+
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from gb_shared.storage.ids import new_id, newest_first
+
+
+def _pages(items, limit):
+    pages, before = [], None
+    while True:
+        page = newest_first(items, limit, before)
+        if not page:
+            return pages
+        pages.append([item["name"] for item in page])
+        before = page[-1]["id"]
+
+
+def test_time_ids_page_newest_first():
+    """Time-ordered ids page in creation order."""
+    items = [{"id": new_id(), "name": n} for n in range(5)]
+    assert _pages(items, 2) == [[4, 3], [2, 1], [0]]
+
+
+def test_legacy_ids_page_by_created_at():
+    """A collection with uuid4 ids left pages by created_at, not by id."""
+    start = datetime(2024, 1, 1)
+    items = []
+    for n in range(6):
+        created = start + timedelta(days=n)
+        # uuid4 ids sort above time-ordered ones, whatever their age
+        item_id = str(uuid.uuid4()) if n % 2 == 0 else new_id(created)
+        items.append({"id": item_id, "name": n, "created_at": created.isoformat()})
+    assert _pages(items, 4) == [[5, 4, 3, 2], [1, 0]]
+    assert _pages(items, 1) == [[5], [4], [3], [2], [1], [0]]
+
+
+def test_legacy_ids_refuse_unknown_cursor():
+    """A cursor that cannot be placed in a legacy collection is refused, not guessed."""
+    items = [{"id": str(uuid.uuid4()), "name": 0, "created_at": "2024-01-01T00:00:00"}]
+    with pytest.raises(ValueError):
+        newest_first(items, 10, str(uuid.uuid4()))
@@ -0,0 +1,92 @@
+"""Change journal checks: concurrent writers and truncation."""
+
+import threading
+import time
+
+import pytest
+
+from gb_shared.storage.base import Storage
+
+KEY = "todos.json"
+
+
+def _apply(client: dict, response: dict) -> None:
+    """Update a client's copy of the collection from a sync() response."""
+    changes = response["changes"].get("todos", {"upserted": [], "deleted": []})
+    for item in changes["upserted"]:
+        client[item["id"]] = item
+    for item_id in changes["deleted"]:
+        client.pop(item_id, None)
+
+
+@pytest.mark.parametrize("indexed", [False, True])
+def test_concurrent_writer_diffs_against_previous_write(tmp_path, indexed):
+    """
+    Two writers start from the same version. The second is journaled against
+    the first one's write, so a client that synced in between sees it undo x.
+    """
+    storage = Storage("todo", str(tmp_path))
+    storage.track_changes("todos", KEY)
+    if indexed:
+        storage.index_items(KEY)
+    storage.write_json(KEY, [{"id": "x", "v": 0}, {"id": "y", "v": 0}])
+    client = {item["id"]: item for item in storage.read_json(KEY)}
+    seq = storage.sync(0)["seq"]
+
+    # Each writer's file write waits for the test to let it through
+    writing = {"a": threading.Event(), "b": threading.Event()}
+    proceed = {"a": threading.Event(), "b": threading.Event()}
+    write_now = storage._write_now
+
+    def gated_write_now(key, raw):
+        name = threading.current_thread().name
+        writing[name].set()
+        proceed[name].wait(5)
+        write_now(key, raw)
+
+    storage._write_now = gated_write_now
+    a = threading.Thread(name="a", target=storage.write_json, args=(KEY, [{"id": "x", "v": 1}, {"id": "y", "v": 0}]))
+    b = threading.Thread(name="b", target=storage.write_json, args=(KEY, [{"id": "x", "v": 0}, {"id": "y", "v": 1}]))
+    a.start()
+    assert writing["a"].wait(5)
+    b.start()
+    # b is now waiting for a's write to finish
+    time.sleep(0.1)
+    proceed["a"].set()
+    a.join(5)
+
+    response = storage.sync(seq)
+    _apply(client, response)
+    seq = response["seq"]
+    assert client["x"] == {"id": "x", "v": 1}
+
+    proceed["b"].set()
+    b.join(5)
+    _apply(client, storage.sync(seq))
+    assert client == {item["id"]: item for item in storage.read_json(KEY)}
+    assert client["x"] == {"id": "x", "v": 0}
+
+
+def test_truncated_journal_asks_for_full_resync(tmp_path):
+    storage = Storage("todo", str(tmp_path))
+    storage.track_changes("todos", KEY)
+    storage._journal.size = 4
+    storage.write_json(KEY, [{"id": "a", "v": 0}])
+    first = storage.sync(0)["seq"]
+    assert not storage.sync(first)["full_resync"]
+
+    for v in range(1, 6):
+        storage.write_json(KEY, [{"id": "a", "v": v}])
+
+    response = storage.sync(first)
+    assert response == {"seq": response["seq"], "full_resync": True, "changes": {}}
+    latest = storage.sync(response["seq"] - 1)
+    assert not latest["full_resync"]
+    assert latest["changes"] == {"todos": {"upserted": [{"id": "a", "v": 5}], "deleted": []}}
+
+    # The floor survives a restart
+    storage.compact()
+    restarted = Storage("todo", str(tmp_path))
+    restarted.track_changes("todos", KEY)
+    assert restarted.sync(first)["full_resync"]
+    assert restarted.sync(response["seq"])["changes"] == {}
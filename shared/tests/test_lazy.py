@@ -0,0 +1,23 @@
+"""find_item() on indexed collections."""
+
+import json
+
+from gb_shared.storage.base import Storage
+
+
+def test_find_item_uses_line_layout(tmp_path):
+    storage = Storage("todo", str(tmp_path))
+    storage.index_items("todos.json")
+    storage.write_json("todos.json", [{"id": "a", "n": 1}, {"id": "b", "n": 2}])
+    assert storage.find_item("todos.json", "b") == {"id": "b", "n": 2}
+    assert storage._line_indexes["todos.json"].spans is not None
+
+
+def test_find_item_in_file_not_in_line_layout(tmp_path):
+    """A file written before index_items() is scanned on every lookup until its next write."""
+    (tmp_path / "todos.json").write_text(json.dumps([{"id": "a"}, {"id": "b"}], indent=2))
+    storage = Storage("todo", str(tmp_path))
+    storage.index_items("todos.json")
+    assert storage.find_item("todos.json", "b") == {"id": "b"}
+    assert storage.find_item("todos.json", "b") == {"id": "b"}
+    assert storage.find_item("todos.json", "c") is None
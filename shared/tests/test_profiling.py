@@ -0,0 +1,49 @@
+"""Request profiling keeps concurrent, unprofiled requests out of a profile."""
+
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from gb_shared.instrumentation import profiling
+from gb_shared.storage.base import Storage
+
+
+def busy_other(seconds: float) -> None:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sum(range(10000))
+
+
+def test_profile_excludes_other_requests(tmp_path):
+    storage = Storage("finance", str(tmp_path))
+    storage.write_json("a.json", [1])
+    app = FastAPI()
+
+    @app.get("/mine")
+    async def mine():
+        for _ in range(3):
+            await storage.aread_json("a.json")
+            await asyncio.sleep(0.05)
+        return {}
+
+    @app.get("/other")
+    async def other():
+        for _ in range(20):
+            await storage.aread_json("a.json")
+            busy_other(0.01)
+        return {}
+
+    app.add_middleware(profiling.ProfilingMiddleware, app_name="finance", storage=storage)
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await asyncio.gather(client.get("/mine", headers={"X-GB-Profile": "1"}), client.get("/other"))
+
+    asyncio.run(run())
+    report = profiling._recent[-1]
+    assert report["path"] == "/mine"
+    assert report["storage"]["ops"] == 3
+    assert not [s for s in report["samples"]["stacks"] if "busy_other" in s["stack"]]
@@ -0,0 +1,24 @@
+"""Storage.signature() sees writes made through another Storage on the same data, as from another process."""
+
+import pytest
+
+from gb_shared.storage.base import Storage
+from gb_shared.storage.sqlite import SQLiteStorage
+
+
+@pytest.mark.parametrize("backend", [Storage, SQLiteStorage])
+def test_signature_changes_on_other_writers(tmp_path, backend):
+    reader = backend("finance", str(tmp_path))
+    writer = backend("finance", str(tmp_path))
+    writer.write_json("transactions/2025-01-01.json", [{"id": "a"}])
+
+    before = reader.signature("transactions/")
+    assert reader.signature("transactions/") == before
+
+    # Same size as before, and most likely within the same mtime tick
+    writer.write_json("transactions/2025-01-01.json", [{"id": "b"}])
+    after = reader.signature("transactions/")
+    assert after != before
+
+    writer.delete("transactions/2025-01-01.json")
+    assert reader.signature("transactions/") != after
@@ -0,0 +1,28 @@
+"""File backend recovery checks."""
+
+from gb_shared.storage.base import Storage
+
+
+def test_restart_replays_record_for_new_file(tmp_path):
+    """A restart after a crash that left the first record of a new day file in the log folds it in."""
+    storage = Storage("finance", str(tmp_path))
+    storage.append_json("transactions/2024-01-05.json", {"id": "a"})
+    # No compact(): the day file does not exist yet, the record is only in the log
+    assert not (tmp_path / "transactions" / "2024-01-05.json").exists()
+
+    restarted = Storage("finance", str(tmp_path))
+    assert restarted.read_json("transactions/2024-01-05.json") == [{"id": "a"}]
+    restarted.compact()
+    assert Storage("finance", str(tmp_path)).read_json("transactions/2024-01-05.json") == [{"id": "a"}]
+
+
+def test_restart_skips_records_already_folded(tmp_path):
+    """A record already in its file when the process died is not applied twice."""
+    storage = Storage("finance", str(tmp_path))
+    storage.write_json("transactions/2024-01-05.json", [{"id": "a"}])
+    storage.append_json("transactions/2024-01-05.json", {"id": "b"})
+    # As if the process died after folding the record but before deleting the log
+    (tmp_path / "transactions" / "2024-01-05.json").write_text('[{"id": "a"}, {"id": "b"}]')
+
+    restarted = Storage("finance", str(tmp_path))
+    assert restarted.read_json("transactions/2024-01-05.json") == [{"id": "a"}, {"id": "b"}]